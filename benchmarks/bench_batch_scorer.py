@@ -0,0 +1,78 @@
+import argparse
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+sys.path.insert(0, ROOT)
+
+from agent.batch_scorer import score_batch
+from agent.triage_agent import TriageAgent
+from data_generator import SupportDataGenerator
+from tests.fake_elasticsearch import FakeCluster
+
+CATEGORIES = ["technical", "billing", "account", "feature"]
+
+def build_batch(count):
+    random.seed(7)
+    generator = SupportDataGenerator()
+    generator.generate_customers(100)
+    templates = generator.generate_tickets(2000)
+    tickets = [templates[i % len(templates)] for i in range(count)]
+
+    contexts = []
+    for _ in tickets:
+        context = {
+            "similar_tickets": [{"category": random.choice(CATEGORIES)} for _ in range(random.randint(0, 5))],
+            "kb_articles": [],
+            "customer_history": {"plan": random.choice(["enterprise", "business", "pro", "free"]),
+                                 "satisfaction_score": round(random.uniform(2.0, 5.0), 1)}
+        }
+        if random.random() < 0.2:
+            context["subject_prior"] = {"categories": {random.choice(CATEGORIES): 8}, "count": 10}
+        contexts.append(context)
+    return tickets, contexts
+
+def best_of(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare per-ticket and vectorized priority/category scoring")
+    parser.add_argument("--tickets", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    agent = TriageAgent(FakeCluster().client())
+    tickets, contexts = build_batch(args.tickets)
+    analyses = [agent._analyze_content(t) for t in tickets]
+    workload = {"engineering": 10, "billing": 5}
+
+    def scalar_path():
+        decisions = []
+        for ticket, analysis, context in zip(tickets, analyses, contexts):
+            esql_analysis = agent._score_ticket(ticket, analysis, context, workload)
+            decisions.append(agent._make_decision(ticket, analysis, context, esql_analysis))
+        return decisions
+
+    def batch_path():
+        return score_batch(tickets, analyses, contexts, workload, agent._classify_by_keywords)[1]
+
+    assert batch_path() == scalar_path()
+    scalar_seconds = best_of(scalar_path, args.repeat)
+    batch_seconds = best_of(batch_path, args.repeat)
+
+    print(f"{len(tickets)} tickets, identical decisions\n")
+    print(f"{'mode':<12}{'seconds':>10}{'tickets/sec':>14}")
+    print(f"{'scalar':<12}{scalar_seconds:>10.3f}{len(tickets) / scalar_seconds:>14,.0f}")
+    print(f"{'vectorized':<12}{batch_seconds:>10.3f}{len(tickets) / batch_seconds:>14,.0f}")
+    print(f"\nspeedup: {scalar_seconds / batch_seconds:.2f}x")
+
+if __name__ == "__main__":
+    main()
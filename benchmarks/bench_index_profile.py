@@ -0,0 +1,154 @@
+import argparse
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+sys.path.insert(0, ROOT)
+
+from elasticsearch import helpers
+
+from agent.esql_analytics import EsqlAnalytics
+from agent.triage_agent import TriageAgent
+from data_generator import SupportDataGenerator
+from es_config.index_profiles import PROFILES, index_profile
+from es_config.setup_indices import TICKET_MAPPING
+from tests.fake_elasticsearch import FakeCluster
+
+INDEX_PREFIX = "bench_profile"
+
+def percentile(values, q):
+    return float(np.percentile(values, q)) if values else 0.0
+
+def build_data(count):
+    random.seed(7)
+    generator = SupportDataGenerator()
+    generator.generate_customers(500)
+    tickets = generator.generate_tickets(count)
+    for ticket in tickets:
+        ticket["status"] = random.choices(["open", "in_progress", "resolved"], [0.15, 0.1, 0.75])[0]
+    return tickets
+
+def create(es, cluster, profile, tickets):
+    index = f"{INDEX_PREFIX}_{profile}"
+    mapping, settings = index_profile("support_tickets", TICKET_MAPPING, profile)
+    if cluster is not None:
+        cluster.add_documents(index, tickets, "ticket_id")
+        return index
+
+    if es.indices.exists(index=index):
+        es.indices.delete(index=index)
+    body = {"mappings": mapping}
+    if settings:
+        body["settings"] = settings
+    es.indices.create(index=index, body=body)
+    helpers.bulk(es, ({"_index": index, "_id": t["ticket_id"], "_source": t} for t in tickets), chunk_size=2000)
+    es.indices.refresh(index=index)
+    es.indices.forcemerge(index=index, max_num_segments=1)
+    es.indices.refresh(index=index)
+    return index
+
+def workloads(agent, tickets):
+    open_tickets = [t for t in tickets if t["status"] == "open"]
+    return {
+        "worker poll": lambda i: {
+            "query": {"bool": {"filter": [{"term": {"status": "open"}}]}},
+            "size": 50,
+            "sort": [{"status": "asc"}, {"created_at": "asc"}],
+            "track_total_hits": False
+        },
+        "team workload": lambda i: {
+            "size": 0,
+            "query": {"term": {"status": "open"}},
+            "aggs": {"by_team": {"terms": {"field": "assigned_team", "size": 10}}}
+        },
+        "category agg": lambda i: {
+            "size": 0,
+            "aggs": {"categories": {"terms": {"field": "category", "size": 10}}}
+        },
+        "customer history": lambda i: agent._customer_tickets_query(tickets[i % len(tickets)]["customer_id"]),
+        "similar tickets": lambda i: agent._similar_tickets_query(open_tickets[i % len(open_tickets)])
+    }
+
+def run_search(es, index, body_for, queries, warmup):
+    for i in range(warmup):
+        es.search(index=index, body=body_for(i))
+    latencies = []
+    took = []
+    for i in range(queries):
+        start = time.perf_counter()
+        response = es.search(index=index, body=body_for(i))
+        latencies.append((time.perf_counter() - start) * 1000)
+        took.append(response.get("took", 0))
+    return latencies, took
+
+def run_esql(es, index, tickets, queries, warmup):
+    analytics = EsqlAnalytics(es, index=index)
+    open_tickets = [t for t in tickets if t["status"] == "open"]
+    latencies = []
+    for i in range(warmup + queries):
+        batch = open_tickets[(i * 25) % len(open_tickets):][:25]
+        start = time.perf_counter()
+        analytics.batch_stats(batch)
+        if i >= warmup:
+            latencies.append((time.perf_counter() - start) * 1000)
+    return latencies, []
+
+def store_size(es, index):
+    stats = es.indices.stats(index=index, metric="store")
+    return stats["_all"]["primaries"]["store"]["size_in_bytes"]
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare query latency across support_tickets index profiles")
+    parser.add_argument("--tickets", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--fake", action="store_true",
+                        help="smoke-test against the in-memory fake; it ignores mappings and settings, so no speedup is reported")
+    parser.add_argument("--keep", action="store_true", help="keep the benchmark indices after the run")
+    args = parser.parse_args()
+    live = not args.fake
+
+    tickets = build_data(args.tickets)
+    cluster = None if live else FakeCluster()
+    if live:
+        from es_config.client import get_client
+        es = get_client()
+    else:
+        es = cluster.client()
+
+    indices = {profile: create(es, cluster, profile, tickets) for profile in PROFILES}
+    agent = TriageAgent(es)
+    results = {}
+    for profile, index in indices.items():
+        for name, body_for in workloads(agent, tickets).items():
+            results[(profile, name)] = run_search(es, index, body_for, args.queries, args.warmup)
+        results[(profile, "esql batch stats")] = run_esql(es, index, tickets, args.queries, args.warmup)
+
+    print(f"\n{args.queries} queries per workload against {len(tickets)} tickets "
+          f"({'live cluster; took is server-side' if live else 'in-memory fake; profiles are not applied, so no speedup is reported'})\n")
+    print(f"{'workload':<18}{'profile':<12}{'p50':>10}{'p95':>10}{'took p50':>11}{'speedup':>10}")
+    names = list(dict.fromkeys(name for _, name in results))
+    for name in names:
+        baseline = percentile(results[("default", name)][0], 50)
+        for profile in PROFILES:
+            latencies, took = results[(profile, name)]
+            p50 = percentile(latencies, 50)
+            took_p50 = f"{percentile(took, 50):>9.1f}ms" if took and live else f"{'-':>11}"
+            speedup = f"{baseline / p50:>9.2f}x" if live and p50 > 0 else f"{'-':>10}"
+            print(f"{name:<18}{profile:<12}{p50:>8.2f}ms{percentile(latencies, 95):>8.2f}ms{took_p50}{speedup}")
+
+    if live:
+        print()
+        for profile, index in indices.items():
+            print(f"{profile:<12} store size: {store_size(es, index) / 1024 / 1024:.1f} MB")
+        if not args.keep:
+            for index in indices.values():
+                es.indices.delete(index=index)
+
+if __name__ == "__main__":
+    main()
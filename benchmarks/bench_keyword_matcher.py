@@ -0,0 +1,41 @@
+import os
+import sys
+import random
+import timeit
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from agent.triage_agent import (CATEGORY_KEYWORDS, CONTENT_MATCHER, NEGATIVE_WORDS,
+                                POSITIVE_WORDS, URGENCY_KEYWORDS)
+from data_generator import SupportDataGenerator
+
+def substring_loops(text):
+    text = text.lower()
+    return {
+        'negative': [w for w in NEGATIVE_WORDS if w in text],
+        'positive': [w for w in POSITIVE_WORDS if w in text],
+        'urgency': [kw for kw in URGENCY_KEYWORDS if kw in text],
+        **{f'category:{category}': [kw for kw in keywords if kw in text]
+           for category, keywords in CATEGORY_KEYWORDS.items()}
+    }
+
+def build_texts(repeat):
+    random.seed(7)
+    tickets = SupportDataGenerator().generate_tickets(200)
+    return [" ".join([f"{t['subject']} {t['description']}"] * repeat) for t in tickets]
+
+def main():
+    print(f"{'text size':<12}{'avg chars':>10}{'substring':>14}{'matcher':>14}{'speedup':>10}")
+    for label, repeat in [("short", 1), ("medium", 5), ("long", 20), ("very long", 80)]:
+        texts = build_texts(repeat)
+        assert all(CONTENT_MATCHER.match(t) == substring_loops(t) for t in texts)
+
+        loops = min(timeit.repeat(lambda: [substring_loops(t) for t in texts], number=5, repeat=5))
+        matcher = min(timeit.repeat(lambda: [CONTENT_MATCHER.match(t) for t in texts], number=5, repeat=5))
+        per_loop = loops / (5 * len(texts)) * 1e6
+        per_matcher = matcher / (5 * len(texts)) * 1e6
+        avg_chars = sum(len(t) for t in texts) // len(texts)
+        print(f"{label:<12}{avg_chars:>10}{per_loop:>12.1f}µs{per_matcher:>12.1f}µs{per_loop / per_matcher:>9.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+import argparse
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+sys.path.insert(0, ROOT)
+
+from elasticsearch import helpers
+
+from agent.embeddings import TICKET_TEXT_FIELDS, TICKET_VECTOR_FIELD, embed_documents, load_embedder
+from agent.triage_agent import TriageAgent
+from data_generator import SupportDataGenerator
+from es_config.setup_indices import TICKET_MAPPING, with_vector_field
+from tests.fake_elasticsearch import FakeCluster
+
+INDEX = "bench_similar_tickets"
+
+def percentile(values, q):
+    return float(np.percentile(values, q)) if values else 0.0
+
+def build_data(count):
+    random.seed(7)
+    generator = SupportDataGenerator()
+    generator.generate_customers(100)
+    tickets = generator.generate_tickets(count)
+    for ticket in tickets:
+        ticket["status"] = "resolved" if random.random() < 0.8 else "open"
+    return [t for t in tickets if t["status"] == "resolved"], [t for t in tickets if t["status"] == "open"]
+
+def connect(live, resolved, embedder):
+    if live:
+        from es_config.client import get_client
+        es = get_client()
+        if es.indices.exists(index=INDEX):
+            es.indices.delete(index=INDEX)
+        es.indices.create(index=INDEX, body={"mappings": with_vector_field(TICKET_MAPPING, TICKET_VECTOR_FIELD, embedder)})
+        helpers.bulk(es, ({"_index": INDEX, "_id": t["ticket_id"], "_source": t} for t in resolved))
+        es.indices.refresh(index=INDEX)
+        return es
+
+    cluster = FakeCluster()
+    cluster.add_documents(INDEX, resolved, "ticket_id")
+    return cluster.client()
+
+def run(label, agent, es, queries, live, exact=None):
+    latencies = []
+    matching = 0
+    top1 = 0
+    overlap = 0
+    for position, ticket in enumerate(queries):
+        start = time.perf_counter()
+        body = agent._similar_tickets_query(ticket)
+        hits = es.search(index=INDEX, body=body)["hits"]["hits"]
+        latencies.append((time.perf_counter() - start) * 1000)
+
+        categories = [hit["_source"]["category"] for hit in hits]
+        matching += sum(1 for category in categories if category == ticket["category"])
+        if categories and max(set(categories), key=categories.count) == ticket["category"]:
+            top1 += 1
+        if exact is not None:
+            overlap += sum(1 for hit in hits if 2 * hit["_score"] - 1 >= exact[position] - 1e-4)
+
+    total = len(queries)
+    recall = f"{overlap / (5 * total):>13.1%}" if exact is not None else f"{'-':>13}"
+    p95 = percentile(latencies, 95)
+    latency = f"{percentile(latencies, 50):>9.2f}ms{p95:>9.2f}ms" if live else f"{'-':>11}{'-':>11}"
+    print(f"{label:<10}{latency}{matching / (5 * total):>14.1%}{top1 / total:>12.1%}{recall}")
+    return p95
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare BM25 and kNN similar-ticket search")
+    parser.add_argument("--tickets", type=int, default=5000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--embedder", default=os.getenv('TRIAGE_EMBEDDER', 'hashing'))
+    parser.add_argument("--fake", action="store_true",
+                        help="check relevance against the in-memory fake; its latency says nothing about Elasticsearch, so none is reported")
+    args = parser.parse_args()
+    live = not args.fake
+
+    embedder = load_embedder(args.embedder)
+    resolved, open_tickets = build_data(args.tickets)
+
+    start = time.perf_counter()
+    resolved = list(embed_documents(resolved, embedder, TICKET_TEXT_FIELDS, TICKET_VECTOR_FIELD))
+    elapsed = time.perf_counter() - start
+    print(f"Embedded {len(resolved)} resolved tickets in {elapsed:.2f}s ({len(resolved) / elapsed:.0f} docs/sec)")
+
+    es = connect(live, resolved, embedder)
+    queries = open_tickets[:args.queries]
+
+    matrix = np.array([t[TICKET_VECTOR_FIELD] for t in resolved], dtype=np.float32)
+    query_vectors = embedder.encode([f"{q['subject']} {q['description']}" for q in queries])
+    exact = [float(np.sort(matrix @ vector)[-5]) for vector in query_vectors]
+
+    print(f"\n{len(queries)} queries against {len(resolved)} resolved tickets "
+          f"({'live cluster' if live else 'in-memory fake; relevance only, no latency'})\n")
+    print(f"{'mode':<10}{'p50':>11}{'p95':>11}{'category@5':>14}{'vote acc':>12}{'knn recall':>13}")
+    bm25_p95 = run("bm25", TriageAgent(es), es, queries, live)
+    knn_p95 = run("knn", TriageAgent(es, embedder=embedder), es, queries, live, exact)
+
+    if live:
+        verdict = "at least as fast as" if knn_p95 <= bm25_p95 else "slower than"
+        print(f"\nkNN p95 {knn_p95:.2f}ms is {verdict} BM25 p95 {bm25_p95:.2f}ms")
+        es.indices.delete(index=INDEX)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+import os
+import sys
+import random
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+sys.path.insert(0, ROOT)
+
+from agent.logging_utils import configure_logging
+from agent.triage_agent import TriageAgent
+from data_generator import SupportDataGenerator
+from tests.fake_elasticsearch import FakeCluster
+
+class CannedClient:
+
+    def __init__(self, cluster: FakeCluster):
+        self._responses = {}
+        self._cluster = cluster
+        self._client = cluster.client()
+
+    def search(self, index, body):
+        key = (index, repr(body))
+        if key not in self._responses:
+            self._responses[key] = self._client.search(index=index, body=body).body
+        return self._responses[key]
+
+    def get(self, index, id):
+        return {"_source": self._cluster.indices[index][id]}
+
+    def update(self, index, id, body):
+        return {"result": "updated"}
+
+    def index(self, index, body):
+        return {"result": "created"}
+
+def build_cluster():
+    random.seed(7)
+    generator = SupportDataGenerator()
+    cluster = FakeCluster()
+    cluster.add_documents("customers", generator.generate_customers(50), "customer_id")
+    cluster.add_documents("support_tickets", generator.generate_tickets(400), "ticket_id")
+    cluster.add_documents("knowledge_base", generator.generate_kb_articles(), "article_id")
+    cluster.indices.setdefault("agent_actions", {})
+    return cluster
+
+def run(label, client, tickets, rounds=5, **logging_options):
+    best = None
+    with open(os.devnull, "w") as devnull:
+        configure_logging(stream=devnull, **logging_options)
+        for _ in range(rounds):
+            agent = TriageAgent(client, customer_cache_ttl=0)
+            start = time.perf_counter()
+            for ticket in tickets:
+                agent.triage_ticket(ticket)
+            elapsed = (time.perf_counter() - start) / len(tickets) * 1e6
+            best = elapsed if best is None else min(best, elapsed)
+    print(f"{label:<28}{best:>10.1f}µs/ticket")
+    return best
+
+def main():
+    cluster = build_cluster()
+    tickets = [dict(t) for t in cluster.indices["support_tickets"].values() if t["status"] == "open"][:100]
+    client = CannedClient(cluster)
+    run("warm-up", client, tickets, rounds=1, level="WARNING")
+
+    print(f"\nTriaging {len(tickets)} tickets with canned Elasticsearch responses (agent CPU only)\n")
+    verbose = run("INFO text (old prints)", client, tickets, level="INFO")
+    json_lines = run("INFO JSON lines", client, tickets, level="INFO", log_format="json")
+    quiet = run("quiet (default)", client, tickets, level="WARNING")
+    print(f"\nPer-step output overhead removed: {verbose - quiet:.0f}µs/ticket ({(verbose - quiet) / verbose:.1%})")
+    print(f"JSON lines overhead vs quiet:     {json_lines - quiet:.0f}µs/ticket")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Optional
+
+from elasticsearch import AsyncElasticsearch
+
+from agent.caches import CustomerContextCache, TeamWorkloadSnapshot
+from agent.instrumentation import MetricsSink, StageTimer, timed
+from agent.local_index import LocalSimilarityIndex
+from agent.subject_priors import SubjectPriors
+from agent.triage_agent import TriageLogic
+
+logger = logging.getLogger(__name__)
+
+class AsyncTriageAgent(TriageLogic):
+
+    def __init__(self, es_client: AsyncElasticsearch, max_concurrency: int = 100,
+                 workload_snapshot: Optional[TeamWorkloadSnapshot] = None, workload_ttl: float = 30.0,
+                 customer_cache: Optional[CustomerContextCache] = None, customer_cache_ttl: float = 60.0,
+                 customer_cache_size: int = 1024, metrics_sink: Optional[MetricsSink] = None,
+                 subject_priors: Optional[SubjectPriors] = None, embedder=None, knn_candidates: int = 50,
+                 local_index: Optional[LocalSimilarityIndex] = None, prefer_local_index: bool = False):
+        self._init_shared(es_client, workload_snapshot, workload_ttl, customer_cache, customer_cache_ttl,
+                          customer_cache_size, metrics_sink, subject_priors, embedder, knn_candidates,
+                          local_index, prefer_local_index)
+        self.max_concurrency = max_concurrency
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._workload_lock = asyncio.Lock()
+
+    async def triage_ticket(self, ticket: Dict[str, Any], search_context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        timer = StageTimer.current() or StageTimer()
+        with timer.activate():
+            with timer.stage("total"):
+                result = await self._run_triage(ticket, search_context)
+
+        result['timings'] = timer.snapshot()
+        result['processing_time_ms'] = int(result['timings']['total'])
+        self.metrics.observe(result['timings'])
+        return result
+
+    async def _run_triage(self, ticket: Dict[str, Any], search_context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        with timed("analysis"):
+            analysis = self._analyze_content(ticket)
+
+        if search_context is None:
+            with timed("context"):
+                search_context = await self._search_for_context(ticket, analysis)
+
+        with timed("scoring"):
+            with timed("workload"):
+                team_workload = await self._get_team_workload()
+            esql_analysis = self._score_ticket(ticket, analysis, search_context, team_workload)
+
+        with timed("decision"):
+            decision = self._make_decision(ticket, analysis, search_context, esql_analysis)
+
+        with timed("workflow"):
+            workflow_result = await self._execute_workflow(ticket, decision, search_context)
+
+        ticket_id = ticket.get("ticket_id", "UNKNOWN")
+        result = self._build_result(ticket, search_context, esql_analysis, decision, workflow_result)
+
+        with timed("audit_log"):
+            await self._log_agent_action(ticket_id, decision, result)
+
+        return result
+
+    async def triage_batch(self, tickets: List[Dict[str, Any]], max_workers: Optional[int] = None) -> List[Dict[str, Any]]:
+        return list(await asyncio.gather(*(self.triage_timed(ticket) for ticket in tickets)))
+
+    async def triage_timed(self, ticket: Dict[str, Any], search_context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        async with self._semaphore:
+            start_time = time.perf_counter()
+            timer = StageTimer()
+            try:
+                with timer.activate():
+                    result = await self.triage_ticket(ticket, search_context)
+            except Exception as e:
+                logger.warning("Error triaging ticket %s: %s", ticket.get('ticket_id', 'UNKNOWN'), e)
+                result = {
+                    "ticket_id": ticket.get("ticket_id", "UNKNOWN"),
+                    "original_status": ticket.get("status", "open"),
+                    "error": str(e),
+                    "timings": timer.snapshot(),
+                    "processing_time_ms": int((time.perf_counter() - start_time) * 1000)
+                }
+            return result
+
+    async def _search_for_context(self, ticket: Dict[str, Any], analysis: Dict) -> Dict[str, Any]:
+        customer_id = ticket.get('customer_id')
+        subject_prior = self._subject_prior(ticket)
+        query_vector = self._query_vectors([ticket])[0]
+
+        similar_tickets, kb_articles, customer_history = await asyncio.gather(
+            _resolved([]) if subject_prior else self._search_similar_tickets(ticket, query_vector),
+            self._search_kb_articles(ticket, query_vector),
+            self._get_customer_history(customer_id) if customer_id else _empty_history()
+        )
+
+        return {
+            'similar_tickets': similar_tickets,
+            'kb_articles': kb_articles,
+            'customer_history': customer_history,
+            'subject_prior': subject_prior
+        }
+
+    async def _search_similar_tickets(self, ticket: Dict[str, Any], query_vector: Optional[List[float]] = None) -> List[Dict]:
+        if self.prefer_local_index:
+            return self._local_similar_tickets_batch([ticket], [query_vector])[0]
+        try:
+            with timed("similar_tickets"):
+                response = await self.es.search(
+                    index="support_tickets",
+                    body=self._similar_tickets_query(ticket, query_vector)
+                )
+            return self._parse_similar_tickets(response["hits"]["hits"])
+        except Exception as e:
+            logger.warning("Error searching similar tickets: %s", e)
+            return self._fallback_similar_tickets(ticket, query_vector)
+
+    async def _search_kb_articles(self, ticket: Dict[str, Any], query_vector: Optional[List[float]] = None) -> List[Dict]:
+        try:
+            with timed("kb_search"):
+                response = await self.es.search(
+                    index="knowledge_base",
+                    body=self._kb_articles_query(ticket, query_vector)
+                )
+            return self._parse_kb_articles(response["hits"]["hits"])
+        except Exception as e:
+            logger.warning("Error searching KB: %s", e)
+            return []
+
+    async def _get_customer_history(self, customer_id: str) -> Dict:
+        cached = self.customer_cache.get(customer_id)
+        try:
+            customer, past_tickets = await asyncio.gather(
+                _resolved(cached["profile"]) if cached else self._fetch_customer_profile(customer_id),
+                _resolved(cached["past_tickets"]) if cached and cached["past_tickets"] is not None
+                else self._fetch_customer_tickets(customer_id)
+            )
+            self._cache_customer_context(customer_id, cached, customer, past_tickets)
+            return self._build_customer_history(customer_id, customer, past_tickets)
+        except Exception as e:
+            logger.warning("Error getting customer history: %s", e)
+            return self._default_customer_history(customer_id)
+
+    async def _fetch_customer_profile(self, customer_id: str) -> Dict:
+        with timed("customer_lookup"):
+            customer_response = await self.es.get(index="customers", id=customer_id)
+        return customer_response["_source"]
+
+    async def _fetch_customer_tickets(self, customer_id: str) -> List[Dict]:
+        with timed("customer_lookup"):
+            tickets_response = await self.es.search(
+                index="support_tickets",
+                body=self._customer_tickets_query(customer_id)
+            )
+        return [hit["_source"] for hit in tickets_response["hits"]["hits"]]
+
+    async def _get_team_workload(self) -> Dict[str, int]:
+        workload = self.workload.peek()
+        if workload is not None:
+            return workload
+
+        async with self._workload_lock:
+            workload = self.workload.peek()
+            if workload is not None:
+                return workload
+            try:
+                workload = await self._fetch_team_workload()
+            except Exception as e:
+                logger.warning("Error getting team workload: %s", e)
+                return self.workload.peek(allow_stale=True) or {}
+            self.workload.store(workload)
+            return workload
+
+    async def _fetch_team_workload(self) -> Dict[str, int]:
+        response = await self.es.search(index="support_tickets", body=self._team_workload_query())
+        return self._parse_team_workload(response)
+
+    async def _execute_workflow(self, ticket: Dict, decision: Dict, context: Dict) -> Dict:
+        actions_taken = []
+        workflow_result = {
+            'actions_taken': actions_taken,
+            'status': 'success',
+            'timestamp': None
+        }
+
+        ticket_id = ticket.get("ticket_id", "UNKNOWN")
+
+        try:
+            if ticket_id != "UNKNOWN":
+                with timed("ticket_update"):
+                    await self.es.update(
+                        index="support_tickets",
+                        id=ticket_id,
+                        body={"doc": self._ticket_update_doc(decision)}
+                    )
+                self._after_ticket_update(ticket, decision)
+                actions_taken.append(f"Updated ticket fields (category={decision['category']}, priority={decision['priority']})")
+            else:
+                actions_taken.append("Skipped ticket update (no ticket ID)")
+        except Exception as e:
+            logger.warning("Error updating ticket: %s", e)
+            actions_taken.append(f"Failed to update ticket: {e}")
+            self._record_write_error(workflow_result, 'ticket_update', str(e))
+
+        return self._complete_workflow(decision, workflow_result)
+
+    async def _log_agent_action(self, ticket_id: str, decision: Dict, result: Dict):
+        try:
+            await self.es.index(
+                index="agent_actions",
+                body=self._action_doc(ticket_id, decision)
+            )
+        except Exception as e:
+            logger.warning("Error logging action: %s", e)
+            self._record_write_error(result['workflow_result'], 'audit_log', str(e))
+
+async def _resolved(value: Any) -> Any:
+    return value
+
+async def _empty_history() -> Dict:
+    return {}
@@ -0,0 +1,180 @@
+import json
+import logging
+import os
+from typing import Any, Dict, Iterator, List, Optional
+
+from elasticsearch import Elasticsearch, NotFoundError
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_RANK = {"critical": 0, "high": 1, "medium": 2, "low": 3}
+
+PRIORITY_RANK_SCRIPT = """
+String p = doc['priority'].size() == 0 ? 'low' : doc['priority'].value;
+if (p == 'critical') { emit(0); }
+else if (p == 'high') { emit(1); }
+else if (p == 'medium') { emit(2); }
+else { emit(3); }
+"""
+
+def scan_tickets(es_client: Elasticsearch, index: str = "support_tickets", status: str = "resolved",
+                 page_size: int = 1000, keep_alive: str = "5m") -> Iterator[Dict[str, Any]]:
+    pit_id = es_client.open_point_in_time(index=index, keep_alive=keep_alive)["id"]
+    search_after: Optional[List[Any]] = None
+    try:
+        while True:
+            body: Dict[str, Any] = {
+                "size": page_size,
+                "query": {"term": {"status": status}},
+                "sort": [{"_shard_doc": "asc"}],
+                "pit": {"id": pit_id, "keep_alive": keep_alive},
+                "track_total_hits": False
+            }
+            if search_after is not None:
+                body["search_after"] = search_after
+            response = es_client.search(body=body)
+            pit_id = response.get("pit_id", pit_id)
+            hits = response["hits"]["hits"]
+            for hit in hits:
+                yield hit["_source"]
+            if len(hits) < page_size:
+                return
+            search_after = hits[-1]["sort"]
+    finally:
+        try:
+            es_client.close_point_in_time(id=pit_id)
+        except Exception as e:
+            logger.warning("Error closing point in time: %s", e)
+
+class OpenTicketStream:
+
+    def __init__(self, es_client: Elasticsearch, index: str = "support_tickets", status: str = "open",
+                 page_size: int = 200, keep_alive: str = "5m", checkpoint_path: Optional[str] = None):
+        self.es = es_client
+        self.index = index
+        self.status = status
+        self.page_size = page_size
+        self.keep_alive = keep_alive
+        self.checkpoint_path = checkpoint_path
+        self.processed = 0
+        self._search_after: Optional[List[Any]] = None
+        self._page_end: Optional[List[Any]] = None
+        self._page_count = 0
+        self._pit_id: Optional[str] = None
+        self._load_checkpoint()
+
+    def pages(self) -> Iterator[List[Dict[str, Any]]]:
+        self._open_pit()
+        try:
+            while True:
+                hits = self._next_page()
+                if not hits:
+                    break
+                self._page_end = hits[-1]["sort"]
+                self._page_count = len(hits)
+                yield [hit["_source"] for hit in hits]
+                if len(hits) < self.page_size:
+                    break
+            if self._page_end is None:
+                self._clear_checkpoint()
+        finally:
+            self._close_pit()
+
+    def tickets(self) -> Iterator[Dict[str, Any]]:
+        for page in self.pages():
+            yield from page
+            self.commit()
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return self.tickets()
+
+    def commit(self):
+        if self._page_end is None:
+            return
+        self.processed += self._page_count
+        self._save_checkpoint(self._page_end)
+        self._page_end = None
+        self._page_count = 0
+
+    def _next_page(self) -> List[Dict[str, Any]]:
+        body = {
+            "size": self.page_size,
+            "query": {"term": {"status": self.status}},
+            "runtime_mappings": {
+                "priority_rank": {"type": "long", "script": {"source": PRIORITY_RANK_SCRIPT}}
+            },
+            "sort": [
+                {"priority_rank": "asc"},
+                {"created_at": "asc"},
+                {"ticket_id": "asc"}
+            ],
+            "track_total_hits": False
+        }
+        if self._search_after is not None:
+            body["search_after"] = self._search_after
+
+        try:
+            response = self._search(body)
+        except NotFoundError:
+            logger.warning("Point in time expired, reopening and resuming from last position")
+            self._open_pit()
+            response = self._search(body)
+
+        if self._pit_id is not None:
+            self._pit_id = response.get("pit_id", self._pit_id)
+        hits = response["hits"]["hits"]
+        if hits:
+            self._search_after = hits[-1]["sort"]
+        return hits
+
+    def _search(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        if self._pit_id is None:
+            return self.es.search(index=self.index, body=body)
+        return self.es.search(body=dict(body, pit={"id": self._pit_id, "keep_alive": self.keep_alive}))
+
+    def _open_pit(self):
+        try:
+            response = self.es.open_point_in_time(index=self.index, keep_alive=self.keep_alive)
+            self._pit_id = response["id"]
+        except Exception as e:
+            logger.warning("Could not open point in time, paging without one: %s", e)
+            self._pit_id = None
+
+    def _close_pit(self):
+        if self._pit_id is None:
+            return
+        try:
+            self.es.close_point_in_time(id=self._pit_id)
+        except Exception as e:
+            logger.warning("Error closing point in time: %s", e)
+        self._pit_id = None
+
+    def _load_checkpoint(self):
+        if not self.checkpoint_path or not os.path.exists(self.checkpoint_path):
+            return
+        try:
+            with open(self.checkpoint_path) as f:
+                checkpoint = json.load(f)
+            if checkpoint.get("index") == self.index and checkpoint.get("status") == self.status:
+                self._search_after = checkpoint.get("search_after")
+                self.processed = checkpoint.get("processed", 0)
+        except Exception as e:
+            logger.warning("Ignoring unreadable checkpoint %s: %s", self.checkpoint_path, e)
+
+    def _save_checkpoint(self, search_after: List[Any]):
+        if not self.checkpoint_path:
+            return
+        checkpoint = {
+            "index": self.index,
+            "status": self.status,
+            "search_after": search_after,
+            "processed": self.processed
+        }
+        temp_path = f"{self.checkpoint_path}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump(checkpoint, f)
+        os.replace(temp_path, self.checkpoint_path)
+
+    def _clear_checkpoint(self):
+        if self.checkpoint_path and os.path.exists(self.checkpoint_path):
+            os.remove(self.checkpoint_path)
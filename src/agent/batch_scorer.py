@@ -0,0 +1,135 @@
+from typing import Any, Callable, Dict, List, Tuple
+
+import numpy as np
+
+PLAN_MULTIPLIERS = {
+    'enterprise': 2.0,
+    'business': 1.5,
+    'pro': 1.0,
+    'free': 0.5
+}
+
+TEAM_MAPPING = {
+    'technical': 'engineering',
+    'billing': 'billing',
+    'account': 'success',
+    'feature': 'product'
+}
+
+PRIORITY_LEVELS = ('low', 'medium', 'high', 'critical')
+PRIORITY_THRESHOLDS = (25, 50, 75)
+REVIEW_CONFIDENCE = 0.7
+KEYWORD_CONFIDENCE = 0.6
+
+def priority_level(priority_score: int) -> str:
+    return PRIORITY_LEVELS[int(np.searchsorted(PRIORITY_THRESHOLDS, priority_score, side="right"))]
+
+def _priority_scores(analyses: List[Dict], contexts: List[Dict]) -> Tuple[np.ndarray, List[str], List[float]]:
+    urgency = np.fromiter((len(a['urgency_keywords']) for a in analyses), dtype=np.int64, count=len(analyses))
+    sentiment = np.array([a['sentiment'] for a in analyses])
+    plans = [c['customer_history'].get('plan', 'free') for c in contexts]
+    satisfaction = [c['customer_history'].get('satisfaction_score', 3.0) for c in contexts]
+
+    scores = urgency * 15 + np.where(sentiment == 'negative', 20, np.where(sentiment == 'positive', -5, 0))
+    multipliers = np.fromiter((PLAN_MULTIPLIERS[plan] for plan in plans), dtype=np.float64, count=len(plans))
+    scores = np.trunc(scores * multipliers).astype(np.int64)
+    scores += np.where(np.asarray(satisfaction, dtype=np.float64) < 3.0, 15, 0)
+    return np.minimum(scores, 100), plans, satisfaction
+
+def _category_votes(contexts: List[Dict]) -> Tuple[List[str], np.ndarray, np.ndarray, np.ndarray, List[str]]:
+    columns: Dict[str, int] = {}
+    rows, categories, counts, positions = [], [], [], []
+    totals, sources = [], []
+
+    for row, context in enumerate(contexts):
+        prior = context.get('subject_prior')
+        if prior:
+            voted = list(prior['categories'])
+            counts.extend(prior['categories'].values())
+            totals.append(prior['count'])
+            sources.append('subject_prior')
+        elif context.get('esql_votes'):
+            voted = list(context['esql_votes'])
+            counts.extend(context['esql_votes'].values())
+            totals.append(sum(context['esql_votes'].values()))
+            sources.append('esql')
+        else:
+            voted = [similar['category'] for similar in context['similar_tickets']]
+            counts.extend([1] * len(voted))
+            totals.append(len(voted))
+            sources.append('similar_tickets')
+        rows.extend([row] * len(voted))
+        categories.extend(voted)
+        positions.extend(range(len(voted)))
+
+    for category in categories:
+        if category not in columns:
+            columns[category] = len(columns)
+    cols = [columns[category] for category in categories]
+
+    shape = (len(contexts), max(len(columns), 1))
+    vote_matrix = np.zeros(shape, dtype=np.int64)
+    first_seen = np.full(shape, len(positions), dtype=np.int64)
+    if rows:
+        np.add.at(vote_matrix, (rows, cols), counts)
+        np.minimum.at(first_seen, (rows, cols), positions)
+    return list(columns), vote_matrix, first_seen, np.asarray(totals, dtype=np.int64), sources
+
+def score_batch(tickets: List[Dict], analyses: List[Dict], contexts: List[Dict], team_workload: Dict[str, int],
+                classify: Callable[[Dict], str]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    if not tickets:
+        return [], []
+
+    priority_scores, plans, satisfaction = _priority_scores(analyses, contexts)
+    categories, votes, first_seen, totals, sources = _category_votes(contexts)
+
+    ranking = votes * (first_seen.max() + 1) - first_seen
+    winners = ranking.argmax(axis=1)
+    winning_votes = votes[np.arange(len(tickets)), winners]
+    has_votes = votes.any(axis=1)
+    confidence = np.where(has_votes, winning_votes / np.maximum(totals, 1), KEYWORD_CONFIDENCE)
+
+    levels = np.searchsorted(PRIORITY_THRESHOLDS, priority_scores, side="right")
+    needs_review = (confidence < REVIEW_CONFIDENCE) | (levels == len(PRIORITY_LEVELS) - 1)
+
+    columns = zip(priority_scores.tolist(), confidence.tolist(), levels.tolist(), needs_review.tolist(),
+                  has_votes.tolist(), winners.tolist(), sources)
+
+    esql_analyses, decisions = [], []
+    for row, (ticket, analysis, context, (priority_score, category_confidence, level, review, voted, winner,
+                                           source)) in enumerate(zip(tickets, analyses, contexts, columns)):
+        if voted:
+            category = categories[winner]
+        else:
+            category = classify(ticket)
+            source = 'keywords'
+        team = TEAM_MAPPING.get(category, 'support')
+        factors = {
+            'urgency_keywords': len(analysis['urgency_keywords']),
+            'sentiment': analysis['sentiment'],
+            'customer_plan': plans[row],
+            'customer_satisfaction': satisfaction[row]
+        }
+        esql_analyses.append({
+            'priority_score': priority_score,
+            'predicted_category': category,
+            'category_confidence': category_confidence,
+            'recommended_team': team,
+            'category_source': source,
+            'team_workload': team_workload,
+            'factors': factors
+        })
+        decisions.append({
+            'category': category,
+            'priority': PRIORITY_LEVELS[level],
+            'assigned_team': team,
+            'confidence': category_confidence,
+            'needs_human_review': review,
+            'reasoning': {
+                'priority_factors': factors,
+                'similar_tickets_used': len(context['similar_tickets']),
+                'subject_prior_tickets': context['subject_prior']['count'] if context.get('subject_prior') else 0,
+                'kb_articles_found': len(context['kb_articles'])
+            }
+        })
+    return esql_analyses, decisions
@@ -0,0 +1,154 @@
+import atexit
+import logging
+import threading
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from elasticsearch import Elasticsearch, helpers
+
+logger = logging.getLogger(__name__)
+
+WriteCallback = Callable[[bool, Dict[str, Any]], None]
+
+class WorkflowWriteBuffer:
+
+    def __init__(self, es_client: Elasticsearch, max_actions: int = 500, flush_interval: float = 1.0,
+                 max_chunk_bytes: int = 10 * 1024 * 1024, max_retries: int = 2):
+        self.es = es_client
+        self.max_actions = max_actions
+        self.flush_interval = flush_interval
+        self.max_chunk_bytes = max_chunk_bytes
+        self.max_retries = max_retries
+        self.flush_count = 0
+        self.written = 0
+        self.failed = 0
+        self._pending: List[Tuple[Dict[str, Any], Optional[WriteCallback]]] = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._closed = threading.Event()
+        self._flusher = None
+
+        if flush_interval and flush_interval > 0:
+            self._flusher = threading.Thread(target=self._flush_periodically, name="workflow-bulk-flush", daemon=True)
+            self._flusher.start()
+        atexit.register(self.close)
+
+    def add(self, action: Dict[str, Any], callback: Optional[WriteCallback] = None):
+        if self._closed.is_set():
+            raise RuntimeError("WorkflowWriteBuffer is closed")
+        if "_id" not in action:
+            raise ValueError("Buffered workflow writes need an explicit _id")
+
+        with self._lock:
+            self._pending.append((action, callback))
+            full = len(self._pending) >= self.max_actions
+        if full:
+            self.flush()
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def flush(self) -> Tuple[int, int]:
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, []
+            if not batch:
+                return 0, 0
+
+            written = failed = 0
+            for round_batch in _unique_rounds(batch):
+                round_written, round_failed = self._write(round_batch)
+                written += round_written
+                failed += round_failed
+
+            self.flush_count += 1
+            self.written += written
+            self.failed += failed
+            return written, failed
+
+    def _write(self, batch: List[Tuple[Dict[str, Any], Optional[WriteCallback]]]) -> Tuple[int, int]:
+        callbacks = {_action_key(action): callback for action, callback in batch}
+        written = failed = 0
+        try:
+            results = helpers.streaming_bulk(
+                self.es,
+                (action for action, _ in batch),
+                chunk_size=max(len(batch), 1),
+                max_chunk_bytes=self.max_chunk_bytes,
+                max_retries=self.max_retries,
+                raise_on_error=False,
+                raise_on_exception=False
+            )
+            for ok, item in results:
+                op_type, details = next(iter(item.items()))
+                self._notify(callbacks.pop((op_type, str(details.get("_id"))), None), ok, item)
+                if ok:
+                    written += 1
+                else:
+                    failed += 1
+        except Exception as e:
+            logger.warning("Error flushing workflow writes: %s", e)
+            for callback in callbacks.values():
+                self._notify(callback, False, {"error": str(e)})
+                failed += 1
+            callbacks.clear()
+        for callback in callbacks.values():
+            self._notify(callback, False, {"error": "no bulk response for this action"})
+            failed += 1
+        return written, failed
+
+    def close(self):
+        if self._closed.is_set():
+            return
+        self._closed.set()
+        if self._flusher is not None:
+            self._flusher.join()
+        self.flush()
+        atexit.unregister(self.close)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _flush_periodically(self):
+        while not self._closed.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                logger.warning("Error flushing workflow writes: %s", e)
+
+    def _notify(self, callback: Optional[WriteCallback], ok: bool, item: Dict[str, Any]):
+        if callback is None:
+            return
+        try:
+            callback(ok, item)
+        except Exception as e:
+            logger.warning("Error in bulk write callback: %s", e)
+
+def _action_key(action: Dict[str, Any]) -> Tuple[str, str]:
+    return action.get("_op_type", "index"), str(action["_id"])
+
+def _unique_rounds(batch: List[Tuple[Dict[str, Any], Optional[WriteCallback]]]):
+    rounds: List[List[Tuple[Dict[str, Any], Optional[WriteCallback]]]] = []
+    seen: Dict[Tuple[str, str], int] = defaultdict(int)
+    for entry in batch:
+        key = _action_key(entry[0])
+        if seen[key] == len(rounds):
+            rounds.append([])
+        rounds[seen[key]].append(entry)
+        seen[key] += 1
+    return rounds
+
+def bulk_item_error(item: Dict[str, Any]) -> str:
+    if "error" in item and not isinstance(item["error"], dict):
+        return str(item["error"])
+    for details in item.values():
+        if isinstance(details, dict) and "error" in details:
+            error = details["error"]
+            if isinstance(error, dict):
+                return f"{error.get('type', 'error')}: {error.get('reason', '')}"
+            return str(error)
+    return "unknown bulk error"
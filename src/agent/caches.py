@@ -0,0 +1,173 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+class TeamWorkloadSnapshot:
+
+    def __init__(self, loader: Callable[[], Dict[str, int]], ttl_seconds: float = 30.0,
+                 refresh_ahead_seconds: float = 5.0, counted_status: str = "open"):
+        self._loader = loader
+        self.ttl_seconds = ttl_seconds
+        self.refresh_ahead_seconds = min(refresh_ahead_seconds, ttl_seconds)
+        self.counted_status = counted_status
+        self.load_count = 0
+        self._workload: Optional[Dict[str, int]] = None
+        self._loaded_at = 0.0
+        self._refreshing = False
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+
+    def get(self) -> Dict[str, int]:
+        with self._lock:
+            if self._workload is not None:
+                age = time.monotonic() - self._loaded_at
+                if age < self.ttl_seconds:
+                    if age >= self.ttl_seconds - self.refresh_ahead_seconds and not self._refreshing:
+                        self._refreshing = True
+                        threading.Thread(target=self._refresh_ahead, daemon=True).start()
+                    return dict(self._workload)
+
+        with self._load_lock:
+            with self._lock:
+                if self._workload is not None and time.monotonic() - self._loaded_at < self.ttl_seconds:
+                    return dict(self._workload)
+            return self._load()
+
+    def peek(self, allow_stale: bool = False) -> Optional[Dict[str, int]]:
+        with self._lock:
+            if self._workload is None:
+                return None
+            if not allow_stale and time.monotonic() - self._loaded_at >= self.ttl_seconds:
+                return None
+            return dict(self._workload)
+
+    def store(self, workload: Dict[str, int]):
+        with self._lock:
+            self.load_count += 1
+            self._workload = dict(workload)
+            self._loaded_at = time.monotonic()
+
+    def invalidate(self):
+        with self._lock:
+            self._workload = None
+
+    def record_transition(self, from_team: Optional[str], from_status: Optional[str],
+                          to_team: Optional[str], to_status: Optional[str]):
+        with self._lock:
+            if self._workload is None:
+                return
+            if from_status == self.counted_status and from_team:
+                remaining = self._workload.get(from_team, 0) - 1
+                if remaining > 0:
+                    self._workload[from_team] = remaining
+                else:
+                    self._workload.pop(from_team, None)
+            if to_status == self.counted_status and to_team:
+                self._workload[to_team] = self._workload.get(to_team, 0) + 1
+
+    def _refresh_ahead(self):
+        try:
+            with self._load_lock:
+                self._load()
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+    def _load(self) -> Dict[str, int]:
+        try:
+            workload = self._loader()
+        except Exception as e:
+            logger.warning("Error getting team workload: %s", e)
+            with self._lock:
+                return dict(self._workload) if self._workload is not None else {}
+
+        self.store(workload)
+        return dict(workload)
+
+class CustomerContextCache:
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 60.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.partial_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, customer_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(customer_id)
+            if entry is None or time.monotonic() >= entry["expires_at"]:
+                if entry is not None:
+                    del self._entries[customer_id]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(customer_id)
+            if entry["past_tickets"] is None:
+                self.partial_hits += 1
+            else:
+                self.hits += 1
+            return {"profile": entry["profile"], "past_tickets": entry["past_tickets"]}
+
+    def put(self, customer_id: str, profile: Dict[str, Any], past_tickets: Optional[List[Dict]] = None):
+        if self.max_entries <= 0 or self.ttl_seconds <= 0:
+            return
+
+        with self._lock:
+            self._entries[customer_id] = {
+                "profile": profile,
+                "past_tickets": past_tickets,
+                "expires_at": time.monotonic() + self.ttl_seconds
+            }
+            self._entries.move_to_end(customer_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def update_tickets(self, customer_id: str, past_tickets: List[Dict]):
+        with self._lock:
+            entry = self._entries.get(customer_id)
+            if entry is not None:
+                entry["past_tickets"] = past_tickets
+
+    def update_profile(self, customer_id: str, profile: Dict[str, Any]):
+        with self._lock:
+            entry = self._entries.get(customer_id)
+            if entry is not None:
+                entry["profile"] = profile
+
+    def invalidate(self, customer_id: str, tickets_only: bool = False):
+        with self._lock:
+            entry = self._entries.get(customer_id)
+            if entry is None:
+                return
+            self.invalidations += 1
+            if tickets_only:
+                entry["past_tickets"] = None
+            else:
+                del self._entries[customer_id]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.partial_hits + self.misses
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "partial_hits": self.partial_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "hit_rate": (self.hits + self.partial_hits) / lookups if lookups else 0.0
+            }
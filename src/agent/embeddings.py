@@ -0,0 +1,95 @@
+import logging
+import os
+import re
+import zlib
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_DIMS = int(os.getenv('TRIAGE_EMBEDDING_DIMS', '384'))
+
+TICKET_VECTOR_FIELD = "text_vector"
+KB_VECTOR_FIELD = "content_vector"
+
+TICKET_TEXT_FIELDS = ("subject", "description")
+KB_TEXT_FIELDS = ("title", "content")
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+def vector_mapping(dims: int) -> Dict[str, Any]:
+    return {
+        "type": "dense_vector",
+        "dims": dims,
+        "index": True,
+        "similarity": "cosine",
+        "index_options": {"type": "hnsw", "m": 16, "ef_construction": 100}
+    }
+
+def embedding_text(doc: Dict[str, Any], fields: Sequence[str]) -> str:
+    return " ".join(str(doc.get(field) or "") for field in fields).strip()
+
+class HashingEmbedder:
+
+    def __init__(self, dims: int = EMBEDDING_DIMS, batch_size: int = 256):
+        self.dims = dims
+        self.batch_size = batch_size
+
+    def encode(self, texts: Sequence[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dims), dtype=np.float32)
+        for row, text in enumerate(texts):
+            tokens = _TOKEN.findall(str(text).lower())
+            features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+            for feature in features:
+                digest = zlib.crc32(feature.encode("utf-8"))
+                vectors[row, digest % self.dims] += 1.0 if digest & 0x80000000 else -1.0
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms == 0, 1.0, norms)
+
+class SentenceTransformerEmbedder:
+
+    def __init__(self, model_name: str = "sentence-transformers/all-MiniLM-L6-v2", batch_size: int = 64,
+                 device: str = "cpu"):
+        try:
+            from sentence_transformers import SentenceTransformer
+        except ImportError as e:
+            raise ImportError("SentenceTransformerEmbedder requires 'pip install sentence-transformers'") from e
+        self.model = SentenceTransformer(model_name, device=device)
+        self.dims = self.model.get_sentence_embedding_dimension()
+        self.batch_size = batch_size
+
+    def encode(self, texts: Sequence[str]) -> np.ndarray:
+        return self.model.encode(
+            list(texts),
+            batch_size=self.batch_size,
+            normalize_embeddings=True,
+            convert_to_numpy=True,
+            show_progress_bar=False
+        ).astype(np.float32)
+
+def load_embedder(kind: Optional[str] = None):
+    kind = (kind or os.getenv('TRIAGE_EMBEDDER', 'none')).lower()
+    if kind == "none":
+        return None
+    if kind == "hashing":
+        return HashingEmbedder()
+    if kind == "sentence-transformers":
+        return SentenceTransformerEmbedder(os.getenv('TRIAGE_EMBEDDING_MODEL', 'sentence-transformers/all-MiniLM-L6-v2'))
+    raise ValueError(f"Unknown embedder '{kind}' (expected none, hashing or sentence-transformers)")
+
+def embed_documents(docs: Iterable[Dict[str, Any]], embedder, fields: Sequence[str], target_field: str,
+                    batch_size: int = 256) -> Iterator[Dict[str, Any]]:
+    batch: List[Dict[str, Any]] = []
+    for doc in docs:
+        batch.append(doc)
+        if len(batch) >= batch_size:
+            yield from _embed_batch(batch, embedder, fields, target_field)
+            batch = []
+    if batch:
+        yield from _embed_batch(batch, embedder, fields, target_field)
+
+def _embed_batch(batch: List[Dict[str, Any]], embedder, fields: Sequence[str],
+                 target_field: str) -> List[Dict[str, Any]]:
+    vectors = embedder.encode([embedding_text(doc, fields) for doc in batch])
+    return [dict(doc, **{target_field: vector.tolist()}) for doc, vector in zip(batch, vectors)]
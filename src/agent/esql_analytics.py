@@ -0,0 +1,98 @@
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from elasticsearch import ApiError, Elasticsearch
+
+logger = logging.getLogger(__name__)
+
+UNSUPPORTED_STATUSES = (404, 405, 410)
+
+class EsqlAnalytics:
+
+    def __init__(self, es_client: Elasticsearch, index: str = "support_tickets", open_status: str = "open",
+                 vote_status: str = "resolved", max_rows: int = 10000):
+        self.es = es_client
+        self.index = index
+        self.open_status = open_status
+        self.vote_status = vote_status
+        self.max_rows = max_rows
+        self.available = True
+        self.queries = 0
+
+    def build_query(self, subjects: List[str], customer_ids: List[str]) -> Tuple[str, List[Dict[str, Any]]]:
+        params: List[Dict[str, Any]] = [{"vote_status": self.vote_status}]
+
+        def in_list(prefix: str, values: List[str]) -> str:
+            names = []
+            for position, value in enumerate(values):
+                params.append({f"{prefix}{position}": value})
+                names.append(f"?{prefix}{position}")
+            return ", ".join(names)
+
+        vote_condition = f"status == ?vote_status AND subject.keyword IN ({in_list('s', subjects)})" \
+            if subjects else "false"
+        customer_condition = f"customer_id IN ({in_list('c', customer_ids)})" if customer_ids else "false"
+
+        query = "\n".join([
+            f"FROM {self.index}",
+            f"| WHERE ({vote_condition}) OR {customer_condition}",
+            f"| EVAL vote_subject = CASE({vote_condition}, subject.keyword, null),"
+            f" vote_category = CASE({vote_condition}, category, null),"
+            f" customer = CASE({customer_condition}, customer_id, null),"
+            f" customer_status = CASE({customer_condition}, status, null)",
+            "| STATS tickets = COUNT(*) BY vote_subject, vote_category, customer, customer_status",
+            f"| LIMIT {self.max_rows}"
+        ])
+        return query, params
+
+    def batch_stats(self, tickets: List[Dict[str, Any]]) -> Optional[List[Dict[str, Any]]]:
+        if not self.available or not tickets:
+            return None
+
+        subjects = sorted({t["subject"] for t in tickets if t.get("subject")})
+        customer_ids = sorted({t["customer_id"] for t in tickets if t.get("customer_id")})
+        query, params = self.build_query(subjects, customer_ids)
+        try:
+            response = self.es.esql.query(query=query, params=params)
+            self.queries += 1
+        except ApiError as e:
+            if e.meta.status in UNSUPPORTED_STATUSES:
+                self.available = False
+                logger.warning("ES|QL is not available, using Python analytics: %s", e)
+            else:
+                logger.warning("Error running ES|QL analytics: %s", e)
+            return None
+        except Exception as e:
+            logger.warning("Error running ES|QL analytics: %s", e)
+            return None
+
+        if len(response["values"]) >= self.max_rows:
+            logger.warning("ES|QL analytics returned %d rows, the LIMIT may have truncated the batch; "
+                           "using Python analytics", len(response["values"]))
+            return None
+
+        votes: Dict[str, Dict[str, int]] = {}
+        customers: Dict[str, Dict[str, int]] = {}
+        names = [column["name"] for column in response["columns"]]
+        for values in response["values"]:
+            row = dict(zip(names, values))
+            count = row["tickets"]
+            if row["vote_subject"] is not None and row["vote_category"] is not None:
+                subject_votes = votes.setdefault(row["vote_subject"], {})
+                subject_votes[row["vote_category"]] = subject_votes.get(row["vote_category"], 0) + count
+            if row["customer"] is not None:
+                customer = customers.setdefault(row["customer"], {"total_tickets": 0, "open_tickets": 0})
+                customer["total_tickets"] += count
+                if row["customer_status"] == self.open_status:
+                    customer["open_tickets"] += count
+
+        return [
+            {
+                "category_votes": _ranked(votes.get(ticket.get("subject"), {})),
+                "customer": customers.get(ticket.get("customer_id")) if ticket.get("customer_id") else None
+            }
+            for ticket in tickets
+        ]
+
+def _ranked(votes: Dict[str, int]) -> Dict[str, int]:
+    return dict(sorted(votes.items(), key=lambda item: (-item[1], item[0])))
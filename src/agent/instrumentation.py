@@ -0,0 +1,96 @@
+import contextvars
+import math
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from typing import Deque, Dict, Iterator, List, Optional
+
+_current_timer: contextvars.ContextVar[Optional["StageTimer"]] = contextvars.ContextVar("triage_stage_timer", default=None)
+
+class StageTimer:
+
+    def __init__(self):
+        self.timings: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def current() -> Optional["StageTimer"]:
+        return _current_timer.get()
+
+    @contextmanager
+    def activate(self) -> Iterator["StageTimer"]:
+        token = _current_timer.set(self)
+        try:
+            yield self
+        finally:
+            _current_timer.reset(token)
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, (time.perf_counter() - start) * 1000)
+
+    def add(self, name: str, elapsed_ms: float):
+        with self._lock:
+            self.timings[name] = self.timings.get(name, 0.0) + elapsed_ms
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            return {name: round(ms, 3) for name, ms in self.timings.items()}
+
+@contextmanager
+def timed(stage: str) -> Iterator[None]:
+    timer = _current_timer.get()
+    if timer is None:
+        yield
+        return
+    with timer.stage(stage):
+        yield
+
+class MetricsSink:
+
+    def observe(self, timings: Dict[str, float]):
+        pass
+
+class LatencyHistogram(MetricsSink):
+
+    def __init__(self, window: int = 10000):
+        self.window = window
+        self._samples: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=self.window))
+        self._counts: Dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def observe(self, timings: Dict[str, float]):
+        with self._lock:
+            for stage, elapsed_ms in timings.items():
+                self._samples[stage].append(elapsed_ms)
+                self._counts[stage] += 1
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            stages = {stage: (sorted(samples), self._counts[stage]) for stage, samples in self._samples.items()}
+        return {
+            stage: {
+                "count": count,
+                "p50": _quantile(samples, 0.5),
+                "p95": _quantile(samples, 0.95),
+                "p99": _quantile(samples, 0.99),
+                "max": samples[-1] if samples else 0.0
+            }
+            for stage, (samples, count) in stages.items()
+        }
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+            self._counts.clear()
+
+def _quantile(samples: List[float], q: float) -> float:
+    if not samples:
+        return 0.0
+    rank = max(1, math.ceil(q * len(samples)))
+    return samples[rank - 1]
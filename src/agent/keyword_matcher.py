@@ -0,0 +1,85 @@
+import re
+from typing import Dict, FrozenSet, Iterable, List, Set
+
+class KeywordMatcher:
+
+    def __init__(self, vocabularies: Dict[str, Iterable[str]], scan_threshold: int = 256,
+                 token_cache_size: int = 65536):
+        self.vocabularies = {name: [term.lower() for term in terms] for name, terms in vocabularies.items()}
+        self.scan_threshold = scan_threshold
+        self.token_cache_size = token_cache_size
+        self._token_cache: Dict[str, FrozenSet[str]] = {}
+
+        self._terms = {term for group in self.vocabularies.values() for term in group}
+        terms = {term for term in self._terms if term.strip()}
+        self._words = {term for term in terms if len(term.split()) == 1 and term == term.strip()}
+        self._phrases = {term: term.split() for term in terms if term not in self._words}
+
+        scan_terms = self._words | {part for parts in self._phrases.values() for part in parts}
+        self._pattern = re.compile(f"(?=({_trie_pattern(scan_terms)}))")
+        self._prefixes = {
+            term: [other for other in scan_terms if term.startswith(other)]
+            for term in scan_terms
+        }
+
+    def find(self, text: str) -> Set[str]:
+        lowered = text.lower()
+        if len(lowered) <= self.scan_threshold:
+            return {term for term in self._terms if term in lowered}
+        return self._scan(lowered)
+
+    def match(self, text: str) -> Dict[str, List[str]]:
+        lowered = text.lower()
+        if len(lowered) <= self.scan_threshold:
+            return {
+                name: [term for term in terms if term in lowered]
+                for name, terms in self.vocabularies.items()
+            }
+
+        hits = self._scan(lowered)
+        return {
+            name: [term for term in terms if term in hits]
+            for name, terms in self.vocabularies.items()
+        }
+
+    def _scan(self, lowered: str) -> Set[str]:
+        found = set()
+        cache = self._token_cache
+        for token in set(lowered.split()):
+            token_hits = cache.get(token)
+            if token_hits is None:
+                token_hits = self._token_hits(token)
+            if token_hits:
+                found |= token_hits
+
+        hits = found & self._words
+        for phrase, parts in self._phrases.items():
+            if all(part in found for part in parts) and phrase in lowered:
+                hits.add(phrase)
+        return hits
+
+    def _token_hits(self, token: str) -> FrozenSet[str]:
+        token_hits = frozenset(
+            term for longest in self._pattern.findall(token) for term in self._prefixes[longest]
+        )
+        if len(self._token_cache) >= self.token_cache_size:
+            self._token_cache.clear()
+        self._token_cache[token] = token_hits
+        return token_hits
+
+def _trie_pattern(terms: Iterable[str]) -> str:
+    trie: Dict = {}
+    for term in terms:
+        node = trie
+        for char in term:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node: Dict) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+        return f"(?:{body})?" if "" in node else body
+
+    return build(trie)
@@ -0,0 +1,281 @@
+import json
+import logging
+import os
+import sys
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+from elasticsearch import Elasticsearch
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from agent.backlog import scan_tickets
+from agent.embeddings import TICKET_TEXT_FIELDS, TICKET_VECTOR_FIELD, HashingEmbedder, embedding_text, load_embedder
+from agent.snapshot_sync import ChangeFeed
+
+logger = logging.getLogger(__name__)
+
+INT8_SCALE = 127.0
+
+_VECTORS_FILE = "vectors.npy"
+_META_FILE = "metadata.json"
+
+class LocalSimilarityIndex:
+
+    def __init__(self, vectors: np.ndarray, metadata: Dict[str, List[Any]], embedder, embedder_kind: str = "hashing",
+                 chunk_rows: int = 65536, watermark: Optional[List[Any]] = None, compact_ratio: float = 0.25):
+        self.vectors = vectors
+        self.metadata = metadata
+        self.embedder = embedder
+        self.embedder_kind = embedder_kind
+        self.chunk_rows = chunk_rows
+        self.watermark = watermark
+        self.compact_ratio = compact_ratio
+        self.quantized = vectors.dtype == np.int8
+        self.lookups = 0
+        self.compactions = 0
+        self._base_rows = vectors.shape[0]
+        self._delta_vectors = np.zeros((0, vectors.shape[1]), dtype=vectors.dtype)
+        self._delta_metadata: Dict[str, List[Any]] = {field: [] for field in METADATA_FIELDS}
+        self._live = np.ones(self._base_rows, dtype=bool)
+        self._row_of: Optional[Dict[str, int]] = None
+        self._lock = threading.Lock()
+
+    @property
+    def dims(self) -> int:
+        return self.vectors.shape[1]
+
+    def __len__(self) -> int:
+        return int(self._live.sum())
+
+    def search(self, ticket: Dict[str, Any], k: int = 5, query_vector: Optional[Sequence[float]] = None) -> List[Dict]:
+        vectors = None if query_vector is None or len(query_vector) != self.dims \
+            else np.asarray([query_vector], dtype=np.float32)
+        return self.search_batch([ticket], k, vectors)[0]
+
+    def search_batch(self, tickets: List[Dict[str, Any]], k: int = 5,
+                     query_vectors: Optional[np.ndarray] = None) -> List[List[Dict]]:
+        if not tickets:
+            return []
+        if query_vectors is None:
+            query_vectors = self.embedder.encode([embedding_text(ticket, TICKET_TEXT_FIELDS) for ticket in tickets])
+        with self._lock:
+            self.lookups += len(tickets)
+            vectors, metadata = self.vectors, self.metadata
+            delta_vectors, delta_metadata, live = self._delta_vectors, self._delta_metadata, self._live
+
+        k = min(k, int(live.sum()))
+        if k == 0:
+            return [[] for _ in tickets]
+
+        scores = self._scores(np.asarray(query_vectors, dtype=np.float32), vectors, delta_vectors)
+        scores[~live] = -np.inf
+        results = []
+        for column in range(scores.shape[1]):
+            column_scores = scores[:, column]
+            top = np.argpartition(-column_scores, k - 1)[:k]
+            top = top[np.argsort(-column_scores[top], kind="stable")]
+            results.append([_hit(metadata, delta_metadata, len(vectors), int(row), float(column_scores[row]))
+                            for row in top])
+        return results
+
+    def _scores(self, query_vectors: np.ndarray, vectors: np.ndarray, delta_vectors: np.ndarray) -> np.ndarray:
+        queries = query_vectors.T
+        if self.quantized:
+            queries = queries / INT8_SCALE
+        base_rows = len(vectors)
+        scores = np.empty((base_rows + len(delta_vectors), query_vectors.shape[0]), dtype=np.float32)
+        for start in range(0, base_rows, self.chunk_rows):
+            chunk = vectors[start:start + self.chunk_rows]
+            scores[start:start + len(chunk)] = chunk.astype(np.float32) @ queries
+        if len(delta_vectors):
+            scores[base_rows:] = delta_vectors.astype(np.float32) @ queries
+        return scores
+
+    def apply_changes(self, tickets: List[Dict[str, Any]], reuse_stored_vectors: bool = False) -> Dict[str, int]:
+        resolved = [t for t in tickets if t.get("status") == "resolved"]
+        vectors = _encode(resolved, self.embedder, reuse_stored_vectors)
+        if self.quantized:
+            vectors = quantize(vectors)
+
+        with self._lock:
+            if self._row_of is None:
+                self._row_of = {ticket_id: row for row, ticket_id in enumerate(self.metadata["ticket_id"])}
+            live = self._live.copy()
+            removed = 0
+            for ticket in tickets:
+                row = self._row_of.pop(ticket["ticket_id"], None)
+                if row is not None:
+                    live[row] = False
+                    removed += ticket.get("status") != "resolved"
+
+            first_row = len(live)
+            _append_metadata(self._delta_metadata, resolved)
+            for offset, ticket in enumerate(resolved):
+                self._row_of[ticket["ticket_id"]] = first_row + offset
+            self._delta_vectors = np.vstack([self._delta_vectors, vectors]) if len(resolved) else self._delta_vectors
+            self._live = np.concatenate([live, np.ones(len(resolved), dtype=bool)])
+            if self._needs_compaction():
+                self._compact()
+
+        return {"upserted": len(resolved), "removed": removed}
+
+    def _needs_compaction(self) -> bool:
+        overlay = len(self._delta_vectors) + self._base_rows - int(self._live[:self._base_rows].sum())
+        return overlay > 0 and overlay >= self.compact_ratio * max(self._base_rows, 1)
+
+    def _live_rows(self):
+        rows = np.flatnonzero(self._live)
+        base_rows = rows[rows < self._base_rows]
+        delta_rows = rows[rows >= self._base_rows] - self._base_rows
+        vectors = np.concatenate([np.asarray(self.vectors[base_rows]), self._delta_vectors[delta_rows]])
+        metadata = {
+            field: [self.metadata[field][row] for row in base_rows] +
+                   [self._delta_metadata[field][row] for row in delta_rows]
+            for field in METADATA_FIELDS
+        }
+        return vectors, metadata
+
+    def _compact(self):
+        self.vectors, self.metadata = self._live_rows()
+        self._base_rows = self.vectors.shape[0]
+        self._delta_vectors = np.zeros((0, self.dims), dtype=self.vectors.dtype)
+        self._delta_metadata = {field: [] for field in METADATA_FIELDS}
+        self._live = np.ones(self._base_rows, dtype=bool)
+        self._row_of = None
+        self.compactions += 1
+
+    def compacted(self) -> "LocalSimilarityIndex":
+        with self._lock:
+            vectors, metadata = self._live_rows()
+        return LocalSimilarityIndex(vectors, metadata, self.embedder, embedder_kind=self.embedder_kind,
+                                    chunk_rows=self.chunk_rows, watermark=self.watermark,
+                                    compact_ratio=self.compact_ratio)
+
+    def save(self, directory: str):
+        snapshot = self.compacted() if len(self._delta_vectors) or not self._live.all() else self
+        os.makedirs(directory, exist_ok=True)
+        tmp_vectors = os.path.join(directory, f"{_VECTORS_FILE}.tmp")
+        with open(tmp_vectors, "wb") as f:
+            np.save(f, np.ascontiguousarray(snapshot.vectors))
+        tmp_meta = os.path.join(directory, f"{_META_FILE}.tmp")
+        with open(tmp_meta, "w") as f:
+            json.dump({
+                "embedder": self.embedder_kind,
+                "dims": self.dims,
+                "dtype": str(self.vectors.dtype),
+                "count": len(snapshot),
+                "watermark": self.watermark,
+                "columns": snapshot.metadata
+            }, f)
+        os.replace(tmp_vectors, os.path.join(directory, _VECTORS_FILE))
+        os.replace(tmp_meta, os.path.join(directory, _META_FILE))
+
+    @classmethod
+    def load(cls, directory: str, embedder=None, embedder_kind: Optional[str] = None,
+             mmap: bool = True, compact_ratio: float = 0.25) -> "LocalSimilarityIndex":
+        with open(os.path.join(directory, _META_FILE)) as f:
+            meta = json.load(f)
+        vectors = np.load(os.path.join(directory, _VECTORS_FILE), mmap_mode="r" if mmap else None)
+        if embedder is None or embedder_kind != meta["embedder"] or embedder.dims != meta["dims"]:
+            embedder = HashingEmbedder(dims=meta["dims"]) if meta["embedder"] == "hashing" \
+                else load_embedder(meta["embedder"])
+        return cls(vectors, meta["columns"], embedder, embedder_kind=meta["embedder"],
+                   watermark=meta.get("watermark"), compact_ratio=compact_ratio)
+
+METADATA_FIELDS = ("ticket_id", "subject", "category", "priority", "resolution_time_minutes")
+
+def _hit(metadata: Dict[str, List[Any]], delta_metadata: Dict[str, List[Any]], base_rows: int, row: int,
+         score: float) -> Dict[str, Any]:
+    columns, offset = (metadata, row) if row < base_rows else (delta_metadata, row - base_rows)
+    return {
+        "ticket_id": columns["ticket_id"][offset],
+        "subject": columns["subject"][offset],
+        "category": columns["category"][offset],
+        "priority": columns["priority"][offset],
+        "resolution_time": columns["resolution_time_minutes"][offset],
+        "score": score
+    }
+
+def _append_metadata(columns: Dict[str, List[Any]], tickets: Sequence[Dict[str, Any]]):
+    for field in METADATA_FIELDS:
+        columns[field].extend(ticket.get(field) for ticket in tickets)
+
+def _encode(tickets: List[Dict[str, Any]], embedder, reuse_stored_vectors: bool = True) -> np.ndarray:
+    vectors = np.zeros((len(tickets), embedder.dims), dtype=np.float32)
+    missing = []
+    for row, ticket in enumerate(tickets):
+        stored = ticket.get(TICKET_VECTOR_FIELD) if reuse_stored_vectors else None
+        if stored is not None and len(stored) == embedder.dims:
+            vectors[row] = stored
+        else:
+            missing.append(row)
+    if missing:
+        vectors[missing] = embedder.encode([embedding_text(tickets[row], TICKET_TEXT_FIELDS) for row in missing])
+    return vectors
+
+def quantize(vectors: np.ndarray) -> np.ndarray:
+    return np.clip(np.rint(vectors * INT8_SCALE), -127, 127).astype(np.int8)
+
+def build_local_index(tickets: Iterable[Dict[str, Any]], embedder, embedder_kind: str = "hashing",
+                      quantized: bool = False, batch_size: int = 1000,
+                      reuse_stored_vectors: bool = True) -> LocalSimilarityIndex:
+    blocks = []
+    columns: Dict[str, List[Any]] = {field: [] for field in METADATA_FIELDS}
+    batch: List[Dict[str, Any]] = []
+    for ticket in tickets:
+        batch.append(ticket)
+        if len(batch) >= batch_size:
+            blocks.append(_encode(batch, embedder, reuse_stored_vectors))
+            _append_metadata(columns, batch)
+            batch = []
+    if batch:
+        blocks.append(_encode(batch, embedder, reuse_stored_vectors))
+        _append_metadata(columns, batch)
+
+    vectors = np.vstack(blocks) if blocks else np.zeros((0, embedder.dims), dtype=np.float32)
+    if quantized:
+        vectors = quantize(vectors)
+    return LocalSimilarityIndex(vectors, columns, embedder, embedder_kind=embedder_kind)
+
+def snapshot_resolved_tickets(es_client: Elasticsearch, embedder, embedder_kind: str = "hashing",
+                              index: str = "support_tickets", quantized: bool = False, page_size: int = 1000,
+                              reuse_stored_vectors: bool = True) -> LocalSimilarityIndex:
+    watermark = ChangeFeed(es_client, index, "ticket_id").latest()
+    tickets = scan_tickets(es_client, index=index, status="resolved", page_size=page_size)
+    local_index = build_local_index(tickets, embedder, embedder_kind=embedder_kind, quantized=quantized,
+                                    batch_size=page_size, reuse_stored_vectors=reuse_stored_vectors)
+    local_index.watermark = watermark
+    return local_index
+
+def load_local_index(path: Optional[str] = None, embedder=None) -> Optional[LocalSimilarityIndex]:
+    path = path or os.getenv('TRIAGE_LOCAL_INDEX_PATH')
+    if not path or not os.path.exists(os.path.join(path, _META_FILE)):
+        return None
+    try:
+        return LocalSimilarityIndex.load(path, embedder=embedder,
+                                         embedder_kind=os.getenv('TRIAGE_EMBEDDER', 'none').lower(),
+                                         compact_ratio=float(os.getenv('TRIAGE_LOCAL_INDEX_COMPACT_RATIO', '0.25')))
+    except Exception as e:
+        logger.warning("Error loading local similarity index from %s: %s", path, e)
+        return None
+
+def main():
+    from es_config.client import get_client
+
+    configured = os.getenv('TRIAGE_EMBEDDER', 'none').lower()
+    kind = "hashing" if configured == "none" else configured
+    path = os.getenv('TRIAGE_LOCAL_INDEX_PATH', 'data/local_index')
+    quantized = os.getenv('TRIAGE_LOCAL_INDEX_QUANTIZE', 'false').lower() == 'true'
+
+    local_index = snapshot_resolved_tickets(get_client(), load_embedder(kind), embedder_kind=kind, quantized=quantized,
+                                            reuse_stored_vectors=configured != "none")
+    local_index.save(path)
+
+    size_mb = local_index.vectors.nbytes / (1024 * 1024)
+    print(f"[SUCCESS] Indexed {len(local_index)} resolved tickets ({local_index.dims} dims, "
+          f"{local_index.vectors.dtype}, {size_mb:.1f} MB) to {path}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, List, Tuple
+
+from agent.triage_agent import TriageAgent
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+class MicroBatcher:
+
+    def __init__(self, agent: TriageAgent, max_batch_size: int = 32, max_wait_ms: float = 5.0,
+                 max_concurrent_batches: int = 4, max_workers: int = 8):
+        self.agent = agent
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.max_workers = max_workers
+        self.batches = 0
+        self.batched_tickets = 0
+        self.in_flight = 0
+        self._queue: "queue.Queue[Any]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrent_batches, thread_name_prefix="triage-batch")
+        self._closed = False
+        self._collector = threading.Thread(target=self._collect_loop, name="triage-batcher", daemon=True)
+        self._collector.start()
+
+    def submit(self, ticket: Dict[str, Any]) -> Future:
+        if self._closed:
+            raise RuntimeError("MicroBatcher is closed")
+        future: Future = Future()
+        self._queue.put((ticket, future))
+        return future
+
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "queue_depth": self._queue.qsize(),
+                "in_flight": self.in_flight,
+                "batches": self.batches,
+                "tickets": self.batched_tickets,
+                "avg_batch_size": self.batched_tickets / self.batches if self.batches else 0.0
+            }
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._collector.join()
+        self._executor.shutdown(wait=True)
+
+    def _collect_loop(self):
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+
+            batch = [item]
+            deadline = time.monotonic() + self.max_wait_ms / 1000
+            stop = False
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop = True
+                    break
+                batch.append(item)
+
+            with self._lock:
+                self.in_flight += len(batch)
+            self._executor.submit(self._run_batch, batch)
+            if stop:
+                return
+
+    def _run_batch(self, batch: List[Tuple[Dict[str, Any], Future]]):
+        try:
+            results = self.agent.triage_batch([ticket for ticket, _ in batch], max_workers=self.max_workers)
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
+        except Exception as e:
+            logger.warning("Error triaging micro-batch of %d tickets: %s", len(batch), e)
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+        finally:
+            with self._lock:
+                self.in_flight -= len(batch)
+                self.batches += 1
+                self.batched_tickets += len(batch)
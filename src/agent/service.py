@@ -0,0 +1,115 @@
+import asyncio
+import os
+import sys
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List, Optional
+
+from fastapi import FastAPI, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel, ConfigDict
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from agent.bulk_writer import WorkflowWriteBuffer
+from agent.instrumentation import LatencyHistogram
+from agent.logging_utils import configure_logging
+from agent.micro_batcher import MicroBatcher
+from agent.snapshot_sync import start_snapshot_sync
+from agent.triage_agent import TriageAgent, build_agent, connect_elasticsearch
+
+class TicketIn(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
+    ticket_id: Optional[str] = None
+    subject: str
+    description: str = ""
+    customer_id: Optional[str] = None
+    status: str = "open"
+
+class TicketBatchIn(BaseModel):
+    tickets: List[TicketIn]
+
+def create_app(agent: Optional[TriageAgent] = None, max_batch_size: int = 32, max_wait_ms: float = 5.0,
+               max_workers: int = 8) -> FastAPI:
+    owned = {}
+    state: Dict[str, Any] = {}
+    request_latency = LatencyHistogram()
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        triage_agent = agent
+        if triage_agent is None:
+            es = connect_elasticsearch()
+            owned["write_buffer"] = WorkflowWriteBuffer(es)
+            triage_agent = build_agent(
+                es, owned["write_buffer"],
+                use_msearch=os.getenv('TRIAGE_USE_MSEARCH', 'true').lower() == 'true'
+            )
+            owned["agent"] = triage_agent
+            owned["sync"] = start_snapshot_sync(es, triage_agent)
+        state["agent"] = triage_agent
+        app.state.agent = triage_agent
+        state["batcher"] = MicroBatcher(triage_agent, max_batch_size=max_batch_size,
+                                        max_wait_ms=max_wait_ms, max_workers=max_workers)
+        try:
+            yield
+        finally:
+            state["batcher"].close()
+            if owned.get("sync") is not None:
+                owned["sync"].stop()
+            if "agent" in owned:
+                owned["agent"].close()
+            if "write_buffer" in owned:
+                owned["write_buffer"].close()
+
+    app = FastAPI(title="Support Ticket Triage API", lifespan=lifespan)
+
+    @app.post("/triage")
+    async def triage(ticket: TicketIn) -> Dict[str, Any]:
+        start = time.perf_counter()
+        future = state["batcher"].submit(ticket.model_dump(exclude_none=True))
+        result = await asyncio.wrap_future(future)
+        request_latency.observe({"triage": (time.perf_counter() - start) * 1000})
+        if "error" in result:
+            raise HTTPException(status_code=500, detail=result["error"])
+        return result
+
+    @app.post("/triage/batch")
+    async def triage_batch(batch: TicketBatchIn) -> Dict[str, Any]:
+        start = time.perf_counter()
+        tickets = [ticket.model_dump(exclude_none=True) for ticket in batch.tickets]
+        results = await run_in_threadpool(state["agent"].triage_batch, tickets, max_workers)
+        request_latency.observe({"triage_batch": (time.perf_counter() - start) * 1000})
+        return {"results": results}
+
+    @app.get("/metrics")
+    async def metrics() -> Dict[str, Any]:
+        triage_agent = state["agent"]
+        stages = triage_agent.metrics.summary() if isinstance(triage_agent.metrics, LatencyHistogram) else {}
+        return {
+            "batcher": state["batcher"].stats(),
+            "requests": request_latency.summary(),
+            "stages": stages,
+            "customer_cache": triage_agent.customer_cache.stats()
+        }
+
+    @app.get("/health")
+    async def health() -> Dict[str, Any]:
+        return {"status": "ok", "queue_depth": state["batcher"].queue_depth()}
+
+    return app
+
+def main():
+    import uvicorn
+
+    configure_logging()
+    app = create_app(
+        max_batch_size=int(os.getenv('TRIAGE_API_MAX_BATCH', '32')),
+        max_wait_ms=float(os.getenv('TRIAGE_API_BATCH_WAIT_MS', '5')),
+        max_workers=int(os.getenv('TRIAGE_MAX_WORKERS', '8'))
+    )
+    uvicorn.run(app, host=os.getenv('TRIAGE_API_HOST', '0.0.0.0'), port=int(os.getenv('TRIAGE_API_PORT', '8000')))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+import json
+import logging
+import os
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from elasticsearch import Elasticsearch
+
+logger = logging.getLogger(__name__)
+
+ChangeHandler = Callable[[List[Dict[str, Any]]], None]
+
+ID_FIELDS = {
+    "support_tickets": "ticket_id",
+    "knowledge_base": "article_id",
+    "customers": "customer_id"
+}
+
+def rewind(timestamp: Any, seconds: float) -> Any:
+    if isinstance(timestamp, (int, float)):
+        return timestamp - int(seconds * 1000)
+    return (datetime.fromisoformat(timestamp) - timedelta(seconds=seconds)).isoformat()
+
+class ChangeFeed:
+
+    def __init__(self, es_client: Elasticsearch, index: str, id_field: str, timestamp_field: str = "updated_at",
+                 page_size: int = 500, overlap: float = 0.0):
+        self.es = es_client
+        self.index = index
+        self.id_field = id_field
+        self.timestamp_field = timestamp_field
+        self.page_size = page_size
+        self.overlap = overlap
+
+    def latest(self) -> Optional[List[Any]]:
+        hits = self.es.search(index=self.index, body={
+            "size": 1,
+            "query": {"exists": {"field": self.timestamp_field}},
+            "sort": [{self.timestamp_field: "desc"}, {self.id_field: "desc"}],
+            "_source": False,
+            "track_total_hits": False
+        })["hits"]["hits"]
+        return hits[0]["sort"] if hits else None
+
+    def pages(self, watermark: Optional[List[Any]] = None,
+              seen: Optional[Dict[str, Any]] = None) -> Iterator[List[Dict[str, Any]]]:
+        if watermark is None or self.overlap <= 0:
+            pages = self._hits(watermark[0] if watermark else None, None, watermark)
+        else:
+            pages = self._hits(rewind(watermark[0], self.overlap), None, None)
+        for hits in pages:
+            page = [dict(hit["_source"], _watermark=hit["sort"]) for hit in hits
+                    if not seen or seen.get(hit["_source"].get(self.id_field)) != hit["sort"][0]]
+            if page:
+                yield page
+
+    def recent(self, watermark: List[Any]) -> Dict[str, Any]:
+        if self.overlap <= 0:
+            return {}
+        return {hit["_source"].get(self.id_field): hit["sort"][0]
+                for hits in self._hits(rewind(watermark[0], self.overlap), watermark[0], None)
+                for hit in hits if hit["sort"] <= watermark}
+
+    def _hits(self, since: Any, until: Any, search_after: Optional[List[Any]]) -> Iterator[List[Dict[str, Any]]]:
+        query: Dict[str, Any] = {"exists": {"field": self.timestamp_field}}
+        if since is not None:
+            bounds = {"gte": since}
+            if until is not None:
+                bounds["lte"] = until
+            query = {"range": {self.timestamp_field: bounds}}
+        while True:
+            body: Dict[str, Any] = {
+                "size": self.page_size,
+                "query": query,
+                "sort": [{self.timestamp_field: "asc"}, {self.id_field: "asc"}],
+                "track_total_hits": False
+            }
+            if search_after is not None:
+                body["search_after"] = search_after
+
+            hits = self.es.search(index=self.index, body=body)["hits"]["hits"]
+            if not hits:
+                return
+            search_after = hits[-1]["sort"]
+            yield hits
+            if len(hits) < self.page_size:
+                return
+
+class SnapshotSync:
+
+    def __init__(self, es_client: Elasticsearch, state_path: Optional[str] = None, page_size: int = 500,
+                 interval: float = 30.0, overlap: float = 5.0):
+        self.es = es_client
+        self.state_path = state_path
+        self.page_size = page_size
+        self.interval = interval
+        self.overlap = overlap
+        self.applied: Dict[str, int] = {}
+        self._handlers: Dict[str, List[ChangeHandler]] = {}
+        self._id_fields: Dict[str, str] = {}
+        self._watermarks: Dict[str, List[Any]] = {}
+        self._seen: Dict[str, Dict[str, Any]] = {}
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._sync_lock = threading.Lock()
+        self._load_state()
+
+    def register(self, index: str, handler: ChangeHandler, id_field: Optional[str] = None):
+        self._handlers.setdefault(index, []).append(handler)
+        self._id_fields[index] = id_field or ID_FIELDS.get(index, "id")
+
+    def watermark(self, index: str) -> Optional[List[Any]]:
+        return self._watermarks.get(index)
+
+    def seed(self, index: str, watermark: Optional[List[Any]] = None):
+        current = self._watermarks.get(index)
+        if current is not None and (watermark is None or watermark >= current):
+            return
+        if current is not None:
+            logger.info("Rewinding %s sync from %s to the snapshot watermark %s", index, current, watermark)
+        feed = self._feed(index)
+        if watermark is None:
+            watermark = feed.latest()
+        if watermark is not None:
+            self._watermarks[index] = watermark
+            self._seen[index] = feed.recent(watermark)
+            self._save_state()
+
+    def _feed(self, index: str) -> ChangeFeed:
+        return ChangeFeed(self.es, index, self._id_fields.get(index, ID_FIELDS.get(index, "id")),
+                          page_size=self.page_size, overlap=self.overlap)
+
+    def sync_once(self) -> Dict[str, int]:
+        with self._sync_lock:
+            counts = {}
+            for index, handlers in self._handlers.items():
+                counts[index] = self._sync_index(index, handlers)
+            return counts
+
+    def _sync_index(self, index: str, handlers: List[ChangeHandler]) -> int:
+        feed = self._feed(index)
+        seen = self._seen.setdefault(index, {})
+        applied = 0
+        try:
+            for page in feed.pages(self._watermarks.get(index), seen):
+                docs = [{k: v for k, v in doc.items() if k != "_watermark"} for doc in page]
+                for handler in handlers:
+                    handler(docs)
+                current = self._watermarks.get(index)
+                if current is None or page[-1]["_watermark"] > current:
+                    self._watermarks[index] = page[-1]["_watermark"]
+                self._remember(seen, feed.id_field, page, self._watermarks[index])
+                self._save_state()
+                applied += len(docs)
+        except Exception as e:
+            logger.warning("Error syncing changes from %s: %s", index, e)
+        self.applied[index] = self.applied.get(index, 0) + applied
+        return applied
+
+    def _remember(self, seen: Dict[str, Any], id_field: str, page: List[Dict[str, Any]], watermark: List[Any]):
+        if self.overlap <= 0:
+            seen.clear()
+            return
+        seen.update((doc.get(id_field), doc["_watermark"][0]) for doc in page)
+        since = rewind(watermark[0], self.overlap)
+        for key in [key for key, value in seen.items() if value < since]:
+            del seen[key]
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="snapshot-sync", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        while not self._stopping.is_set():
+            self.sync_once()
+            self._stopping.wait(self.interval)
+
+    def _load_state(self):
+        if not self.state_path or not os.path.exists(self.state_path):
+            return
+        try:
+            with open(self.state_path) as f:
+                state = json.load(f)
+            self._watermarks = state.get("watermarks", {})
+            self._seen = state.get("seen", {})
+        except Exception as e:
+            logger.warning("Ignoring unreadable sync state %s: %s", self.state_path, e)
+
+    def _save_state(self):
+        if not self.state_path:
+            return
+        temp_path = f"{self.state_path}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump({"watermarks": self._watermarks, "seen": self._seen}, f)
+        os.replace(temp_path, self.state_path)
+
+def attach_agent_caches(sync: SnapshotSync, agent) -> SnapshotSync:
+    def apply_ticket_changes(tickets: List[Dict[str, Any]]):
+        if agent.local_index is not None:
+            agent.local_index.apply_changes(tickets)
+        for customer_id in {t.get("customer_id") for t in tickets if t.get("customer_id")}:
+            agent.customer_cache.invalidate(customer_id, tickets_only=True)
+
+    def apply_customer_changes(customers: List[Dict[str, Any]]):
+        for customer in customers:
+            agent.customer_cache.update_profile(customer["customer_id"], customer)
+
+    sync.register("support_tickets", apply_ticket_changes)
+    sync.register("customers", apply_customer_changes)
+    try:
+        sync.seed("support_tickets", agent.local_index.watermark if agent.local_index is not None else None)
+        sync.seed("customers")
+    except Exception as e:
+        logger.warning("Error reading initial sync watermarks: %s", e)
+    return sync
+
+def start_snapshot_sync(es_client: Elasticsearch, agent) -> Optional[SnapshotSync]:
+    interval = float(os.getenv('TRIAGE_SYNC_INTERVAL', '30'))
+    if interval <= 0:
+        return None
+    sync = SnapshotSync(es_client, state_path=os.getenv('TRIAGE_SYNC_STATE_PATH', '.triage_sync_state.json'),
+                        page_size=int(os.getenv('TRIAGE_SYNC_PAGE_SIZE', '500')), interval=interval,
+                        overlap=float(os.getenv('TRIAGE_SYNC_OVERLAP', '5')))
+    attach_agent_caches(sync, agent)
+    sync.start()
+    return sync
@@ -0,0 +1,141 @@
+import json
+import logging
+import os
+import re
+import sys
+from datetime import datetime
+from typing import Any, Dict, Iterator, Optional
+
+from elasticsearch import Elasticsearch
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+logger = logging.getLogger(__name__)
+
+_REPLY_PREFIX = re.compile(r"^\s*((re|fw|fwd)\s*:\s*)+")
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+_NUMBER = re.compile(r"\b\d+\b")
+
+def normalize_subject(subject: Any) -> str:
+    text = _REPLY_PREFIX.sub("", str(subject or "").lower())
+    text = _NUMBER.sub("#", _NON_WORD.sub(" ", text))
+    return " ".join(text.split())
+
+class SubjectPriors:
+
+    def __init__(self, priors: Optional[Dict[str, Dict[str, Any]]] = None, min_support: int = 5,
+                 min_share: float = 0.6):
+        self.priors = priors or {}
+        self.min_support = min_support
+        self.min_share = min_share
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, subject: Any) -> Optional[Dict[str, Any]]:
+        prior = self.priors.get(normalize_subject(subject))
+        if prior is None or prior["count"] < self.min_support \
+                or max(prior["categories"].values()) / prior["count"] < self.min_share:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return prior
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "subjects": len(self.priors),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
+
+    def __len__(self) -> int:
+        return len(self.priors)
+
+    def save(self, path: str, built_at: Optional[str] = None):
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"built_at": built_at or datetime.now().isoformat(), "subjects": self.priors}, f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str, min_support: int = 5, min_share: float = 0.6) -> "SubjectPriors":
+        with open(path) as f:
+            data = json.load(f)
+        return cls(data["subjects"], min_support=min_support, min_share=min_share)
+
+def _subject_buckets(es_client: Elasticsearch, index: str, status: str, page_size: int) -> Iterator[Dict]:
+    after_key = None
+    while True:
+        composite: Dict[str, Any] = {
+            "size": page_size,
+            "sources": [{"subject": {"terms": {"field": "subject.keyword"}}}]
+        }
+        if after_key is not None:
+            composite["after"] = after_key
+
+        response = es_client.search(
+            index=index,
+            body={
+                "size": 0,
+                "query": {"term": {"status": status}},
+                "aggs": {
+                    "subjects": {
+                        "composite": composite,
+                        "aggs": {
+                            "categories": {"terms": {"field": "category", "size": 20}},
+                            "priorities": {"terms": {"field": "priority", "size": 10}}
+                        }
+                    }
+                }
+            }
+        )
+        subjects = response["aggregations"]["subjects"]
+        yield from subjects["buckets"]
+
+        after_key = subjects.get("after_key")
+        if after_key is None or len(subjects["buckets"]) < page_size:
+            return
+
+def build_subject_priors(es_client: Elasticsearch, index: str = "support_tickets", status: str = "resolved",
+                         page_size: int = 1000) -> Dict[str, Dict[str, Any]]:
+    priors: Dict[str, Dict[str, Any]] = {}
+    for bucket in _subject_buckets(es_client, index, status, page_size):
+        key = normalize_subject(bucket["key"]["subject"])
+        if not key:
+            continue
+        prior = priors.setdefault(key, {"count": 0, "categories": {}, "priorities": {}})
+        prior["count"] += bucket["doc_count"]
+        for field in ("categories", "priorities"):
+            for term in bucket[field]["buckets"]:
+                prior[field][term["key"]] = prior[field].get(term["key"], 0) + term["doc_count"]
+    return priors
+
+def load_subject_priors(path: Optional[str] = None) -> Optional[SubjectPriors]:
+    path = path or os.getenv('TRIAGE_PRIORS_PATH')
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        return SubjectPriors.load(
+            path,
+            min_support=int(os.getenv('TRIAGE_PRIORS_MIN_SUPPORT', '5')),
+            min_share=float(os.getenv('TRIAGE_PRIORS_MIN_SHARE', '0.6'))
+        )
+    except Exception as e:
+        logger.warning("Error loading subject priors from %s: %s", path, e)
+        return None
+
+def main():
+    from es_config.client import get_client
+
+    path = os.getenv('TRIAGE_PRIORS_PATH', 'data/subject_priors.json')
+    es = get_client()
+    priors = build_subject_priors(es)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    SubjectPriors(priors).save(path)
+
+    tickets = sum(prior["count"] for prior in priors.values())
+    print(f"[SUCCESS] Wrote priors for {len(priors)} subjects ({tickets} resolved tickets) to {path}")
+
+if __name__ == "__main__":
+    main()
@@ -1,57 +1,108 @@
 import os
+import sys
 import json
-from datetime import datetime
-from typing import Dict, List, Any, Optional
+import time
+import logging
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Any, Optional
+import numpy as np
 from elasticsearch import Elasticsearch
 from dotenv import load_dotenv
 import uuid
 
-load_dotenv()
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from agent.backlog import OpenTicketStream, PRIORITY_RANK
+from agent.batch_scorer import (KEYWORD_CONFIDENCE, PLAN_MULTIPLIERS, REVIEW_CONFIDENCE, TEAM_MAPPING,
+                                priority_level, score_batch)
+from agent.bulk_writer import WorkflowWriteBuffer, bulk_item_error
+from agent.caches import CustomerContextCache, TeamWorkloadSnapshot
+from agent.esql_analytics import EsqlAnalytics
+from agent.embeddings import KB_VECTOR_FIELD, TICKET_TEXT_FIELDS, TICKET_VECTOR_FIELD, embedding_text, load_embedder
+from agent.instrumentation import LatencyHistogram, MetricsSink, StageTimer, timed
+from agent.keyword_matcher import KeywordMatcher
+from agent.local_index import LocalSimilarityIndex, load_local_index
+from agent.logging_utils import configure_logging
+from agent.subject_priors import SubjectPriors, load_subject_priors
+from es_config.client import create_client, get_client
 
-class TriageAgent:
+load_dotenv()
 
-    def __init__(self, es_client: Elasticsearch):
+logger = logging.getLogger("agent.triage_agent")
+
+NEGATIVE_WORDS = ['frustrated', 'angry', 'terrible', 'worst', 'unacceptable',
+                  'disappointed', 'furious', 'immediately', 'urgent', 'charged',
+                  'double charged', 'locked', 'blocked', 'denied', 'failed', 'wrong']
+POSITIVE_WORDS = ['thanks', 'appreciate', 'great', 'love', 'excellent']
+
+URGENCY_KEYWORDS = ['urgent', 'immediately', 'critical', 'emergency', 'asap',
+                    'production', 'down', 'not working', 'broken', 'cant', 'cannot',
+                    'stopped working', 'crashed', 'error', 'failing', 'charged',
+                    'double charged', 'cancelled', 'locked out', 'data loss',
+                    'security', 'breach', 'outage', 'unreachable', 'refund']
+
+CATEGORY_KEYWORDS = {
+    'technical': ['error', 'crash', 'bug', 'not working', 'broken', 'api', 'integration', 'performance', 'slow'],
+    'billing': ['charge', 'payment', 'invoice', 'refund', 'subscription', 'billing', 'credit card'],
+    'account': ['login', 'password', 'access', 'account', 'email', 'locked', 'reset'],
+    'feature': ['request', 'feature', 'suggestion', 'would like', 'can you add', 'need']
+}
+
+CONTENT_MATCHER = KeywordMatcher({
+    'negative': NEGATIVE_WORDS,
+    'positive': POSITIVE_WORDS,
+    'urgency': URGENCY_KEYWORDS,
+    **{f'category:{category}': keywords for category, keywords in CATEGORY_KEYWORDS.items()}
+})
+
+class TriageLogic:
+
+    def _init_shared(self, es_client, workload_snapshot: Optional[TeamWorkloadSnapshot], workload_ttl: float,
+                     customer_cache: Optional[CustomerContextCache], customer_cache_ttl: float,
+                     customer_cache_size: int, metrics_sink: Optional[MetricsSink],
+                     subject_priors: Optional[SubjectPriors], embedder, knn_candidates: int,
+                     local_index: Optional[LocalSimilarityIndex], prefer_local_index: bool):
         self.es = es_client
         self.agent_name = "intelligent_triage_agent"
+        self.workload = workload_snapshot or TeamWorkloadSnapshot(
+            self._fetch_team_workload,
+            ttl_seconds=workload_ttl
+        )
+        self.customer_cache = customer_cache or CustomerContextCache(
+            max_entries=customer_cache_size,
+            ttl_seconds=customer_cache_ttl
+        )
+        self.metrics = metrics_sink if metrics_sink is not None else LatencyHistogram()
+        self.subject_priors = subject_priors
+        self.embedder = embedder
+        self.knn_candidates = knn_candidates
+        self.local_index = local_index
+        self.prefer_local_index = prefer_local_index and local_index is not None
+
+    def _team_workload_query(self) -> Dict:
+        return {
+            "size": 0,
+            "query": {"term": {"status": "open"}},
+            "aggs": {
+                "by_team": {
+                    "terms": {"field": "assigned_team", "size": 10}
+                }
+            }
+        }
 
-    def triage_ticket(self, ticket: Dict[str, Any]) -> Dict[str, Any]:
-        print(f"\n{'='*60}")
-        print(f"[TICKET] {ticket.get('ticket_id', 'UNKNOWN')}")
-        print(f"Subject: {ticket.get('subject', 'No subject')}")
-        print(f"{'='*60}\n")
-
-        analysis = self._analyze_content(ticket)
-        print(f"[STEP 1] Content Analysis")
-        print(f"  - Sentiment: {analysis['sentiment']}")
-        print(f"  - Urgency indicators: {len(analysis['urgency_keywords'])}")
-
-        search_context = self._search_for_context(ticket, analysis)
-        print(f"\n[STEP 2] Search Tool - Context Discovery")
-        print(f"  - Similar tickets: {len(search_context['similar_tickets'])}")
-        print(f"  - KB articles: {len(search_context['kb_articles'])}")
-        print(f"  - Customer history: {search_context['customer_history'].get('total_tickets', 0)} previous tickets")
-
-        esql_analysis = self._analyze_with_esql(ticket, analysis, search_context)
-        print(f"\n[STEP 3] ES|QL Tool - Pattern Analysis")
-        print(f"  - Priority score: {esql_analysis['priority_score']}")
-        print(f"  - Category confidence: {esql_analysis['category_confidence']:.1%}")
-        print(f"  - Recommended team: {esql_analysis['recommended_team']}")
-
-        decision = self._make_decision(ticket, analysis, search_context, esql_analysis)
-        print(f"\n[STEP 4] Triage Decision")
-        print(f"  - Category: {decision['category']}")
-        print(f"  - Priority: {decision['priority']}")
-        print(f"  - Assigned team: {decision['assigned_team']}")
-        print(f"  - Confidence: {decision['confidence']:.1%}")
-
-        workflow_result = self._execute_workflow(ticket, decision, search_context)
-        print(f"\n[STEP 5] Workflow Tool - Actions Executed")
-        for action in workflow_result['actions_taken']:
-            print(f"  + {action}")
+    def _parse_team_workload(self, response: Dict) -> Dict[str, int]:
+        workload = {}
+        for bucket in response["aggregations"]["by_team"]["buckets"]:
+            workload[bucket["key"]] = bucket["doc_count"]
 
-        ticket_id = ticket.get("ticket_id", "UNKNOWN")
-        result = {
-            "ticket_id": ticket_id,
+        return workload
+
+    def _build_result(self, ticket: Dict[str, Any], search_context: Dict[str, Any], esql_analysis: Dict,
+                      decision: Dict, workflow_result: Dict) -> Dict[str, Any]:
+        return {
+            "ticket_id": ticket.get("ticket_id", "UNKNOWN"),
             "original_status": ticket.get("status", "open"),
             "triage_decision": decision,
             "context": {
@@ -65,26 +116,14 @@ class TriageAgent:
             "processing_time_ms": 0
         }
 
-        self._log_agent_action(ticket_id, decision, result)
-
-        print(f"\n[COMPLETE] Triage finished successfully")
-        print(f"{'='*60}\n")
-
-        return result
-
     def _analyze_content(self, ticket: Dict[str, Any]) -> Dict[str, Any]:
 
         subject = str(ticket.get('subject', ''))
         description = str(ticket.get('description', ''))
-        text = f"{subject} {description}".lower()
+        matches = CONTENT_MATCHER.match(f"{subject} {description}")
 
-        negative_words = ['frustrated', 'angry', 'terrible', 'worst', 'unacceptable',
-                         'disappointed', 'furious', 'immediately', 'urgent', 'charged',
-                         'double charged', 'locked', 'blocked', 'denied', 'failed', 'wrong']
-        positive_words = ['thanks', 'appreciate', 'great', 'love', 'excellent']
-
-        negative_count = sum(1 for word in negative_words if word in text)
-        positive_count = sum(1 for word in positive_words if word in text)
+        negative_count = len(matches['negative'])
+        positive_count = len(matches['positive'])
 
         if negative_count > positive_count:
             sentiment = 'negative'
@@ -93,13 +132,7 @@ class TriageAgent:
         else:
             sentiment = 'neutral'
 
-        urgency_keywords = ['urgent', 'immediately', 'critical', 'emergency', 'asap',
-                           'production', 'down', 'not working', 'broken', 'cant', 'cannot',
-                           'stopped working', 'crashed', 'error', 'failing', 'charged',
-                           'double charged', 'cancelled', 'locked out', 'data loss',
-                           'security', 'breach', 'outage', 'unreachable', 'refund']
-
-        found_keywords = [kw for kw in urgency_keywords if kw in text]
+        found_keywords = matches['urgency']
 
         return {
             'sentiment': sentiment,
@@ -108,24 +141,40 @@ class TriageAgent:
             'positive_count': positive_count
         }
 
-    def _search_for_context(self, ticket: Dict[str, Any], analysis: Dict) -> Dict[str, Any]:
-
-        similar_tickets = self._search_similar_tickets(ticket)
-
-        kb_articles = self._search_kb_articles(ticket)
-
-        customer_id = ticket.get('customer_id')
-        customer_history = self._get_customer_history(customer_id) if customer_id else {}
-
+    def _subject_prior(self, ticket: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        if self.subject_priors is None:
+            return None
+        return self.subject_priors.lookup(ticket.get('subject', ''))
+
+    def _query_vectors(self, tickets: List[Dict[str, Any]]) -> List[Optional[List[float]]]:
+        if self.embedder is None:
+            return [None] * len(tickets)
+        with timed("embedding"):
+            vectors = self.embedder.encode([embedding_text(ticket, TICKET_TEXT_FIELDS) for ticket in tickets])
+        return [vector.tolist() for vector in vectors]
+
+    def _merge_esql_stats(self, context: Dict[str, Any], stats: Dict[str, Any]):
+        context['esql_stats'] = stats
+        if stats['category_votes']:
+            context['esql_votes'] = stats['category_votes']
+        if stats['customer'] is not None and context['customer_history']:
+            context['customer_history'] = dict(context['customer_history'], **stats['customer'])
+
+    def _similar_tickets_query(self, ticket: Dict[str, Any], query_vector: Optional[List[float]] = None) -> Dict:
+        if self.embedder is not None:
+            return {
+                "knn": {
+                    "field": TICKET_VECTOR_FIELD,
+                    "query_vector": query_vector or self._query_vectors([ticket])[0],
+                    "k": 5,
+                    "num_candidates": self.knn_candidates,
+                    "filter": {"term": {"status": "resolved"}}
+                },
+                "size": 5,
+                "_source": {"excludes": [TICKET_VECTOR_FIELD]}
+            }
         return {
-            'similar_tickets': similar_tickets,
-            'kb_articles': kb_articles,
-            'customer_history': customer_history
-        }
-
-    def _search_similar_tickets(self, ticket: Dict[str, Any]) -> List[Dict]:
-        try:
-            query = {
+            "query": {
                 "bool": {
                     "must": [
                         {
@@ -140,91 +189,111 @@ class TriageAgent:
                         {"term": {"status": "resolved"}}
                     ]
                 }
-            }
-
-            response = self.es.search(
-                index="support_tickets",
-                body={"query": query, "size": 5}
-            )
-
-            return [
-                {
-                    "ticket_id": hit["_source"]["ticket_id"],
-                    "subject": hit["_source"]["subject"],
-                    "category": hit["_source"]["category"],
-                    "priority": hit["_source"]["priority"],
-                    "resolution_time": hit["_source"].get("resolution_time_minutes"),
-                    "score": hit["_score"]
-                }
-                for hit in response["hits"]["hits"]
-            ]
-        except Exception as e:
-            print(f"[WARNING] Error searching similar tickets: {e}")
-            return []
+            },
+            "size": 5
+        }
 
-    def _search_kb_articles(self, ticket: Dict[str, Any]) -> List[Dict]:
-        try:
-            query = {
+    def _kb_articles_query(self, ticket: Dict[str, Any], query_vector: Optional[List[float]] = None) -> Dict:
+        if self.embedder is not None:
+            return {
+                "knn": {
+                    "field": KB_VECTOR_FIELD,
+                    "query_vector": query_vector or self._query_vectors([ticket])[0],
+                    "k": 3,
+                    "num_candidates": self.knn_candidates
+                },
+                "size": 3,
+                "_source": {"excludes": [KB_VECTOR_FIELD]}
+            }
+        return {
+            "query": {
                 "multi_match": {
                     "query": f"{ticket.get('subject', '')} {ticket.get('description', '')}",
                     "fields": ["title^3", "content", "tags^2"]
                 }
-            }
-
-            response = self.es.search(
-                index="knowledge_base",
-                body={"query": query, "size": 3}
-            )
+            },
+            "size": 3
+        }
 
-            return [
-                {
-                    "article_id": hit["_source"]["article_id"],
-                    "title": hit["_source"]["title"],
-                    "category": hit["_source"]["category"],
-                    "helpful_count": hit["_source"]["helpful_count"],
-                    "score": hit["_score"]
-                }
-                for hit in response["hits"]["hits"]
-            ]
-        except Exception as e:
-            print(f"[WARNING] Error searching KB: {e}")
-            return []
+    def _customer_profile_query(self, customer_id: str) -> Dict:
+        return {"query": {"ids": {"values": [customer_id]}}, "size": 1}
 
-    def _get_customer_history(self, customer_id: str) -> Dict:
-        try:
+    def _customer_tickets_query(self, customer_id: str) -> Dict:
+        return {
+            "query": {"term": {"customer_id": customer_id}},
+            "_source": {"excludes": [TICKET_VECTOR_FIELD]},
+            "size": 10,
+            "sort": [{"created_at": "desc"}]
+        }
 
-            customer_response = self.es.get(index="customers", id=customer_id)
-            customer = customer_response["_source"]
+    def _parse_similar_tickets(self, hits: List[Dict]) -> List[Dict]:
+        return [
+            {
+                "ticket_id": hit["_source"]["ticket_id"],
+                "subject": hit["_source"]["subject"],
+                "category": hit["_source"]["category"],
+                "priority": hit["_source"]["priority"],
+                "resolution_time": hit["_source"].get("resolution_time_minutes"),
+                "score": hit["_score"]
+            }
+            for hit in hits
+        ]
+
+    def _parse_kb_articles(self, hits: List[Dict]) -> List[Dict]:
+        return [
+            {
+                "article_id": hit["_source"]["article_id"],
+                "title": hit["_source"]["title"],
+                "category": hit["_source"]["category"],
+                "helpful_count": hit["_source"]["helpful_count"],
+                "score": hit["_score"]
+            }
+            for hit in hits
+        ]
 
-            tickets_response = self.es.search(
-                index="support_tickets",
-                body={
-                    "query": {"term": {"customer_id": customer_id}},
-                    "size": 10,
-                    "sort": [{"created_at": "desc"}]
-                }
-            )
+    def _fallback_similar_tickets(self, ticket: Dict[str, Any], query_vector: Optional[List[float]] = None) -> List[Dict]:
+        if self.local_index is None:
+            return []
+        try:
+            return self._local_similar_tickets_batch([ticket], [query_vector])[0]
+        except Exception as e:
+            logger.warning("Error searching local similarity index: %s", e)
+            return []
 
-            past_tickets = [hit["_source"] for hit in tickets_response["hits"]["hits"]]
+    def _local_similar_tickets_batch(self, tickets: List[Dict[str, Any]],
+                                     query_vectors: List[Optional[List[float]]]) -> List[List[Dict]]:
+        vectors = None
+        if self.local_index.embedder is self.embedder and all(v is not None for v in query_vectors):
+            vectors = np.asarray(query_vectors, dtype=np.float32)
+        with timed("local_similar"):
+            return self.local_index.search_batch(tickets, 5, vectors)
+
+    def _cache_customer_context(self, customer_id: str, cached: Optional[Dict], customer: Dict,
+                                past_tickets: List[Dict]):
+        if cached is None:
+            self.customer_cache.put(customer_id, customer, past_tickets)
+        elif cached["past_tickets"] is None:
+            self.customer_cache.update_tickets(customer_id, past_tickets)
+
+    def _build_customer_history(self, customer_id: str, customer: Dict, past_tickets: List[Dict]) -> Dict:
+        return {
+            "customer_id": customer_id,
+            "plan": customer.get("plan", "free"),
+            "satisfaction_score": customer.get("satisfaction_score", 3.0),
+            "total_tickets": len(past_tickets),
+            "past_tickets": past_tickets[:5]
+        }
 
-            return {
-                "customer_id": customer_id,
-                "plan": customer.get("plan", "free"),
-                "satisfaction_score": customer.get("satisfaction_score", 3.0),
-                "total_tickets": len(past_tickets),
-                "past_tickets": past_tickets[:5]
-            }
-        except Exception as e:
-            print(f"[WARNING] Error getting customer history: {e}")
-            return {
-                "customer_id": customer_id,
-                "plan": "free",
-                "satisfaction_score": 3.0,
-                "total_tickets": 0,
-                "past_tickets": []
-            }
+    def _default_customer_history(self, customer_id: str) -> Dict:
+        return {
+            "customer_id": customer_id,
+            "plan": "free",
+            "satisfaction_score": 3.0,
+            "total_tickets": 0,
+            "past_tickets": []
+        }
 
-    def _analyze_with_esql(self, ticket: Dict, analysis: Dict, context: Dict) -> Dict:
+    def _score_ticket(self, ticket: Dict, analysis: Dict, context: Dict, team_workload: Dict[str, int]) -> Dict:
 
         priority_score = 0
 
@@ -235,14 +304,8 @@ class TriageAgent:
         elif analysis['sentiment'] == 'positive':
             priority_score -= 5
 
-        plan_multipliers = {
-            'enterprise': 2.0,
-            'business': 1.5,
-            'pro': 1.0,
-            'free': 0.5
-        }
         plan = context['customer_history'].get('plan', 'free')
-        priority_score = int(priority_score * plan_multipliers[plan])
+        priority_score = int(priority_score * PLAN_MULTIPLIERS[plan])
 
         satisfaction = context['customer_history'].get('satisfaction_score', 3.0)
         if satisfaction < 3.0:
@@ -250,34 +313,40 @@ class TriageAgent:
 
         priority_score = min(priority_score, 100)
 
-        category_votes = {}
-        for similar in context['similar_tickets']:
-            cat = similar['category']
-            category_votes[cat] = category_votes.get(cat, 0) + 1
+        subject_prior = context.get('subject_prior')
+        if subject_prior:
+            category_votes = subject_prior['categories']
+            vote_total = subject_prior['count']
+            category_source = 'subject_prior'
+        elif context.get('esql_votes'):
+            category_votes = context['esql_votes']
+            vote_total = sum(category_votes.values())
+            category_source = 'esql'
+        else:
+            category_votes = {}
+            for similar in context['similar_tickets']:
+                cat = similar['category']
+                category_votes[cat] = category_votes.get(cat, 0) + 1
+            vote_total = len(context['similar_tickets'])
+            category_source = 'similar_tickets'
 
         if category_votes:
             predicted_category = max(category_votes.items(), key=lambda x: x[1])[0]
-            category_confidence = category_votes[predicted_category] / len(context['similar_tickets'])
+            category_confidence = category_votes[predicted_category] / vote_total
         else:
 
             predicted_category = self._classify_by_keywords(ticket)
-            category_confidence = 0.6
-
-        team_mapping = {
-            'technical': 'engineering',
-            'billing': 'billing',
-            'account': 'success',
-            'feature': 'product'
-        }
-        recommended_team = team_mapping.get(predicted_category, 'support')
+            category_confidence = KEYWORD_CONFIDENCE
+            category_source = 'keywords'
 
-        team_workload = self._get_team_workload()
+        recommended_team = TEAM_MAPPING.get(predicted_category, 'support')
 
         return {
             'priority_score': priority_score,
             'predicted_category': predicted_category,
             'category_confidence': category_confidence,
             'recommended_team': recommended_team,
+            'category_source': category_source,
             'team_workload': team_workload,
             'factors': {
                 'urgency_keywords': len(analysis['urgency_keywords']),
@@ -288,57 +357,18 @@ class TriageAgent:
         }
 
     def _classify_by_keywords(self, ticket: Dict) -> str:
-        text = f"{ticket.get('subject', '')} {ticket.get('description', '')}".lower()
-
-        category_keywords = {
-            'technical': ['error', 'crash', 'bug', 'not working', 'broken', 'api', 'integration', 'performance', 'slow'],
-            'billing': ['charge', 'payment', 'invoice', 'refund', 'subscription', 'billing', 'credit card'],
-            'account': ['login', 'password', 'access', 'account', 'email', 'locked', 'reset'],
-            'feature': ['request', 'feature', 'suggestion', 'would like', 'can you add', 'need']
-        }
+        matches = CONTENT_MATCHER.match(f"{ticket.get('subject', '')} {ticket.get('description', '')}")
 
         scores = {}
-        for category, keywords in category_keywords.items():
-            scores[category] = sum(1 for kw in keywords if kw in text)
+        for category in CATEGORY_KEYWORDS:
+            scores[category] = len(matches[f'category:{category}'])
 
         return max(scores.items(), key=lambda x: x[1])[0] if any(scores.values()) else 'technical'
 
-    def _get_team_workload(self) -> Dict[str, int]:
-        try:
-            response = self.es.search(
-                index="support_tickets",
-                body={
-                    "size": 0,
-                    "query": {"term": {"status": "open"}},
-                    "aggs": {
-                        "by_team": {
-                            "terms": {"field": "assigned_team", "size": 10}
-                        }
-                    }
-                }
-            )
-
-            workload = {}
-            for bucket in response["aggregations"]["by_team"]["buckets"]:
-                workload[bucket["key"]] = bucket["doc_count"]
-
-            return workload
-        except Exception as e:
-            print(f"[WARNING] Error getting team workload: {e}")
-            return {}
-
     def _make_decision(self, ticket: Dict, analysis: Dict,
                       context: Dict, esql_analysis: Dict) -> Dict:
 
-        priority_score = esql_analysis['priority_score']
-        if priority_score >= 75:
-            priority = 'critical'
-        elif priority_score >= 50:
-            priority = 'high'
-        elif priority_score >= 25:
-            priority = 'medium'
-        else:
-            priority = 'low'
+        priority = priority_level(esql_analysis['priority_score'])
 
         category = esql_analysis['predicted_category']
 
@@ -346,7 +376,7 @@ class TriageAgent:
 
         confidence = esql_analysis['category_confidence']
 
-        needs_human_review = confidence < 0.7 or priority == 'critical'
+        needs_human_review = confidence < REVIEW_CONFIDENCE or priority == 'critical'
 
         return {
             'category': category,
@@ -357,37 +387,22 @@ class TriageAgent:
             'reasoning': {
                 'priority_factors': esql_analysis['factors'],
                 'similar_tickets_used': len(context['similar_tickets']),
+                'subject_prior_tickets': context['subject_prior']['count'] if context.get('subject_prior') else 0,
                 'kb_articles_found': len(context['kb_articles'])
             }
         }
 
-    def _execute_workflow(self, ticket: Dict, decision: Dict, context: Dict) -> Dict:
-        actions_taken = []
-
-        ticket_id = ticket.get("ticket_id", "UNKNOWN")
-
-        try:
-            if ticket_id != "UNKNOWN":
-                self.es.update(
-                    index="support_tickets",
-                    id=ticket_id,
-                    body={
-                        "doc": {
-                            "category": decision['category'],
-                            "priority": decision['priority'],
-                            "assigned_team": decision['assigned_team'],
-                            "status": "in_progress",
-                            "updated_at": datetime.now().isoformat()
-                        }
-                    }
-                )
-                actions_taken.append(f"Updated ticket fields (category={decision['category']}, priority={decision['priority']})")
-            else:
-                actions_taken.append("Skipped ticket update (no ticket ID)")
-        except Exception as e:
-            print(f"[WARNING] Error updating ticket: {e}")
-            actions_taken.append(f"Failed to update ticket: {e}")
+    def _ticket_update_doc(self, decision: Dict) -> Dict:
+        return {
+            "category": decision['category'],
+            "priority": decision['priority'],
+            "assigned_team": decision['assigned_team'],
+            "status": "in_progress",
+            "updated_at": datetime.now(timezone.utc).isoformat()
+        }
 
+    def _complete_workflow(self, decision: Dict, workflow_result: Dict) -> Dict:
+        actions_taken = workflow_result['actions_taken']
         actions_taken.append(f"Assigned to {decision['assigned_team']} team")
 
         if decision['priority'] in ['critical', 'high']:
@@ -398,11 +413,23 @@ class TriageAgent:
         if decision['needs_human_review']:
             actions_taken.append("Flagged for human review (low confidence or critical priority)")
 
-        return {
-            'actions_taken': actions_taken,
-            'status': 'success',
-            'timestamp': datetime.now().isoformat()
-        }
+        workflow_result['timestamp'] = datetime.now(timezone.utc).isoformat()
+        return workflow_result
+
+    def _record_write_error(self, workflow_result: Dict, write: str, error: str):
+        workflow_result.setdefault('write_errors', {})[write] = error
+        if write == 'ticket_update':
+            workflow_result['status'] = 'failed'
+        elif workflow_result['status'] == 'success':
+            workflow_result['status'] = 'partial'
+
+    def _after_ticket_update(self, ticket: Dict, decision: Dict):
+        self.workload.record_transition(
+            ticket.get('assigned_team'), ticket.get('status', 'open'),
+            decision['assigned_team'], 'in_progress'
+        )
+        if ticket.get('customer_id'):
+            self.customer_cache.invalidate(ticket['customer_id'], tickets_only=True)
 
     def _generate_response(self, ticket: Dict, context: Dict, decision: Dict) -> str:
         kb_articles = context['kb_articles']
@@ -421,68 +448,645 @@ class TriageAgent:
 
         return response
 
-    def _log_agent_action(self, ticket_id: str, decision: Dict, result: Dict):
+    def _action_doc(self, ticket_id: str, decision: Dict) -> Dict:
+        return {
+            "action_id": str(uuid.uuid4()),
+            "ticket_id": ticket_id,
+            "agent_name": self.agent_name,
+            "action_type": "triage",
+            "details": {
+                "category": decision['category'],
+                "priority": decision['priority'],
+                "assigned_team": decision['assigned_team'],
+                "needs_review": decision['needs_human_review']
+            },
+            "confidence_score": decision['confidence'],
+            "timestamp": datetime.now(timezone.utc).isoformat()
+        }
+
+class TriageAgent(TriageLogic):
+
+    def __init__(self, es_client: Elasticsearch, parallel_context: bool = False, context_workers: int = 16,
+                 use_msearch: bool = False, msearch_batch_size: int = 50,
+                 workload_snapshot: Optional[TeamWorkloadSnapshot] = None, workload_ttl: float = 30.0,
+                 customer_cache: Optional[CustomerContextCache] = None, customer_cache_ttl: float = 60.0,
+                 customer_cache_size: int = 1024, write_buffer: Optional[WorkflowWriteBuffer] = None,
+                 metrics_sink: Optional[MetricsSink] = None, subject_priors: Optional[SubjectPriors] = None,
+                 embedder=None, knn_candidates: int = 50, local_index: Optional[LocalSimilarityIndex] = None,
+                 prefer_local_index: bool = False, vectorized_scoring: bool = False,
+                 esql_analytics: Optional[EsqlAnalytics] = None):
+        self._init_shared(es_client, workload_snapshot, workload_ttl, customer_cache, customer_cache_ttl,
+                          customer_cache_size, metrics_sink, subject_priors, embedder, knn_candidates,
+                          local_index, prefer_local_index)
+        self.parallel_context = parallel_context
+        self.use_msearch = use_msearch
+        self.msearch_batch_size = msearch_batch_size
+        self.write_buffer = write_buffer
+        self.vectorized_scoring = vectorized_scoring
+        self.esql_analytics = esql_analytics
+        self._context_pool = ThreadPoolExecutor(
+            max_workers=context_workers,
+            thread_name_prefix="triage-context"
+        ) if parallel_context else None
+
+    def close(self):
+        if self._context_pool is not None:
+            self._context_pool.shutdown(wait=True)
+            self._context_pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def triage_ticket(self, ticket: Dict[str, Any], search_context: Optional[Dict[str, Any]] = None,
+                      precomputed: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        timer = StageTimer.current() or StageTimer()
+        carried_ms = sum(timer.snapshot().values())
+        with timer.activate():
+            with timer.stage("total"):
+                result = self._run_triage(ticket, search_context, precomputed)
+        if carried_ms:
+            timer.add("total", carried_ms)
+
+        result['timings'] = timer.snapshot()
+        result['processing_time_ms'] = int(result['timings']['total'])
+        self.metrics.observe(result['timings'])
+        return result
+
+    def _run_triage(self, ticket: Dict[str, Any], search_context: Optional[Dict[str, Any]] = None,
+                    precomputed: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        ticket_id = ticket.get("ticket_id", "UNKNOWN")
+        verbose = logger.isEnabledFor(logging.INFO)
+        if verbose:
+            logger.info("%s\n[TICKET] %s\nSubject: %s\n%s", "=" * 60, ticket_id,
+                        ticket.get('subject', 'No subject'), "=" * 60,
+                        extra={"ticket_id": ticket_id, "stage": "start"})
+
+        if precomputed is not None:
+            analysis = precomputed['analysis']
+        else:
+            with timed("analysis"):
+                analysis = self._analyze_content(ticket)
+        if verbose:
+            logger.info("[STEP 1] Content Analysis\n  - Sentiment: %s\n  - Urgency indicators: %d",
+                        analysis['sentiment'], len(analysis['urgency_keywords']),
+                        extra={"ticket_id": ticket_id, "stage": "analysis"})
+
+        if search_context is None:
+            with timed("context"):
+                search_context = self._search_for_context(ticket, analysis)
+        if verbose:
+            logger.info("[STEP 2] Search Tool - Context Discovery\n  - Similar tickets: %d\n  - KB articles: %d"
+                        "\n  - Customer history: %d previous tickets",
+                        len(search_context['similar_tickets']), len(search_context['kb_articles']),
+                        search_context['customer_history'].get('total_tickets', 0),
+                        extra={"ticket_id": ticket_id, "stage": "context"})
+
+        if precomputed is not None:
+            esql_analysis = precomputed['esql_analysis']
+        else:
+            with timed("scoring"):
+                esql_analysis = self._analyze_with_esql(ticket, analysis, search_context)
+        if verbose:
+            logger.info("[STEP 3] ES|QL Tool - Pattern Analysis\n  - Priority score: %d\n  - Category confidence: %.1f%%"
+                        "\n  - Recommended team: %s",
+                        esql_analysis['priority_score'], esql_analysis['category_confidence'] * 100,
+                        esql_analysis['recommended_team'],
+                        extra={"ticket_id": ticket_id, "stage": "scoring"})
+
+        if precomputed is not None:
+            decision = precomputed['decision']
+        else:
+            with timed("decision"):
+                decision = self._make_decision(ticket, analysis, search_context, esql_analysis)
+        if verbose:
+            logger.info("[STEP 4] Triage Decision\n  - Category: %s\n  - Priority: %s\n  - Assigned team: %s"
+                        "\n  - Confidence: %.1f%%",
+                        decision['category'], decision['priority'], decision['assigned_team'],
+                        decision['confidence'] * 100,
+                        extra={"ticket_id": ticket_id, "stage": "decision"})
+
+        with timed("workflow"):
+            workflow_result = self._execute_workflow(ticket, decision, search_context)
+        if verbose:
+            logger.info("[STEP 5] Workflow Tool - Actions Executed\n%s",
+                        "\n".join(f"  + {action}" for action in workflow_result['actions_taken']),
+                        extra={"ticket_id": ticket_id, "stage": "workflow"})
+
+        result = self._build_result(ticket, search_context, esql_analysis, decision, workflow_result)
+
+        with timed("audit_log"):
+            self._log_agent_action(ticket_id, decision, result)
+
+        if verbose:
+            logger.info("[COMPLETE] Triage finished successfully\n%s", "=" * 60,
+                        extra={"ticket_id": ticket_id, "stage": "complete"})
+
+        return result
+
+    def triage_batch(self, tickets: List[Dict[str, Any]], max_workers: int = 8) -> List[Dict[str, Any]]:
+        if not tickets:
+            return []
+
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(tickets)))) as pool:
+            if not self.use_msearch and not self.vectorized_scoring:
+                futures = [pool.submit(self.triage_timed, ticket) for ticket in tickets]
+            elif not self.use_msearch:
+                timed_contexts = [future.result() for future in
+                                  [pool.submit(self._timed_context, ticket) for ticket in tickets]]
+                scored = self._score_available(tickets, [context for context, _ in timed_contexts])
+                futures = [pool.submit(self.triage_timed, ticket, context, elapsed_ms, precomputed)
+                           for ticket, (context, elapsed_ms), precomputed in zip(tickets, timed_contexts, scored)]
+            else:
+                chunks = [tickets[i:i + self.msearch_batch_size]
+                          for i in range(0, len(tickets), self.msearch_batch_size)]
+                context_futures = [pool.submit(self._timed_context_batch, chunk) for chunk in chunks]
+
+                futures = []
+                for chunk, context_future in zip(chunks, context_futures):
+                    contexts, elapsed_ms = context_future.result()
+                    scored = self._score_batch(chunk, contexts) if self.vectorized_scoring else [None] * len(chunk)
+                    for ticket, context, precomputed in zip(chunk, contexts, scored):
+                        futures.append(pool.submit(self.triage_timed, ticket, context, elapsed_ms, precomputed))
+
+            results = [future.result() for future in futures]
+
+        if self.write_buffer is not None:
+            self.write_buffer.flush()
+        return results
+
+    def triage_stream(self, stream: OpenTicketStream, max_workers: int = 8) -> Iterator[Dict[str, Any]]:
+        for page in stream.pages():
+            results = self.triage_batch(page, max_workers=max_workers)
+            stream.commit()
+            yield from results
+
+    def _timed_context_batch(self, tickets: List[Dict[str, Any]]):
+        start_time = time.perf_counter()
+        contexts = self._search_for_context_batch(tickets)
+        return contexts, (time.perf_counter() - start_time) * 1000
+
+    def _timed_context(self, ticket: Dict[str, Any]):
+        start_time = time.perf_counter()
         try:
-            action_doc = {
-                "action_id": str(uuid.uuid4()),
-                "ticket_id": ticket_id,
-                "agent_name": self.agent_name,
-                "action_type": "triage",
-                "details": {
-                    "category": decision['category'],
-                    "priority": decision['priority'],
-                    "assigned_team": decision['assigned_team'],
-                    "needs_review": decision['needs_human_review']
-                },
-                "confidence_score": decision['confidence'],
-                "timestamp": datetime.now().isoformat()
+            context = self._search_for_context(ticket, self._analyze_content(ticket))
+        except Exception as e:
+            logger.warning("Error gathering context for ticket %s: %s", ticket.get('ticket_id', 'UNKNOWN'), e)
+            return None, None
+        return context, (time.perf_counter() - start_time) * 1000
+
+    def _score_available(self, tickets: List[Dict[str, Any]],
+                         contexts: List[Optional[Dict[str, Any]]]) -> List[Optional[Dict[str, Any]]]:
+        rows = [i for i, context in enumerate(contexts) if context is not None]
+        scored: List[Optional[Dict[str, Any]]] = [None] * len(tickets)
+        if rows:
+            for i, precomputed in zip(rows, self._score_batch([tickets[i] for i in rows], [contexts[i] for i in rows])):
+                scored[i] = precomputed
+        return scored
+
+    def _score_batch(self, tickets: List[Dict[str, Any]], contexts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        start_time = time.perf_counter()
+        try:
+            analyses = [self._analyze_content(ticket) for ticket in tickets]
+            esql_analyses, decisions = score_batch(tickets, analyses, contexts, self._get_team_workload(),
+                                                   self._classify_by_keywords)
+        except Exception as e:
+            logger.warning("Error in batch scoring, falling back to per-ticket scoring: %s", e)
+            return [None] * len(tickets)
+
+        scoring_ms = (time.perf_counter() - start_time) * 1000 / len(tickets)
+        return [
+            {"analysis": analysis, "esql_analysis": esql_analysis, "decision": decision, "scoring_ms": scoring_ms}
+            for analysis, esql_analysis, decision in zip(analyses, esql_analyses, decisions)
+        ]
+
+    def triage_timed(self, ticket: Dict[str, Any], search_context: Optional[Dict[str, Any]] = None,
+                     context_ms: Optional[float] = None,
+                     precomputed: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        start_time = time.perf_counter()
+        timer = StageTimer()
+        if context_ms is not None:
+            timer.add("context", context_ms)
+        if precomputed is not None:
+            timer.add("scoring", precomputed["scoring_ms"])
+        try:
+            with timer.activate():
+                result = self.triage_ticket(ticket, search_context, precomputed)
+        except Exception as e:
+            logger.warning("Error triaging ticket %s: %s", ticket.get('ticket_id', 'UNKNOWN'), e)
+            result = {
+                "ticket_id": ticket.get("ticket_id", "UNKNOWN"),
+                "original_status": ticket.get("status", "open"),
+                "error": str(e),
+                "timings": timer.snapshot(),
+                "processing_time_ms": int((time.perf_counter() - start_time) * 1000)
             }
+        return result
 
-            self.es.index(
-                index="agent_actions",
-                body=action_doc
-            )
+    def _search_for_context(self, ticket: Dict[str, Any], analysis: Dict) -> Dict[str, Any]:
+
+        if self.use_msearch:
+            return self._search_for_context_batch([ticket])[0]
+
+        if self._context_pool is not None:
+            return self._search_for_context_parallel(ticket)
+
+        subject_prior = self._subject_prior(ticket)
+        query_vector = self._query_vectors([ticket])[0]
+        similar_tickets = [] if subject_prior else self._search_similar_tickets(ticket, query_vector)
+
+        kb_articles = self._search_kb_articles(ticket, query_vector)
+
+        customer_id = ticket.get('customer_id')
+        customer_history = self._get_customer_history(customer_id) if customer_id else {}
+
+        return {
+            'similar_tickets': similar_tickets,
+            'kb_articles': kb_articles,
+            'customer_history': customer_history,
+            'subject_prior': subject_prior
+        }
+
+    def _submit(self, fn, *args):
+        return self._context_pool.submit(contextvars.copy_context().run, fn, *args)
+
+    def _search_for_context_parallel(self, ticket: Dict[str, Any]) -> Dict[str, Any]:
+        customer_id = ticket.get('customer_id')
+
+        subject_prior = self._subject_prior(ticket)
+        query_vector = self._query_vectors([ticket])[0]
+        similar_future = None if subject_prior else self._submit(self._search_similar_tickets, ticket, query_vector)
+        kb_future = self._submit(self._search_kb_articles, ticket, query_vector)
+
+        customer_history = {}
+        if customer_id:
+            cached = self.customer_cache.get(customer_id)
+            profile_future = None if cached else self._submit(self._fetch_customer_profile, customer_id)
+            past_tickets_future = None if cached and cached["past_tickets"] is not None \
+                else self._submit(self._fetch_customer_tickets, customer_id)
+            try:
+                customer = cached["profile"] if profile_future is None else profile_future.result()
+                past_tickets = cached["past_tickets"] if past_tickets_future is None else past_tickets_future.result()
+                self._cache_customer_context(customer_id, cached, customer, past_tickets)
+                customer_history = self._build_customer_history(customer_id, customer, past_tickets)
+            except Exception as e:
+                logger.warning("Error getting customer history: %s", e)
+                customer_history = self._default_customer_history(customer_id)
+
+        return {
+            'similar_tickets': [] if similar_future is None else similar_future.result(),
+            'kb_articles': kb_future.result(),
+            'customer_history': customer_history,
+            'subject_prior': subject_prior
+        }
+
+    def _search_for_context_batch(self, tickets: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        searches = []
+        slots = []
+        customer_slots = {}
+
+        def add_search(index: str, body: Dict) -> int:
+            searches.append({"index": index})
+            searches.append(body)
+            return len(searches) // 2 - 1
+
+        query_vectors = self._query_vectors(tickets)
+        esql_stats = self._esql_stats(tickets)
+        for ticket, query_vector, stats in zip(tickets, query_vectors, esql_stats):
+            customer_id = ticket.get('customer_id')
+            if customer_id and customer_id not in customer_slots:
+                cached = self.customer_cache.get(customer_id)
+                customer_slots[customer_id] = (
+                    cached,
+                    None if cached else add_search("customers", self._customer_profile_query(customer_id)),
+                    None if cached and cached["past_tickets"] is not None
+                    else add_search("support_tickets", self._customer_tickets_query(customer_id))
+                )
+            subject_prior = self._subject_prior(ticket)
+            voted = bool(subject_prior or (stats and stats['category_votes']))
+            slots.append((
+                subject_prior,
+                voted,
+                None if voted or self.prefer_local_index
+                else add_search("support_tickets", self._similar_tickets_query(ticket, query_vector)),
+                add_search("knowledge_base", self._kb_articles_query(ticket, query_vector))
+            ))
+
+        try:
+            with timed("msearch"):
+                responses = self.es.msearch(searches=searches)["responses"] if searches else []
         except Exception as e:
-            print(f"[WARNING] Error logging action: {e}")
+            logger.warning("Error running multi-search: %s", e)
+            responses = [{"error": str(e)}] * (len(searches) // 2)
+
+        customer_histories = {}
+        for customer_id, (cached, profile_slot, tickets_slot) in customer_slots.items():
+            try:
+                if profile_slot is None:
+                    customer = cached["profile"]
+                else:
+                    profile_hits = self._msearch_hits(responses[profile_slot])
+                    if not profile_hits:
+                        raise LookupError(f"customer {customer_id} not found")
+                    customer = profile_hits[0]["_source"]
+
+                if tickets_slot is None:
+                    past_tickets = cached["past_tickets"]
+                else:
+                    past_tickets = [hit["_source"] for hit in self._msearch_hits(responses[tickets_slot])]
+
+                self._cache_customer_context(customer_id, cached, customer, past_tickets)
+                customer_histories[customer_id] = self._build_customer_history(customer_id, customer, past_tickets)
+            except Exception as e:
+                logger.warning("Error getting customer history: %s", e)
+                customer_histories[customer_id] = self._default_customer_history(customer_id)
+
+        local_results = iter(self._local_similar_tickets_batch(
+            [ticket for ticket, (_, voted, _, _) in zip(tickets, slots) if not voted],
+            [vector for vector, (_, voted, _, _) in zip(query_vectors, slots) if not voted]
+        )) if self.prefer_local_index else None
+
+        contexts = []
+        for ticket, query_vector, stats, (subject_prior, voted, similar_slot, kb_slot) in zip(
+                tickets, query_vectors, esql_stats, slots):
+            try:
+                if voted:
+                    similar_tickets = []
+                elif local_results is not None:
+                    similar_tickets = next(local_results)
+                else:
+                    similar_tickets = self._parse_similar_tickets(self._msearch_hits(responses[similar_slot]))
+            except Exception as e:
+                logger.warning("Error searching similar tickets: %s", e)
+                similar_tickets = self._fallback_similar_tickets(ticket, query_vector)
+
+            try:
+                kb_articles = self._parse_kb_articles(self._msearch_hits(responses[kb_slot]))
+            except Exception as e:
+                logger.warning("Error searching KB: %s", e)
+                kb_articles = []
+
+            customer_id = ticket.get('customer_id')
+            context = {
+                'similar_tickets': similar_tickets,
+                'kb_articles': kb_articles,
+                'customer_history': customer_histories[customer_id] if customer_id else {},
+                'subject_prior': subject_prior
+            }
+            if stats is not None:
+                self._merge_esql_stats(context, stats)
+            elif self.esql_analytics is not None:
+                context['esql_stats'] = None
+            contexts.append(context)
+
+        return contexts
+
+    def _esql_stats(self, tickets: List[Dict[str, Any]]) -> List[Optional[Dict[str, Any]]]:
+        stats = None
+        if self.esql_analytics is not None and len(tickets) > 1:
+            with timed("esql"):
+                stats = self.esql_analytics.batch_stats(tickets)
+        return stats or [None] * len(tickets)
+
+    def _msearch_hits(self, response: Dict) -> List[Dict]:
+        if "error" in response:
+            raise RuntimeError(response["error"])
+        return response["hits"]["hits"]
+
+    def _search_similar_tickets(self, ticket: Dict[str, Any], query_vector: Optional[List[float]] = None) -> List[Dict]:
+        if self.prefer_local_index:
+            return self._local_similar_tickets_batch([ticket], [query_vector])[0]
+        try:
+            with timed("similar_tickets"):
+                response = self.es.search(
+                    index="support_tickets",
+                    body=self._similar_tickets_query(ticket, query_vector)
+                )
+            return self._parse_similar_tickets(response["hits"]["hits"])
+        except Exception as e:
+            logger.warning("Error searching similar tickets: %s", e)
+            return self._fallback_similar_tickets(ticket, query_vector)
 
-def main():
-    print("Support Ticket Triage Agent\n")
+    def _search_kb_articles(self, ticket: Dict[str, Any], query_vector: Optional[List[float]] = None) -> List[Dict]:
+        try:
+            with timed("kb_search"):
+                response = self.es.search(
+                    index="knowledge_base",
+                    body=self._kb_articles_query(ticket, query_vector)
+                )
+            return self._parse_kb_articles(response["hits"]["hits"])
+        except Exception as e:
+            logger.warning("Error searching KB: %s", e)
+            return []
+
+    def _get_customer_history(self, customer_id: str) -> Dict:
+        cached = self.customer_cache.get(customer_id)
+        try:
+            customer = cached["profile"] if cached else self._fetch_customer_profile(customer_id)
+            past_tickets = cached["past_tickets"] if cached and cached["past_tickets"] is not None \
+                else self._fetch_customer_tickets(customer_id)
+            self._cache_customer_context(customer_id, cached, customer, past_tickets)
+            return self._build_customer_history(customer_id, customer, past_tickets)
+        except Exception as e:
+            logger.warning("Error getting customer history: %s", e)
+            return self._default_customer_history(customer_id)
 
-    if os.getenv('ELASTICSEARCH_URL'):
-        if os.getenv('ELASTIC_API_KEY'):
-            es = Elasticsearch(
-                os.getenv('ELASTICSEARCH_URL'),
-                api_key=os.getenv('ELASTIC_API_KEY'),
-                verify_certs=True
+    def _fetch_customer_profile(self, customer_id: str) -> Dict:
+        with timed("customer_lookup"):
+            customer_response = self.es.get(index="customers", id=customer_id)
+        return customer_response["_source"]
+
+    def _fetch_customer_tickets(self, customer_id: str) -> List[Dict]:
+        with timed("customer_lookup"):
+            tickets_response = self.es.search(
+                index="support_tickets",
+                body=self._customer_tickets_query(customer_id)
             )
+        return [hit["_source"] for hit in tickets_response["hits"]["hits"]]
+
+    def _analyze_with_esql(self, ticket: Dict, analysis: Dict, context: Dict) -> Dict:
+        with timed("workload"):
+            team_workload = self._get_team_workload()
+        return self._score_ticket(ticket, analysis, context, team_workload)
+
+    def _get_team_workload(self) -> Dict[str, int]:
+        return self.workload.get()
+
+    def _fetch_team_workload(self) -> Dict[str, int]:
+        response = self.es.search(index="support_tickets", body=self._team_workload_query())
+        return self._parse_team_workload(response)
+
+    def _execute_workflow(self, ticket: Dict, decision: Dict, context: Dict) -> Dict:
+        actions_taken = []
+        workflow_result = {
+            'actions_taken': actions_taken,
+            'status': 'success',
+            'timestamp': None
+        }
+
+        ticket_id = ticket.get("ticket_id", "UNKNOWN")
+
+        try:
+            if ticket_id != "UNKNOWN":
+                update_doc = self._ticket_update_doc(decision)
+                if self.write_buffer is not None:
+                    workflow_result['status'] = 'pending'
+                    workflow_result['writes'] = {'ticket_update': 'queued'}
+                    if ticket.get('customer_id'):
+                        self.customer_cache.invalidate(ticket['customer_id'], tickets_only=True)
+                    self.write_buffer.add(
+                        {"_op_type": "update", "_index": "support_tickets", "_id": ticket_id, "doc": update_doc},
+                        callback=lambda ok, item: self._on_ticket_written(ticket, decision, workflow_result, ok, item)
+                    )
+                    actions_taken.append(f"Queued ticket update (category={decision['category']}, priority={decision['priority']})")
+                else:
+                    with timed("ticket_update"):
+                        self.es.update(
+                            index="support_tickets",
+                            id=ticket_id,
+                            body={"doc": update_doc}
+                        )
+                    self._after_ticket_update(ticket, decision)
+                    actions_taken.append(f"Updated ticket fields (category={decision['category']}, priority={decision['priority']})")
+            else:
+                actions_taken.append("Skipped ticket update (no ticket ID)")
+        except Exception as e:
+            logger.warning("Error updating ticket: %s", e)
+            actions_taken.append(f"Failed to update ticket: {e}")
+            self._record_write_error(workflow_result, 'ticket_update', str(e))
+
+        return self._complete_workflow(decision, workflow_result)
+
+    def _on_ticket_written(self, ticket: Dict, decision: Dict, workflow_result: Dict, ok: bool, item: Dict):
+        if ok:
+            workflow_result['writes']['ticket_update'] = 'written'
+            workflow_result['status'] = 'partial' if workflow_result.get('write_errors') else 'success'
+            self._after_ticket_update(ticket, decision)
         else:
-            password = os.getenv('ELASTIC_PASSWORD')
-            if not password:
-                raise ValueError("ELASTIC_PASSWORD is required when not using API key")
-            es = Elasticsearch(
-                os.getenv('ELASTICSEARCH_URL'),
-                basic_auth=(
-                    os.getenv('ELASTIC_USERNAME', 'elastic'),
-                    password
-                ),
-                verify_certs=True
-            )
-    elif os.getenv('ELASTIC_CLOUD_ID') and os.getenv('ELASTIC_API_KEY'):
-        es = Elasticsearch(
-            cloud_id=os.getenv('ELASTIC_CLOUD_ID'),
-            api_key=os.getenv('ELASTIC_API_KEY')
-        )
-    else:
-        raise ValueError("Missing Elasticsearch configuration")
+            error = bulk_item_error(item)
+            logger.warning("Error updating ticket: %s", error)
+            workflow_result['writes']['ticket_update'] = 'failed'
+            workflow_result['actions_taken'].append(f"Failed to update ticket: {error}")
+            self._record_write_error(workflow_result, 'ticket_update', error)
+
+    def _log_agent_action(self, ticket_id: str, decision: Dict, result: Dict):
+        try:
+            action_doc = self._action_doc(ticket_id, decision)
+
+            if self.write_buffer is not None:
+                writes = result['workflow_result'].setdefault('writes', {})
+                writes['audit_log'] = 'queued'
+                self.write_buffer.add(
+                    {"_op_type": "index", "_index": "agent_actions", "_id": action_doc["action_id"], "_source": action_doc},
+                    callback=lambda ok, item: self._on_action_logged(result['workflow_result'], ok, item)
+                )
+            else:
+                self.es.index(
+                    index="agent_actions",
+                    body=action_doc
+                )
+        except Exception as e:
+            logger.warning("Error logging action: %s", e)
+            self._record_write_error(result['workflow_result'], 'audit_log', str(e))
+
+    def _on_action_logged(self, workflow_result: Dict, ok: bool, item: Dict):
+        if ok:
+            workflow_result['writes']['audit_log'] = 'written'
+        else:
+            error = bulk_item_error(item)
+            logger.warning("Error logging action: %s", error)
+            workflow_result['writes']['audit_log'] = 'failed'
+            self._record_write_error(workflow_result, 'audit_log', error)
+
+def print_stage_latency(metrics: MetricsSink):
+    if not isinstance(metrics, LatencyHistogram):
+        return
+    summary = metrics.summary()
+    if not summary:
+        return
+    print("Stage latency (ms):")
+    for stage, stats in sorted(summary.items(), key=lambda kv: -kv[1]['p95']):
+        print(f"  {stage:<16} p50={stats['p50']:8.1f}  p95={stats['p95']:8.1f}  p99={stats['p99']:8.1f}  (n={stats['count']})")
+
+def stream_backlog(agent: TriageAgent, stream: OpenTicketStream, max_workers: int = 8):
+    if stream.processed:
+        print(f"[INFO] Resuming backlog from checkpoint after {stream.processed} tickets\n")
+
+    start_time = time.perf_counter()
+    triaged = failed = 0
+    priority_counts = {"critical": 0, "high": 0, "medium": 0, "low": 0}
 
+    for result in agent.triage_stream(stream, max_workers=max_workers):
+        if 'error' in result:
+            failed += 1
+            print(f"[ERROR] Triage failed for {result['ticket_id']}: {result['error']}")
+            continue
+        triaged += 1
+        p = result['triage_decision']['priority']
+        priority_counts[p] = priority_counts.get(p, 0) + 1
+        if (triaged + failed) % stream.page_size == 0:
+            print(f"[INFO] {stream.processed} tickets processed")
+
+    elapsed = time.perf_counter() - start_time
+    print(f"\n{'='*60}")
+    print(f"Priority Breakdown: Critical={priority_counts['critical']} | High={priority_counts['high']} | Medium={priority_counts['medium']} | Low={priority_counts['low']}")
+    print(f"Throughput: {(triaged + failed) / elapsed if elapsed else 0:.1f} tickets/sec")
+    print_stage_latency(agent.metrics)
+    print(f"[SUCCESS] {triaged} tickets triaged from the open backlog")
+    if failed:
+        print(f"[WARNING] {failed} tickets failed triage")
+
+def connect_elasticsearch(**client_options) -> Elasticsearch:
+    es = create_client(**client_options) if client_options else get_client()
     if not es.ping():
         raise ConnectionError("Failed to connect to Elasticsearch")
+    return es
+
+def build_agent(es: Elasticsearch, write_buffer: Optional[WorkflowWriteBuffer] = None, **overrides) -> TriageAgent:
+    embedder = overrides.pop('embedder', None) or load_embedder()
+    options = dict(
+        parallel_context=os.getenv('TRIAGE_PARALLEL_CONTEXT', 'true').lower() == 'true',
+        use_msearch=os.getenv('TRIAGE_USE_MSEARCH', 'false').lower() == 'true',
+        workload_ttl=float(os.getenv('TRIAGE_WORKLOAD_TTL', '30')),
+        customer_cache_ttl=float(os.getenv('TRIAGE_CUSTOMER_CACHE_TTL', '60')),
+        write_buffer=write_buffer,
+        subject_priors=load_subject_priors(),
+        embedder=embedder,
+        local_index=load_local_index(embedder=embedder),
+        prefer_local_index=os.getenv('TRIAGE_PREFER_LOCAL_INDEX', 'false').lower() == 'true',
+        vectorized_scoring=os.getenv('TRIAGE_VECTORIZED_SCORING', 'false').lower() == 'true',
+        esql_analytics=EsqlAnalytics(es) if os.getenv('TRIAGE_ESQL_ANALYTICS', 'false').lower() == 'true' else None
+    )
+    options.update(overrides)
+    return TriageAgent(es, **options)
 
+def main():
+    configure_logging()
+    print("Support Ticket Triage Agent\n")
+
+    es = connect_elasticsearch()
     print("[INFO] Connected to Elasticsearch\n")
 
-    agent = TriageAgent(es)
+    write_buffer = WorkflowWriteBuffer(es) if os.getenv('TRIAGE_BULK_WRITES', 'true').lower() == 'true' else None
+    agent = build_agent(es, write_buffer)
+
+    max_workers = int(os.getenv('TRIAGE_MAX_WORKERS', '8'))
 
-    priority_order = {"critical": 0, "high": 1, "medium": 2, "low": 3}
+    if os.getenv('TRIAGE_STREAM', 'false').lower() == 'true':
+        stream = OpenTicketStream(
+            es,
+            page_size=int(os.getenv('TRIAGE_STREAM_PAGE_SIZE', '200')),
+            checkpoint_path=os.getenv('TRIAGE_CHECKPOINT_PATH', '.triage_checkpoint.json')
+        )
+        try:
+            stream_backlog(agent, stream, max_workers)
+        finally:
+            agent.close()
+            if write_buffer is not None:
+                write_buffer.close()
+        return
 
     response = es.search(
         index="support_tickets",
@@ -493,7 +1097,7 @@ def main():
     )
 
     all_tickets = [hit["_source"] for hit in response["hits"]["hits"]]
-    tickets = sorted(all_tickets, key=lambda t: priority_order.get(t.get("priority", "low"), 3))[:10]
+    tickets = sorted(all_tickets, key=lambda t: PRIORITY_RANK.get(t.get("priority", "low"), 3))[:10]
 
     print(f"Found {len(all_tickets)} open tickets — processing top 10 by priority\n")
     print("Queue order:")
@@ -501,19 +1105,21 @@ def main():
         print(f"  {i:2}. [{t.get('priority','?').upper():8}] {t['ticket_id']} - {t['subject'][:50]}")
     print()
 
-    results = []
-    for ticket in tickets:
-        start_time = datetime.now()
-        result = agent.triage_ticket(ticket)
-        end_time = datetime.now()
-
-        result['processing_time_ms'] = int((end_time - start_time).total_seconds() * 1000)
-        results.append(result)
+    results = agent.triage_batch(tickets, max_workers=max_workers)
+    agent.close()
+    if write_buffer is not None:
+        write_buffer.close()
+    failed = [r for r in results if 'error' in r]
+    results = [r for r in results if 'error' not in r]
 
     print("\n" + "="*60)
     print("TRIAGE SUMMARY")
     print("="*60)
 
+    for result in failed:
+        print(f"\nTicket {result['ticket_id']}:")
+        print(f"  [ERROR] Triage failed: {result['error']}")
+
     priority_counts = {"critical": 0, "high": 0, "medium": 0, "low": 0}
     for result in results:
         p = result['triage_decision']['priority']
@@ -526,11 +1132,16 @@ def main():
         if result['triage_decision']['needs_human_review']:
             print(f"  [REVIEW REQUIRED] Flagged for human review")
 
-    avg_time = sum(r['processing_time_ms'] for r in results) / len(results)
+    avg_time = sum(r['processing_time_ms'] for r in results) / len(results) if results else 0
     print(f"\n{'='*60}")
     print(f"Priority Breakdown: Critical={priority_counts['critical']} | High={priority_counts['high']} | Medium={priority_counts['medium']} | Low={priority_counts['low']}")
     print(f"Average processing time: {avg_time:.0f}ms")
+    cache_stats = agent.customer_cache.stats()
+    print(f"Customer cache: {cache_stats['hits'] + cache_stats['partial_hits']} hits / {cache_stats['misses']} misses")
+    print_stage_latency(agent.metrics)
     print(f"[SUCCESS] {len(results)} tickets triaged successfully!")
+    if failed:
+        print(f"[WARNING] {len(failed)} tickets failed triage")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,241 @@
+import logging
+import os
+import queue
+import signal
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from elasticsearch import Elasticsearch
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from agent.bulk_writer import WorkflowWriteBuffer
+from agent.logging_utils import configure_logging
+from agent.snapshot_sync import start_snapshot_sync
+from agent.triage_agent import TriageAgent, build_agent, connect_elasticsearch, print_stage_latency
+
+logger = logging.getLogger("agent.worker")
+
+ResultCallback = Callable[[Dict[str, Any]], None]
+
+_STOP = object()
+
+class OpenTicketPoller:
+
+    def __init__(self, es_client: Elasticsearch, index: str = "support_tickets", status: str = "open",
+                 claim_ttl: float = 300.0, ack_grace: float = 10.0, max_claims: int = 1000):
+        self.es = es_client
+        self.index = index
+        self.status = status
+        self.claim_ttl = claim_ttl
+        self.ack_grace = ack_grace
+        self.max_claims = max_claims
+        self._claimed: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def poll(self, max_items: int) -> List[Dict[str, Any]]:
+        now = time.monotonic()
+        with self._lock:
+            self._claimed = {tid: expires for tid, expires in self._claimed.items() if expires > now}
+            excluded = sorted(self._claimed, key=self._claimed.get, reverse=True)[:self.max_claims]
+            overflow = len(self._claimed) - len(excluded)
+
+        query: Dict[str, Any] = {"bool": {"filter": [{"term": {"status": self.status}}]}}
+        if excluded:
+            query["bool"]["must_not"] = [{"ids": {"values": excluded}}]
+
+        try:
+            response = self.es.search(
+                index=self.index,
+                body={
+                    "query": query,
+                    "size": max_items + overflow,
+                    "sort": [{"status": "asc"}, {"created_at": "asc"}],
+                    "track_total_hits": False
+                }
+            )
+        except Exception as e:
+            logger.warning("Error polling for open tickets: %s", e)
+            return []
+
+        with self._lock:
+            tickets = [hit["_source"] for hit in response["hits"]["hits"]
+                       if hit["_source"]["ticket_id"] not in self._claimed][:max_items]
+            for ticket in tickets:
+                self._claimed[ticket["ticket_id"]] = now + self.claim_ttl
+        return tickets
+
+    def ack(self, ticket_id: str):
+        with self._lock:
+            if ticket_id in self._claimed:
+                self._claimed[ticket_id] = min(self._claimed[ticket_id], time.monotonic() + self.ack_grace)
+
+    def claims(self) -> int:
+        with self._lock:
+            return len(self._claimed)
+
+class LocalTicketQueue:
+
+    def __init__(self):
+        self._queue: "queue.Queue[Dict[str, Any]]" = queue.Queue()
+
+    def put(self, ticket: Dict[str, Any]):
+        self._queue.put(ticket)
+
+    def poll(self, max_items: int) -> List[Dict[str, Any]]:
+        tickets = []
+        while len(tickets) < max_items:
+            try:
+                tickets.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return tickets
+
+    def ack(self, ticket_id: str):
+        pass
+
+    def __len__(self) -> int:
+        return self._queue.qsize()
+
+class TriageWorker:
+
+    def __init__(self, agent: TriageAgent, source, concurrency: int = 8, max_pending: Optional[int] = None,
+                 poll_interval: float = 1.0, on_result: Optional[ResultCallback] = None):
+        self.agent = agent
+        self.source = source
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.on_result = on_result
+        self.processed = 0
+        self.failed = 0
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max_pending or concurrency * 4)
+        self._stopping = threading.Event()
+        self._stats_lock = threading.Lock()
+        self._fetcher: Optional[threading.Thread] = None
+        self._workers: List[threading.Thread] = []
+
+    def start(self):
+        if self._fetcher is not None:
+            return
+        self._fetcher = threading.Thread(target=self._fetch_loop, name="triage-fetch", daemon=True)
+        self._fetcher.start()
+        for i in range(self.concurrency):
+            worker = threading.Thread(target=self._work_loop, name=f"triage-worker-{i}", daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+    def stop(self, timeout: Optional[float] = None):
+        self._stopping.set()
+        if self._fetcher is not None:
+            self._fetcher.join(timeout)
+        for _ in self._workers:
+            self._queue.put(_STOP)
+        for worker in self._workers:
+            worker.join(timeout)
+        self._workers = []
+        self._fetcher = None
+        if self.agent.write_buffer is not None:
+            self.agent.write_buffer.flush()
+
+    def run_forever(self):
+        previous = {}
+        if threading.current_thread() is threading.main_thread():
+            for sig in (signal.SIGTERM, signal.SIGINT):
+                previous[sig] = signal.signal(sig, self._request_stop)
+
+        self.start()
+        logger.info("Triage worker started with %d workers", self.concurrency)
+        try:
+            while not self._stopping.wait(0.5):
+                pass
+        finally:
+            logger.info("Draining %d queued tickets", self.pending())
+            self.stop()
+            for sig, handler in previous.items():
+                signal.signal(sig, handler)
+
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def _request_stop(self, signum, frame):
+        logger.info("Received signal %d, stopping after in-flight tickets", signum)
+        self._stopping.set()
+
+    def _fetch_loop(self):
+        while not self._stopping.is_set():
+            capacity = self._queue.maxsize - self._queue.qsize()
+            if capacity <= 0:
+                self._stopping.wait(min(self.poll_interval, 0.05))
+                continue
+
+            try:
+                tickets = self.source.poll(capacity)
+            except Exception as e:
+                logger.warning("Error polling ticket source: %s", e)
+                tickets = []
+
+            if not tickets:
+                self._stopping.wait(self.poll_interval)
+                continue
+            for ticket in tickets:
+                self._queue.put(ticket)
+
+    def _work_loop(self):
+        while True:
+            ticket = self._queue.get()
+            try:
+                if ticket is _STOP:
+                    return
+                result = self.agent.triage_timed(ticket)
+                self.source.ack(ticket.get("ticket_id"))
+                with self._stats_lock:
+                    if 'error' in result:
+                        self.failed += 1
+                    else:
+                        self.processed += 1
+                if self.on_result is not None:
+                    self.on_result(result)
+            except Exception as e:
+                logger.warning("Error in triage worker: %s", e)
+            finally:
+                self._queue.task_done()
+
+def main():
+    configure_logging()
+    concurrency = int(os.getenv('TRIAGE_WORKER_CONCURRENCY', '8'))
+
+    es = connect_elasticsearch(connections_per_node=concurrency * 4)
+    write_buffer = WorkflowWriteBuffer(es) if os.getenv('TRIAGE_BULK_WRITES', 'true').lower() == 'true' else None
+    agent = build_agent(es, write_buffer)
+    sync = start_snapshot_sync(es, agent)
+
+    worker = TriageWorker(
+        agent,
+        OpenTicketPoller(es),
+        concurrency=concurrency,
+        max_pending=int(os.getenv('TRIAGE_WORKER_QUEUE_SIZE', str(concurrency * 4))),
+        poll_interval=float(os.getenv('TRIAGE_POLL_INTERVAL', '2'))
+    )
+    print(f"Triage worker running with {concurrency} workers (Ctrl+C or SIGTERM to drain and stop)")
+    worker.run_forever()
+
+    if sync is not None:
+        sync.stop()
+    agent.close()
+    if write_buffer is not None:
+        write_buffer.close()
+    print(f"[SUCCESS] Worker stopped: {worker.processed} tickets triaged, {worker.failed} failed")
+    print_stage_latency(agent.metrics)
+
+if __name__ == "__main__":
+    main()
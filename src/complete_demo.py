@@ -1,13 +1,14 @@
 import os
 import sys
-from elasticsearch import Elasticsearch
 from dotenv import load_dotenv
 import time
 from datetime import datetime
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+from agent.logging_utils import configure_logging
 from agent.triage_agent import TriageAgent
+from es_config.client import get_client
 from metrics_dashboard import MetricsDashboard
 
 load_dotenv()
@@ -20,27 +21,7 @@ def print_banner(text):
 def connect_to_elasticsearch():
     print_banner("🔌 CONNECTING TO ELASTICSEARCH")
 
-    if os.getenv('ELASTICSEARCH_URL'):
-        if os.getenv('ELASTIC_API_KEY'):
-            es = Elasticsearch(
-                os.getenv('ELASTICSEARCH_URL'),
-                api_key=os.getenv('ELASTIC_API_KEY'),
-                verify_certs=True
-            )
-        else:
-            password = os.getenv('ELASTIC_PASSWORD')
-            if not password:
-                raise ValueError("ELASTIC_PASSWORD is required when not using API key")
-            es = Elasticsearch(
-                os.getenv('ELASTICSEARCH_URL'),
-                basic_auth=(
-                    os.getenv('ELASTIC_USERNAME', 'elastic'),
-                    password
-                ),
-                verify_certs=True
-            )
-    else:
-        raise ValueError("Missing Elasticsearch configuration")
+    es = get_client()
 
     if es.ping():
         info = es.info()
@@ -67,6 +48,7 @@ def show_data_statistics(es):
 
 def demo_single_ticket(es, agent):
     print_banner("🎯 DEMO: Single Ticket Triage with Explanation")
+    configure_logging(level="INFO", stream=sys.stdout)
 
     response = es.search(
         index="support_tickets",
@@ -96,12 +78,12 @@ def demo_single_ticket(es, agent):
         input("Press ENTER to watch the agent triage this ticket...")
         print()
 
-        start_time = time.time()
         result = agent.triage_ticket(ticket)
-        end_time = time.time()
 
         print()
-        print(f"⏱️  Processing completed in {(end_time - start_time)*1000:.0f}ms")
+        print(f"⏱️  Processing completed in {result['processing_time_ms']}ms")
+        slowest = max((stage for stage in result['timings'] if stage != 'total'), key=result['timings'].get)
+        print(f"   Slowest stage: {slowest} ({result['timings'][slowest]:.0f}ms)")
         print()
         print("📋 Suggested Response to Customer:")
         print("-" * 80)
@@ -111,6 +93,7 @@ def demo_single_ticket(es, agent):
 
 def demo_batch_processing(es, agent):
     print_banner("⚡ DEMO: Batch Processing (10 Tickets)")
+    configure_logging()
 
     response = es.search(
         index="support_tickets",
@@ -121,29 +104,31 @@ def demo_batch_processing(es, agent):
 
     print(f"Processing {len(tickets)} tickets...\n")
 
-    results = []
     total_start = time.time()
+    results = agent.triage_batch(tickets, max_workers=int(os.getenv('TRIAGE_MAX_WORKERS', '8')))
+    total_end = time.time()
 
-    for i, ticket in enumerate(tickets, 1):
+    for i, (ticket, result) in enumerate(zip(tickets, results), 1):
         print(f"[{i}/{len(tickets)}] {ticket['ticket_id']}: {ticket['subject'][:50]}...")
 
-        start_time = time.time()
-        result = agent.triage_ticket(ticket)
-        end_time = time.time()
-
-        result['processing_time_ms'] = int((end_time - start_time) * 1000)
-        results.append(result)
+        if 'error' in result:
+            print(f"       → ❌ {result['error']}")
+            print()
+            continue
 
         decision = result['triage_decision']
         print(f"       → {decision['category']} | {decision['priority']} | {decision['assigned_team']} ({decision['confidence']:.0%})")
         print()
 
-    total_end = time.time()
-
     print("\n" + "="*80)
     print("📊 BATCH PROCESSING SUMMARY")
     print("="*80)
 
+    results = [r for r in results if 'error' not in r]
+    if not results:
+        print("\nNo tickets were triaged successfully.")
+        return
+
     avg_time = sum(r['processing_time_ms'] for r in results) / len(results)
     total_time = (total_end - total_start) * 1000
 
@@ -212,7 +197,7 @@ def main():
         input("Press ENTER to continue...")
 
         print_banner("🤖 INITIALIZING TRIAGE AGENT")
-        agent = TriageAgent(es)
+        agent = TriageAgent(es, parallel_context=True)
         print("✅ Agent initialized with multi-step reasoning enabled")
         print("   - Search Tool: Ready")
         print("   - ES|QL Tool: Ready")
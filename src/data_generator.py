@@ -161,15 +161,17 @@ class SupportDataGenerator:
         for i in range(count):
             customer_id = f"CUST-{str(i+1).zfill(4)}"
             plan = random.choice(list(self.CUSTOMER_PLANS.keys()))
+            signup_date = (datetime.now() - timedelta(days=random.randint(30, 730))).isoformat()
 
             customer = {
                 "customer_id": customer_id,
                 "email": f"customer{i+1}@example.com",
                 "name": f"Customer {i+1}",
                 "plan": plan,
-                "signup_date": (datetime.now() - timedelta(days=random.randint(30, 730))).isoformat(),
+                "signup_date": signup_date,
                 "total_tickets": random.randint(0, 20),
-                "satisfaction_score": round(random.uniform(3.0, 5.0), 1)
+                "satisfaction_score": round(random.uniform(3.0, 5.0), 1),
+                "updated_at": signup_date
             }
             customers.append(customer)
 
@@ -0,0 +1,135 @@
+import logging
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from elasticsearch import Elasticsearch, NotFoundError, helpers
+
+logger = logging.getLogger(__name__)
+
+def versioned_name(alias: str, version: Optional[str] = None) -> str:
+    return f"{alias}-v{version or datetime.now(timezone.utc).strftime('%Y%m%d%H%M%S%f')}"
+
+def alias_targets(es_client: Elasticsearch, alias: str) -> List[str]:
+    try:
+        return sorted(es_client.indices.get_alias(name=alias))
+    except NotFoundError:
+        return []
+
+def index_versions(es_client: Elasticsearch, alias: str) -> List[str]:
+    return sorted(es_client.indices.get(index=f"{alias}-v*", allow_no_indices=True, expand_wildcards="open"))
+
+def create_versioned_index(es_client: Elasticsearch, alias: str, mapping: Dict[str, Any],
+                           settings: Optional[Dict[str, Any]] = None, version: Optional[str] = None) -> str:
+    index = versioned_name(alias, version)
+    body: Dict[str, Any] = {"mappings": mapping}
+    if settings:
+        body["settings"] = settings
+    es_client.indices.create(index=index, body=body)
+    return index
+
+def finalize_index(es_client: Elasticsearch, index: str, max_num_segments: int = 1):
+    es_client.indices.refresh(index=index)
+    if max_num_segments > 0:
+        es_client.indices.forcemerge(index=index, max_num_segments=max_num_segments)
+    es_client.indices.refresh(index=index)
+
+def document_ids(es_client: Elasticsearch, index: str, page_size: int = 5000, keep_alive: str = "2m") -> Set[str]:
+    ids: Set[str] = set()
+    pit_id = es_client.open_point_in_time(index=index, keep_alive=keep_alive)["id"]
+    search_after: Optional[List[Any]] = None
+    try:
+        while True:
+            body: Dict[str, Any] = {
+                "size": page_size,
+                "sort": [{"_shard_doc": "asc"}],
+                "_source": False,
+                "pit": {"id": pit_id, "keep_alive": keep_alive},
+                "track_total_hits": False
+            }
+            if search_after is not None:
+                body["search_after"] = search_after
+            response = es_client.search(body=body)
+            pit_id = response.get("pit_id", pit_id)
+            hits = response["hits"]["hits"]
+            ids.update(hit["_id"] for hit in hits)
+            if len(hits) < page_size:
+                return ids
+            search_after = hits[-1]["sort"]
+    finally:
+        try:
+            es_client.close_point_in_time(id=pit_id)
+        except Exception as e:
+            logger.warning("Error closing point in time: %s", e)
+
+def catch_up(es_client: Elasticsearch, alias: str, new_index: str, since: str,
+             timestamp_field: str = "updated_at") -> int:
+    if not alias_targets(es_client, alias):
+        return 0
+    es_client.indices.refresh(index=alias)
+    response = es_client.reindex(
+        source={"index": alias, "query": {"range": {timestamp_field: {"gte": since}}}},
+        dest={"index": new_index},
+        refresh=True
+    )
+    return response.get("total", 0)
+
+def carry_deletes(es_client: Elasticsearch, alias: str, new_index: str, previous_ids: Set[str]) -> int:
+    deleted = previous_ids - document_ids(es_client, alias)
+    if not deleted:
+        return 0
+    helpers.bulk(es_client, ({"_op_type": "delete", "_index": new_index, "_id": doc_id} for doc_id in deleted),
+                 raise_on_error=False, refresh=True)
+    return len(deleted)
+
+def swap_alias(es_client: Elasticsearch, alias: str, new_index: str, keep_versions: int = 1) -> List[str]:
+    old_indices = [index for index in alias_targets(es_client, alias) if index != new_index]
+    actions: List[Dict[str, Any]] = [{"remove": {"index": index, "alias": alias}} for index in old_indices]
+    if not old_indices and es_client.indices.exists(index=alias):
+        actions.append({"remove_index": {"index": alias}})
+    actions.append({"add": {"index": new_index, "alias": alias, "is_write_index": True}})
+    es_client.indices.update_aliases(actions=actions)
+
+    previous = [index for index in index_versions(es_client, alias) if index != new_index]
+    retired = previous[:max(len(previous) - keep_versions, 0)]
+    for index in retired:
+        try:
+            es_client.indices.delete(index=index)
+        except Exception as e:
+            logger.warning("Error deleting retired index %s: %s", index, e)
+    return retired
+
+def ensure_alias(es_client: Elasticsearch, alias: str, mapping: Dict[str, Any],
+                 settings: Optional[Dict[str, Any]] = None) -> str:
+    targets = alias_targets(es_client, alias)
+    if targets:
+        return targets[-1]
+    if es_client.indices.exists(index=alias):
+        return alias
+    index = create_versioned_index(es_client, alias, mapping, settings)
+    swap_alias(es_client, alias, index)
+    return index
+
+def rebuild_alias(es_client: Elasticsearch, alias: str, mapping: Dict[str, Any],
+                  load: Callable[[str], Any], settings: Optional[Dict[str, Any]] = None,
+                  keep_versions: int = 1, max_num_segments: int = 1,
+                  timestamp_field: Optional[str] = "updated_at") -> Dict[str, Any]:
+    started_at = datetime.now(timezone.utc).isoformat()
+    live = bool(timestamp_field and alias_targets(es_client, alias))
+    previous_ids = document_ids(es_client, alias) if live else set()
+    index = create_versioned_index(es_client, alias, mapping, settings)
+    caught_up = deleted = 0
+    try:
+        loaded = load(index)
+        if live:
+            final_since = datetime.now(timezone.utc).isoformat()
+            caught_up = catch_up(es_client, alias, index, started_at, timestamp_field)
+        finalize_index(es_client, index, max_num_segments)
+        if live:
+            caught_up += catch_up(es_client, alias, index, final_since, timestamp_field)
+            deleted = carry_deletes(es_client, alias, index, previous_ids)
+    except Exception:
+        es_client.indices.delete(index=index)
+        raise
+    retired = swap_alias(es_client, alias, index, keep_versions)
+    return {"alias": alias, "index": index, "loaded": loaded, "caught_up": caught_up, "deleted": deleted,
+            "retired": retired}
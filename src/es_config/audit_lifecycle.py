@@ -0,0 +1,116 @@
+import logging
+import os
+import re
+import sys
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from elasticsearch import ApiError, Elasticsearch
+from dotenv import load_dotenv
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from es_config.aliases import alias_targets
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+AUDIT_ALIAS = "agent_actions"
+AUDIT_POLICY = "agent-actions-policy"
+ROLLOVER_INDEX = re.compile(r"-\d{6}$")
+
+def lifecycle_policy(max_age: str = "1d", max_size: str = "5gb", warm_after: str = "7d",
+                     delete_after: Optional[str] = None) -> Dict[str, Any]:
+    phases: Dict[str, Any] = {
+        "hot": {
+            "actions": {
+                "rollover": {"max_age": max_age, "max_primary_shard_size": max_size}
+            }
+        },
+        "warm": {
+            "min_age": warm_after,
+            "actions": {
+                "readonly": {},
+                "shrink": {"number_of_shards": 1},
+                "forcemerge": {"max_num_segments": 1, "index_codec": "best_compression"}
+            }
+        }
+    }
+    if delete_after:
+        phases["delete"] = {"min_age": delete_after, "actions": {"delete": {}}}
+    return {"phases": phases}
+
+def policy_from_env() -> Dict[str, Any]:
+    return lifecycle_policy(
+        max_age=os.getenv('AUDIT_ROLLOVER_MAX_AGE', '1d'),
+        max_size=os.getenv('AUDIT_ROLLOVER_MAX_SIZE', '5gb'),
+        warm_after=os.getenv('AUDIT_WARM_AFTER', '7d'),
+        delete_after=os.getenv('AUDIT_DELETE_AFTER') or None
+    )
+
+def write_index(es_client: Elasticsearch, alias: str) -> Optional[str]:
+    targets = alias_targets(es_client, alias)
+    if len(targets) <= 1:
+        return targets[0] if targets else None
+    response = es_client.indices.get_alias(name=alias)
+    return next((index for index, spec in response.items()
+                 if spec["aliases"][alias].get("is_write_index")), targets[-1])
+
+def ensure_rollover_alias(es_client: Elasticsearch, alias: str, mapping: Dict[str, Any],
+                          settings: Optional[Dict[str, Any]] = None, policy: Optional[Dict[str, Any]] = None,
+                          policy_name: str = AUDIT_POLICY) -> str:
+    lifecycle: Dict[str, Any] = {}
+    try:
+        es_client.ilm.put_lifecycle(name=policy_name, policy=policy or policy_from_env())
+        lifecycle = {"index.lifecycle.name": policy_name, "index.lifecycle.rollover_alias": alias}
+    except ApiError as e:
+        logger.warning("Error installing lifecycle policy %s, roll over %s manually: %s", policy_name, alias, e)
+
+    template_settings = dict(settings or {}, **lifecycle)
+    es_client.indices.put_index_template(
+        name=alias,
+        index_patterns=[f"{alias}-*"],
+        template={"settings": template_settings, "mappings": mapping},
+        priority=100
+    )
+
+    current = write_index(es_client, alias)
+    if current and ROLLOVER_INDEX.search(current):
+        return current
+
+    index = f"{alias}-000001"
+    es_client.indices.create(index=index, body={"settings": template_settings, "mappings": mapping})
+    previous = alias_targets(es_client, alias)
+    actions = [{"add": {"index": old, "alias": alias, "is_write_index": False}} for old in previous]
+    if not previous and es_client.indices.exists(index=alias):
+        started_at = datetime.now(timezone.utc).isoformat()
+        es_client.reindex(source={"index": alias}, dest={"index": index}, refresh=True)
+        es_client.indices.refresh(index=alias)
+        es_client.reindex(source={"index": alias, "query": {"range": {"timestamp": {"gte": started_at}}}},
+                          dest={"index": index}, refresh=True)
+        actions.append({"remove_index": {"index": alias}})
+    actions.append({"add": {"index": index, "alias": alias, "is_write_index": True}})
+    es_client.indices.update_aliases(actions=actions)
+    return index
+
+def rollover(es_client: Elasticsearch, alias: str = AUDIT_ALIAS, max_age: Optional[str] = None,
+             max_size: Optional[str] = None, max_docs: Optional[int] = None) -> Dict[str, Any]:
+    conditions: Dict[str, Any] = {}
+    if max_age:
+        conditions["max_age"] = max_age
+    if max_size:
+        conditions["max_primary_shard_size"] = max_size
+    if max_docs:
+        conditions["max_docs"] = max_docs
+    return es_client.indices.rollover(alias=alias, conditions=conditions or None)
+
+if __name__ == "__main__":
+    from es_config.client import get_client
+
+    result = rollover(get_client(), max_age=os.getenv('AUDIT_ROLLOVER_MAX_AGE', '1d'),
+                      max_size=os.getenv('AUDIT_ROLLOVER_MAX_SIZE', '5gb'))
+    if result["rolled_over"]:
+        print(f"[SUCCESS] Rolled {AUDIT_ALIAS} over from {result['old_index']} to {result['new_index']}")
+    else:
+        print(f"{AUDIT_ALIAS} stays on {result['old_index']}: no rollover condition met")
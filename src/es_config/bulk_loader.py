@@ -0,0 +1,121 @@
+import json
+import logging
+import os
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator
+
+from elasticsearch import Elasticsearch, helpers
+
+logger = logging.getLogger(__name__)
+
+_JSON_DECODER = json.JSONDecoder()
+
+def data_file(data_dir: str, name: str) -> str:
+    for extension in (".ndjson", ".jsonl"):
+        path = os.path.join(data_dir, f"{name}{extension}")
+        if os.path.exists(path):
+            return path
+    return os.path.join(data_dir, f"{name}.json")
+
+def iter_json_documents(path: str, read_size: int = 1 << 20) -> Iterator[Dict[str, Any]]:
+    with open(path, "r") as f:
+        head = f.read(read_size)
+        stripped = head.lstrip()
+        if stripped.startswith("["):
+            yield from _iter_array(f, stripped[1:], read_size)
+            return
+
+        lines = head.split("\n")
+        pending = lines.pop()
+        for line in lines:
+            if line.strip():
+                yield json.loads(line)
+        for block in iter(lambda: f.read(read_size), ""):
+            lines = (pending + block).split("\n")
+            pending = lines.pop()
+            for line in lines:
+                if line.strip():
+                    yield json.loads(line)
+        if pending.strip():
+            yield json.loads(pending)
+
+def _iter_array(f, buffer: str, read_size: int) -> Iterator[Dict[str, Any]]:
+    position = 0
+    exhausted = False
+    while True:
+        while position < len(buffer) and buffer[position] in " \t\r\n,":
+            position += 1
+        if position < len(buffer) and buffer[position] == "]":
+            return
+        try:
+            doc, end = _JSON_DECODER.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            if exhausted:
+                raise
+            block = f.read(read_size)
+            exhausted = not block
+            buffer = buffer[position:] + block
+            position = 0
+            continue
+        yield doc
+        position = end
+
+@contextmanager
+def bulk_load_settings(es_client: Elasticsearch, index: str) -> Iterator[None]:
+    current = es_client.indices.get_settings(index=index, flat_settings=True)[index]["settings"]
+    original = {
+        "index.refresh_interval": current.get("index.refresh_interval"),
+        "index.number_of_replicas": current.get("index.number_of_replicas")
+    }
+    es_client.indices.put_settings(index=index, settings={
+        "index.refresh_interval": "-1",
+        "index.number_of_replicas": 0
+    })
+    try:
+        yield
+    finally:
+        es_client.indices.put_settings(index=index, settings=original)
+        es_client.indices.refresh(index=index)
+
+def stream_bulk_index(es_client: Elasticsearch, index: str, docs: Iterable[Dict[str, Any]], id_field: str,
+                      thread_count: int = 4, chunk_size: int = 500, max_chunk_bytes: int = 10 * 1024 * 1024,
+                      queue_size: int = 4, tune_settings: bool = True) -> Dict[str, Any]:
+    actions = ({"_index": index, "_id": doc[id_field], "_source": doc} for doc in docs)
+    indexed = 0
+    failed = 0
+    start = time.perf_counter()
+
+    with bulk_load_settings(es_client, index) if tune_settings else _no_settings():
+        for ok, item in helpers.parallel_bulk(es_client, actions, thread_count=thread_count, chunk_size=chunk_size,
+                                              max_chunk_bytes=max_chunk_bytes, queue_size=queue_size,
+                                              raise_on_error=False, raise_on_exception=False):
+            if ok:
+                indexed += 1
+            else:
+                failed += 1
+                if failed <= 10:
+                    logger.warning("Error indexing into %s: %s", index, item)
+
+    elapsed = time.perf_counter() - start
+    return {
+        "index": index,
+        "indexed": indexed,
+        "failed": failed,
+        "seconds": elapsed,
+        "docs_per_sec": indexed / elapsed if elapsed > 0 else 0.0
+    }
+
+@contextmanager
+def _no_settings() -> Iterator[None]:
+    yield
+
+def loader_options(**overrides) -> Dict[str, Any]:
+    options = {
+        "thread_count": int(os.getenv('ES_BULK_THREADS', '4')),
+        "chunk_size": int(os.getenv('ES_BULK_CHUNK_DOCS', '500')),
+        "max_chunk_bytes": int(os.getenv('ES_BULK_CHUNK_BYTES', str(10 * 1024 * 1024))),
+        "queue_size": int(os.getenv('ES_BULK_QUEUE_SIZE', '4'))
+    }
+    options.update(overrides)
+    return options
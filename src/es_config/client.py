@@ -0,0 +1,75 @@
+import os
+import threading
+from typing import Any, Dict, Optional
+
+from elasticsearch import AsyncElasticsearch, Elasticsearch
+from dotenv import load_dotenv
+
+load_dotenv()
+
+_client: Optional[Elasticsearch] = None
+_client_overrides: Dict[str, Any] = {}
+_client_lock = threading.Lock()
+
+def client_options(**overrides) -> Dict[str, Any]:
+    options = {
+        "connections_per_node": int(os.getenv('ES_CONNECTIONS_PER_NODE', '32')),
+        "http_compress": os.getenv('ES_HTTP_COMPRESS', 'true').lower() == 'true',
+        "request_timeout": float(os.getenv('ES_REQUEST_TIMEOUT', '30')),
+        "max_retries": int(os.getenv('ES_MAX_RETRIES', '3')),
+        "retry_on_timeout": os.getenv('ES_RETRY_ON_TIMEOUT', 'true').lower() == 'true',
+        "retry_on_status": (429, 502, 503, 504)
+    }
+    options.update(overrides)
+    return options
+
+def connection_settings() -> Dict[str, Any]:
+    if os.getenv('ELASTICSEARCH_URL'):
+        if os.getenv('ELASTIC_API_KEY'):
+            return {
+                "hosts": os.getenv('ELASTICSEARCH_URL'),
+                "api_key": os.getenv('ELASTIC_API_KEY'),
+                "verify_certs": True
+            }
+
+        password = os.getenv('ELASTIC_PASSWORD')
+        if not password:
+            raise ValueError("ELASTIC_PASSWORD is required when not using API key")
+        return {
+            "hosts": os.getenv('ELASTICSEARCH_URL'),
+            "basic_auth": (os.getenv('ELASTIC_USERNAME', 'elastic'), password),
+            "verify_certs": True
+        }
+
+    if os.getenv('ELASTIC_CLOUD_ID') and os.getenv('ELASTIC_API_KEY'):
+        return {
+            "cloud_id": os.getenv('ELASTIC_CLOUD_ID'),
+            "api_key": os.getenv('ELASTIC_API_KEY')
+        }
+
+    raise ValueError("Missing Elasticsearch configuration")
+
+def create_client(**overrides) -> Elasticsearch:
+    return Elasticsearch(**connection_settings(), **client_options(**overrides))
+
+def create_async_client(**overrides) -> AsyncElasticsearch:
+    return AsyncElasticsearch(**connection_settings(), **client_options(**overrides))
+
+def get_client(**overrides) -> Elasticsearch:
+    global _client, _client_overrides
+    with _client_lock:
+        if _client is None:
+            _client = create_client(**overrides)
+            _client_overrides = dict(overrides)
+        elif overrides and overrides != _client_overrides:
+            raise ValueError(f"Shared Elasticsearch client already created with {_client_overrides}, "
+                             f"cannot apply {overrides}; use create_client for a separately tuned client")
+        return _client
+
+def close_client():
+    global _client, _client_overrides
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+            _client = None
+            _client_overrides = {}
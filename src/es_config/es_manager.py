@@ -43,8 +43,8 @@ class ElasticsearchManager:
         
         actions = [
             {
-: index_name,
-: doc
+                "_index": index_name,
+                "_source": doc
             }
             for doc in documents
         ]
@@ -86,25 +86,25 @@ class ElasticsearchManager:
             return False
 
 EXAMPLE_MAPPINGS = {
-: {
-: {
-: {"type": "keyword"},
-: {"type": "text"},
-: {"type": "text"},
-: {"type": "keyword"},
-: {"type": "integer"},
-: {"type": "date"},
-: {"type": "date"},
-: {"type": "keyword"}
+    "tasks": {
+        "properties": {
+            "task_id": {"type": "keyword"},
+            "title": {"type": "text"},
+            "description": {"type": "text"},
+            "status": {"type": "keyword"},
+            "priority": {"type": "integer"},
+            "created_at": {"type": "date"},
+            "updated_at": {"type": "date"},
+            "assigned_to": {"type": "keyword"}
         }
     },
-: {
-: {
-: {"type": "date"},
-: {"type": "keyword"},
-: {"type": "text"},
-: {"type": "keyword"},
-: {"type": "object"}
+    "logs": {
+        "properties": {
+            "timestamp": {"type": "date"},
+            "level": {"type": "keyword"},
+            "message": {"type": "text"},
+            "source": {"type": "keyword"},
+            "metadata": {"type": "object"}
         }
     }
 }
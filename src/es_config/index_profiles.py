@@ -0,0 +1,80 @@
+import copy
+import os
+from typing import Any, Dict, Optional, Tuple
+
+PROFILES = ("default", "production")
+
+PRODUCTION_PROFILE: Dict[str, Dict[str, Any]] = {
+    "support_tickets": {
+        "settings": {
+            "index.sort.field": ["status", "created_at"],
+            "index.sort.order": ["asc", "asc"]
+        },
+        "properties": {
+            "description": {"type": "text"},
+            "customer_email": {"type": "keyword", "doc_values": False},
+            "customer_plan": {"type": "keyword", "doc_values": False},
+            "category": {"type": "keyword", "eager_global_ordinals": True},
+            "assigned_team": {"type": "keyword", "eager_global_ordinals": True},
+            "assigned_to": {"type": "keyword", "doc_values": False},
+            "sentiment": {"type": "keyword", "doc_values": False},
+            "urgency_score": {"type": "integer", "doc_values": False},
+            "resolved_at": {"type": "date", "doc_values": False},
+            "tags": {"type": "keyword", "doc_values": False},
+            "resolution_time_minutes": {"type": "integer", "doc_values": False}
+        }
+    },
+    "customers": {
+        "properties": {
+            "email": {"type": "keyword", "doc_values": False},
+            "name": {"type": "text", "norms": False},
+            "plan": {"type": "keyword", "doc_values": False},
+            "signup_date": {"type": "date", "doc_values": False},
+            "total_tickets": {"type": "integer", "doc_values": False},
+            "satisfaction_score": {"type": "float", "doc_values": False}
+        }
+    },
+    "knowledge_base": {
+        "properties": {
+            "view_count": {"type": "integer", "doc_values": False},
+            "helpful_count": {"type": "integer", "doc_values": False}
+        }
+    },
+    "agent_actions": {
+        "settings": {"index.codec": "best_compression"},
+        "properties": {
+            "action_id": {"type": "keyword", "doc_values": False},
+            "details": {
+                "type": "object",
+                "dynamic": False,
+                "properties": {
+                    "category": {"type": "keyword"},
+                    "priority": {"type": "keyword"},
+                    "assigned_team": {"type": "keyword"},
+                    "needs_review": {"type": "boolean"}
+                }
+            }
+        }
+    }
+}
+
+def index_profile(index: str, mapping: Dict[str, Any],
+                  profile: Optional[str] = None) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    profile = profile or os.getenv('ES_INDEX_PROFILE', 'production')
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown index profile '{profile}', expected one of {', '.join(PROFILES)}")
+
+    mapping = copy.deepcopy(mapping)
+    if profile == "default":
+        return mapping, {}
+
+    overrides = PRODUCTION_PROFILE.get(index, {})
+    for field, definition in overrides.get("properties", {}).items():
+        mapping["properties"][field] = copy.deepcopy(definition)
+
+    settings = {
+        "index.number_of_shards": int(os.getenv('ES_INDEX_SHARDS', '1')),
+        "index.number_of_replicas": int(os.getenv('ES_INDEX_REPLICAS', '1'))
+    }
+    settings.update(copy.deepcopy(overrides.get("settings", {})))
+    return mapping, settings
@@ -1,136 +1,129 @@
 import os
-import json
-from elasticsearch import Elasticsearch, helpers
+import sys
+from elasticsearch import Elasticsearch
 from dotenv import load_dotenv
-from typing import List, Dict
+from typing import Dict
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from agent.embeddings import KB_TEXT_FIELDS, KB_VECTOR_FIELD, TICKET_TEXT_FIELDS, TICKET_VECTOR_FIELD, \
+    embed_documents, load_embedder, vector_mapping
+from es_config.aliases import rebuild_alias
+from es_config.audit_lifecycle import ensure_rollover_alias
+from es_config.bulk_loader import data_file, iter_json_documents, loader_options, stream_bulk_index
+from es_config.client import get_client
+from es_config.index_profiles import index_profile
 
 load_dotenv()
 
 TICKET_MAPPING = {
-: {
-: {"type": "keyword"},
-: {"type": "text", "fields": {"keyword": {"type": "keyword"}}},
-: {
-: "text",
-: {"keyword": {"type": "keyword"}}
+    "properties": {
+        "ticket_id": {"type": "keyword"},
+        "subject": {"type": "text", "fields": {"keyword": {"type": "keyword"}}},
+        "description": {
+            "type": "text",
+            "fields": {"keyword": {"type": "keyword"}}
         },
-: {"type": "keyword"},
-: {"type": "keyword"},
-: {"type": "keyword"},
-: {"type": "keyword"},
-: {"type": "keyword"},
-: {"type": "keyword"},
-: {"type": "keyword"},
-: {"type": "keyword"},
-: {"type": "keyword"},
-: {"type": "integer"},
-: {"type": "date"},
-: {"type": "date"},
-: {"type": "date"},
-: {"type": "keyword"},
-: {"type": "integer"}
+        "customer_id": {"type": "keyword"},
+        "customer_email": {"type": "keyword"},
+        "customer_plan": {"type": "keyword"},
+        "status": {"type": "keyword"},
+        "category": {"type": "keyword"},
+        "priority": {"type": "keyword"},
+        "assigned_team": {"type": "keyword"},
+        "assigned_to": {"type": "keyword"},
+        "sentiment": {"type": "keyword"},
+        "urgency_score": {"type": "integer"},
+        "created_at": {"type": "date"},
+        "updated_at": {"type": "date"},
+        "resolved_at": {"type": "date"},
+        "tags": {"type": "keyword"},
+        "resolution_time_minutes": {"type": "integer"}
     }
 }
 
 CUSTOMER_MAPPING = {
-: {
-: {"type": "keyword"},
-: {"type": "keyword"},
-: {"type": "text", "fields": {"keyword": {"type": "keyword"}}},
-: {"type": "keyword"},
-: {"type": "date"},
-: {"type": "integer"},
-: {"type": "float"}
+    "properties": {
+        "customer_id": {"type": "keyword"},
+        "email": {"type": "keyword"},
+        "name": {"type": "text", "fields": {"keyword": {"type": "keyword"}}},
+        "plan": {"type": "keyword"},
+        "signup_date": {"type": "date"},
+        "total_tickets": {"type": "integer"},
+        "satisfaction_score": {"type": "float"},
+        "updated_at": {"type": "date"}
     }
 }
 
 KB_MAPPING = {
-: {
-: {"type": "keyword"},
-: {"type": "text", "fields": {"keyword": {"type": "keyword"}}},
-: {"type": "text"},
-: {"type": "keyword"},
-: {"type": "keyword"},
-: {"type": "integer"},
-: {"type": "integer"},
-: {"type": "date"}
+    "properties": {
+        "article_id": {"type": "keyword"},
+        "title": {"type": "text", "fields": {"keyword": {"type": "keyword"}}},
+        "content": {"type": "text"},
+        "category": {"type": "keyword"},
+        "tags": {"type": "keyword"},
+        "view_count": {"type": "integer"},
+        "helpful_count": {"type": "integer"},
+        "updated_at": {"type": "date"}
     }
 }
 
 AGENT_ACTION_MAPPING = {
-: {
-: {"type": "keyword"},
-: {"type": "keyword"},
-: {"type": "keyword"},
-: {"type": "keyword"},
-: {"type": "object", "enabled": True},
-: {"type": "float"},
-: {"type": "date"}
+    "properties": {
+        "action_id": {"type": "keyword"},
+        "ticket_id": {"type": "keyword"},
+        "agent_name": {"type": "keyword"},
+        "action_type": {"type": "keyword"},
+        "details": {"type": "object", "enabled": True},
+        "confidence_score": {"type": "float"},
+        "timestamp": {"type": "date"}
     }
 }
 
 def get_es_client():
-    
-    if os.getenv('ELASTICSEARCH_URL'):
-                                        
-        if os.getenv('ELASTIC_API_KEY'):
-            return Elasticsearch(
-                os.getenv('ELASTICSEARCH_URL'),
-                api_key=os.getenv('ELASTIC_API_KEY'),
-                verify_certs=True
-            )
-                        
-        else:
-            return Elasticsearch(
-                os.getenv('ELASTICSEARCH_URL'),
-                basic_auth=(
-                    os.getenv('ELASTIC_USERNAME', 'elastic'),
-                    os.getenv('ELASTIC_PASSWORD')
-                ),
-                verify_certs=True
-            )
-    elif os.getenv('ELASTIC_CLOUD_ID') and os.getenv('ELASTIC_API_KEY'):
-        return Elasticsearch(
-            cloud_id=os.getenv('ELASTIC_CLOUD_ID'),
-            api_key=os.getenv('ELASTIC_API_KEY')
-        )
-    else:
-        raise ValueError("Missing Elasticsearch configuration")
+    return get_client()
 
-def create_index(es: Elasticsearch, index_name: str, mapping: Dict):
-    
-    if es.indices.exists(index=index_name):
-        print(f"⚠️  Index '{index_name}' already exists, deleting...")
-        es.indices.delete(index=index_name)
-    
-    es.indices.create(
-        index=index_name,
-        body={"mappings": mapping}
+def stream_index_file(es: Elasticsearch, index_name: str, filepath: str, id_field: str,
+                      embedder=None, text_fields=None, vector_field=None) -> Dict:
+    docs = iter_json_documents(filepath)
+    if embedder is not None:
+        docs = embed_documents(docs, embedder, text_fields, vector_field)
+
+    stats = stream_bulk_index(es, index_name, docs, id_field, **loader_options())
+    print(f"✅ Indexed {stats['indexed']} documents into {index_name} "
+          f"in {stats['seconds']:.1f}s ({stats['docs_per_sec']:.0f} docs/sec)")
+    if stats['failed']:
+        print(f"⚠️  Failed to index {stats['failed']} documents")
+    return stats
+
+def rebuild_index(es: Elasticsearch, alias: str, mapping: Dict, filepath: str, id_field: str,
+                  embedder=None, text_fields=None, vector_field=None) -> Dict:
+    mapping, settings = index_profile(alias, mapping)
+    result = rebuild_alias(
+        es, alias, mapping,
+        lambda index: stream_index_file(es, index, filepath, id_field, embedder, text_fields, vector_field)["indexed"],
+        settings=settings,
+        keep_versions=int(os.getenv('ES_KEEP_INDEX_VERSIONS', '1')),
+        max_num_segments=int(os.getenv('ES_FORCEMERGE_SEGMENTS', '1'))
     )
-    print(f"✅ Created index: {index_name}")
+    print(f"🔀 Swapped alias {alias} -> {result['index']}"
+          + (f" ({result['caught_up']} live updates carried over)" if result['caught_up'] else "")
+          + (f" ({result['deleted']} live deletes carried over)" if result['deleted'] else ""))
+    for index in result['retired']:
+        print(f"   Retired {index}")
+    return result
 
-def bulk_index_data(es: Elasticsearch, index_name: str, data: List[Dict], id_field: str):
-    
-    actions = [
-        {
-: index_name,
-: doc[id_field],
-: doc
-        }
-        for doc in data
-    ]
-    
-    success, failed = helpers.bulk(es, actions, raise_on_error=False)
-    print(f"✅ Indexed {success} documents into {index_name}")
-    if failed:
-        print(f"⚠️  Failed to index {len(failed)} documents")
-    
-    return success
+def with_vector_field(mapping: Dict, vector_field: str, embedder=None) -> Dict:
+    if embedder is None:
+        return mapping
+    return {**mapping, "properties": {**mapping["properties"], vector_field: vector_mapping(embedder.dims)}}
 
-def load_data_from_file(filepath: str) -> List[Dict]:
-    
-    with open(filepath, 'r') as f:
-        return json.load(f)
+def load_indices(es: Elasticsearch, data_dir: str, embedder=None):
+    rebuild_index(es, "customers", CUSTOMER_MAPPING, data_file(data_dir, "customers"), "customer_id")
+    rebuild_index(es, "support_tickets", with_vector_field(TICKET_MAPPING, TICKET_VECTOR_FIELD, embedder),
+                  data_file(data_dir, "tickets"), "ticket_id", embedder, TICKET_TEXT_FIELDS, TICKET_VECTOR_FIELD)
+    rebuild_index(es, "knowledge_base", with_vector_field(KB_MAPPING, KB_VECTOR_FIELD, embedder),
+                  data_file(data_dir, "kb_articles"), "article_id", embedder, KB_TEXT_FIELDS, KB_VECTOR_FIELD)
 
 def setup_elasticsearch():
     
@@ -147,24 +140,21 @@ def setup_elasticsearch():
     else:
         raise ConnectionError("Failed to connect to Elasticsearch")
     
-    print("📋 Creating indices...")
-    create_index(es, "support_tickets", TICKET_MAPPING)
-    create_index(es, "customers", CUSTOMER_MAPPING)
-    create_index(es, "knowledge_base", KB_MAPPING)
-    create_index(es, "agent_actions", AGENT_ACTION_MAPPING)
+    print("📋 Preparing indices...")
+    print(f"   Index profile: {os.getenv('ES_INDEX_PROFILE', 'production')}")
+    audit_mapping, audit_settings = index_profile("agent_actions", AGENT_ACTION_MAPPING)
+    audit_index = ensure_rollover_alias(es, "agent_actions", audit_mapping, audit_settings)
+    print(f"✅ agent_actions -> {audit_index} (rolls over by age/size)")
     print()
     
-    print("📊 Loading data...")
+    print("📊 Building new index versions (the current ones keep serving until the alias swap)...")
     data_dir = "data"
     
-    customers = load_data_from_file(f"{data_dir}/customers.json")
-    bulk_index_data(es, "customers", customers, "customer_id")
-    
-    tickets = load_data_from_file(f"{data_dir}/tickets.json")
-    bulk_index_data(es, "support_tickets", tickets, "ticket_id")
-    
-    kb_articles = load_data_from_file(f"{data_dir}/kb_articles.json")
-    bulk_index_data(es, "knowledge_base", kb_articles, "article_id")
+    embedder = load_embedder()
+    if embedder is not None:
+        print(f"🧠 Embedding tickets and KB articles with {type(embedder).__name__} ({embedder.dims} dims)")
+
+    load_indices(es, data_dir, embedder)
     
     print()
     
@@ -1,22 +1,27 @@
 import os
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from elasticsearch import Elasticsearch
 from dotenv import load_dotenv
-from typing import Dict, List
+from typing import Dict, List, Optional
 import json
 
+from es_config.client import get_client
+
 load_dotenv()
 
 class MetricsDashboard:
 
-    def __init__(self, es_client: Elasticsearch):
+    def __init__(self, es_client: Elasticsearch, window_days: Optional[int] = None):
         self.es = es_client
+        self.window_days = window_days if window_days is not None else int(os.getenv('METRICS_WINDOW_DAYS', '7'))
+        self._ticket_aggs: Optional[Dict] = None
 
     def generate_report(self) -> Dict:
         print("\n" + "="*70)
         print("📊 SUPPORT TICKET TRIAGE AGENT - PERFORMANCE REPORT")
         print("="*70 + "\n")
 
+        self._ticket_aggs = None
         ticket_stats = self._get_ticket_statistics()
         agent_performance = self._get_agent_performance()
         category_accuracy = self._get_category_accuracy()
@@ -35,122 +40,83 @@ class MetricsDashboard:
             "category_accuracy": category_accuracy,
             "time_savings": time_savings,
             "impact_metrics": impact_metrics,
-            "generated_at": datetime.now().isoformat()
-        }
-
-    def _get_ticket_statistics(self) -> Dict:
-
-        total = self.es.count(index="support_tickets")["count"]
-
-        status_agg = self.es.search(
-            index="support_tickets",
-            body={
-                "size": 0,
-                "aggs": {
-                    "by_status": {"terms": {"field": "status", "size": 10}}
-                }
-            }
-        )
-
-        by_status = {
-            bucket["key"]: bucket["doc_count"]
-            for bucket in status_agg["aggregations"]["by_status"]["buckets"]
+            "generated_at": datetime.now(timezone.utc).isoformat()
         }
 
-        priority_agg = self.es.search(
-            index="support_tickets",
-            body={
-                "size": 0,
-                "aggs": {
-                    "by_priority": {"terms": {"field": "priority", "size": 10}}
+    def _ticket_aggregations(self) -> Dict:
+        if self._ticket_aggs is None:
+            response = self.es.search(
+                index="support_tickets",
+                body={
+                    "size": 0,
+                    "track_total_hits": True,
+                    "aggs": {
+                        "by_status": {"terms": {"field": "status", "size": 10}},
+                        "by_priority": {"terms": {"field": "priority", "size": 10}},
+                        "by_category": {"terms": {"field": "category", "size": 10}}
+                    }
                 }
-            }
-        )
-
-        by_priority = {
-            bucket["key"]: bucket["doc_count"]
-            for bucket in priority_agg["aggregations"]["by_priority"]["buckets"]
-        }
-
-        category_agg = self.es.search(
-            index="support_tickets",
-            body={
-                "size": 0,
-                "aggs": {
-                    "by_category": {"terms": {"field": "category", "size": 10}}
+            )
+            self._ticket_aggs = {
+                "total": response["hits"]["total"]["value"],
+                **{
+                    name: {bucket["key"]: bucket["doc_count"] for bucket in agg["buckets"]}
+                    for name, agg in response["aggregations"].items()
                 }
             }
-        )
+        return self._ticket_aggs
 
-        by_category = {
-            bucket["key"]: bucket["doc_count"]
-            for bucket in category_agg["aggregations"]["by_category"]["buckets"]
-        }
+    def _get_ticket_statistics(self) -> Dict:
+        aggs = self._ticket_aggregations()
 
         return {
-            "total_tickets": total,
-            "by_status": by_status,
-            "by_priority": by_priority,
-            "by_category": by_category
+            "total_tickets": aggs["total"],
+            "by_status": aggs["by_status"],
+            "by_priority": aggs["by_priority"],
+            "by_category": aggs["by_category"]
         }
 
     def _get_agent_performance(self) -> Dict:
 
-        total_actions = self.es.count(index="agent_actions")["count"]
-
-        if total_actions > 0:
-            actions_response = self.es.search(
-                index="agent_actions",
-                body={"query": {"match_all": {}}, "size": 1000}
-            )
-
-            actions = [hit["_source"] for hit in actions_response["hits"]["hits"]]
-
-            confidences = [a["confidence_score"] for a in actions if "confidence_score" in a]
-            avg_confidence = sum(confidences) / len(confidences) if confidences else 0
-
-            by_action_type = {}
-            for action in actions:
-                action_type = action.get("action_type", "unknown")
-                by_action_type[action_type] = by_action_type.get(action_type, 0) + 1
-
-            needs_review = sum(1 for a in actions
-                             if a.get("details", {}).get("needs_review", False))
-
-            return {
-                "total_processed": total_actions,
-                "average_confidence": avg_confidence,
-                "by_action_type": by_action_type,
-                "flagged_for_review": needs_review,
-                "review_rate": needs_review / total_actions if total_actions > 0 else 0
-            }
-        else:
-            return {
-                "total_processed": 0,
-                "average_confidence": 0,
-                "by_action_type": {},
-                "flagged_for_review": 0,
-                "review_rate": 0
-            }
+        query = {"match_all": {}}
+        if self.window_days > 0:
+            since = (datetime.now(timezone.utc) - timedelta(days=self.window_days)).isoformat()
+            query = {"bool": {"filter": [{"range": {"timestamp": {"gte": since}}}]}}
 
-    def _get_category_accuracy(self) -> Dict:
         response = self.es.search(
-            index="support_tickets",
+            index="agent_actions",
             body={
                 "size": 0,
+                "track_total_hits": True,
+                "query": query,
                 "aggs": {
-                    "categories": {
-                        "terms": {"field": "category", "size": 10}
-                    }
+                    "avg_confidence": {"avg": {"field": "confidence_score"}},
+                    "by_action_type": {"terms": {"field": "action_type", "size": 20}},
+                    "needs_review": {"filter": {"term": {"details.needs_review": True}}}
                 }
-            }
+            },
+            pre_filter_shard_size=1,
+            ignore_unavailable=True
         )
 
-        categories = {}
-        for bucket in response["aggregations"]["categories"]["buckets"]:
-            categories[bucket["key"]] = bucket["doc_count"]
+        total_actions = response["hits"]["total"]["value"]
+        aggregations = response.get("aggregations", {})
+        needs_review = aggregations.get("needs_review", {}).get("doc_count", 0)
+
+        return {
+            "total_processed": total_actions,
+            "window_days": self.window_days,
+            "average_confidence": aggregations.get("avg_confidence", {}).get("value") or 0,
+            "by_action_type": {
+                bucket["key"]: bucket["doc_count"]
+                for bucket in aggregations.get("by_action_type", {}).get("buckets", [])
+            },
+            "flagged_for_review": needs_review,
+            "review_rate": needs_review / total_actions if total_actions > 0 else 0
+        }
 
-        return categories
+    def _get_category_accuracy(self) -> Dict:
+        return dict(self._ticket_aggregations()["by_category"])
 
     def _calculate_time_savings(self, agent_perf: Dict) -> Dict:
 
@@ -240,7 +206,7 @@ class MetricsDashboard:
         print()
 
     def _print_agent_performance(self, perf: Dict):
-        print("🤖 AGENT PERFORMANCE")
+        print("🤖 AGENT PERFORMANCE" + (f" (last {perf['window_days']} days)" if perf.get('window_days') else ""))
         print("-" * 70)
         print(f"Tickets Processed: {perf['total_processed']}")
         print(f"Average Confidence: {perf['average_confidence']:.1%}")
@@ -295,28 +261,7 @@ class MetricsDashboard:
 def main():
     load_dotenv()
 
-    if os.getenv('ELASTICSEARCH_URL'):
-        if os.getenv('ELASTIC_API_KEY'):
-            es = Elasticsearch(
-                os.getenv('ELASTICSEARCH_URL'),
-                api_key=os.getenv('ELASTIC_API_KEY'),
-                verify_certs=True
-            )
-        else:
-            password = os.getenv('ELASTIC_PASSWORD')
-            if not password:
-                raise ValueError("ELASTIC_PASSWORD environment variable is required for basic auth")
-            es = Elasticsearch(
-                os.getenv('ELASTICSEARCH_URL'),
-                basic_auth=(
-                    os.getenv('ELASTIC_USERNAME', 'elastic'),
-                    password
-                ),
-                verify_certs=True
-            )
-    else:
-        raise ValueError("Missing Elasticsearch configuration")
-
+    es = get_client()
     if not es.ping():
         raise ConnectionError("Failed to connect to Elasticsearch")
 
@@ -0,0 +1,44 @@
+import os
+import random
+import sys
+
+import pytest
+
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src'))
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+from data_generator import SupportDataGenerator
+from tests.fake_elasticsearch import FakeCluster
+
+@pytest.fixture
+def support_data():
+    random.seed(7)
+    generator = SupportDataGenerator()
+    customers = generator.generate_customers(20)
+    tickets = generator.generate_tickets(120)
+    kb_articles = generator.generate_kb_articles()
+    return {"customers": customers, "tickets": tickets, "kb_articles": kb_articles}
+
+@pytest.fixture
+def cluster_factory(support_data):
+    def build() -> FakeCluster:
+        cluster = FakeCluster()
+        cluster.add_documents("customers", support_data["customers"], "customer_id")
+        cluster.add_documents("support_tickets", support_data["tickets"], "ticket_id")
+        cluster.add_documents("knowledge_base", support_data["kb_articles"], "article_id")
+        cluster.indices.setdefault("agent_actions", {})
+        return cluster
+    return build
+
+@pytest.fixture
+def fake_cluster(cluster_factory):
+    return cluster_factory()
+
+@pytest.fixture
+def es(fake_cluster):
+    return fake_cluster.client()
+
+@pytest.fixture
+def open_tickets(support_data):
+    return [dict(t) for t in support_data["tickets"] if t["status"] == "open"]
@@ -0,0 +1,835 @@
+import asyncio
+import fnmatch
+import gzip
+import json
+import math
+import re
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import unquote, urlsplit
+
+from elastic_transport import ApiResponseMeta, BaseAsyncNode, BaseNode, HttpHeaders
+from elastic_transport._node import NodeApiResponse
+from elasticsearch import AsyncElasticsearch, Elasticsearch
+
+class FakeCluster:
+
+    def __init__(self):
+        self.indices: Dict[str, Dict[str, Dict]] = {}
+        self.requests: List[Tuple[str, str]] = []
+        self.searches: List[Dict] = []
+        self.failures: List[Tuple[str, str, int]] = []
+        self.runtime_fields: Dict[str, Callable[[Dict], Any]] = {}
+        self.latency = 0.0
+        self.pits: Dict[str, Dict[str, Dict[str, Dict]]] = {}
+        self.settings: Dict[str, Dict[str, str]] = {}
+        self.aliases: Dict[str, Dict[str, bool]] = {}
+        self.mappings: Dict[str, Dict] = {}
+        self.policies: Dict[str, Dict] = {}
+        self.templates: Dict[str, Dict] = {}
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self._lock = threading.Lock()
+
+    def add_documents(self, index: str, docs: List[Dict], id_field: str):
+        store = self.indices.setdefault(index, {})
+        for doc in docs:
+            store[doc[id_field]] = dict(doc)
+
+    def fail(self, method: str, path_pattern: str, status: int = 500):
+        self.failures.append((method, path_pattern, status))
+
+    def request_count(self, method: str = None, path_pattern: str = None) -> int:
+        return sum(
+            1 for m, p in self.requests
+            if (method is None or m == method) and (path_pattern is None or re.search(path_pattern, p))
+        )
+
+    def client(self, **kwargs) -> Elasticsearch:
+        cluster = self
+
+        class _Node(FakeNode):
+            pass
+
+        _Node.cluster = cluster
+        return Elasticsearch("http://fake-es:9200", node_class=_Node, **kwargs)
+
+    def async_client(self, **kwargs) -> AsyncElasticsearch:
+        cluster = self
+
+        class _Node(FakeAsyncNode):
+            pass
+
+        _Node.cluster = cluster
+        return AsyncElasticsearch("http://fake-es:9200", node_class=_Node, **kwargs)
+
+    def handle(self, method: str, target: str, body: Optional[bytes], delay: bool = True) -> Tuple[int, Any]:
+        parts = urlsplit(target)
+        path = unquote(parts.path)
+
+        with self._lock:
+            self.requests.append((method, path))
+        if self.latency and delay:
+            time.sleep(self.latency)
+
+        for fail_method, pattern, status in self.failures:
+            if fail_method == method and re.search(pattern, path):
+                return status, {"error": {"type": "fake_failure", "reason": f"injected failure on {path}"}, "status": status}
+
+        segments = [s for s in path.split("/") if s]
+
+        if not segments:
+            return 200, {"cluster_name": "fake", "version": {"number": "8.15.0"}, "tagline": "You Know, for Search"}
+
+        if segments[-1] == "_msearch":
+            return 200, self._msearch(body, segments[0] if len(segments) > 1 else None)
+        if segments[-1] == "_bulk":
+            return 200, self._bulk(body, segments[0] if len(segments) > 1 else None)
+        if segments[0] == "_pit":
+            pit_id = json.loads(body or b"{}").get("id")
+            self.pits.pop(pit_id, None)
+            return 200, {"succeeded": True, "num_freed": 1}
+        if segments[0] == "_search":
+            return self._search(None, json.loads(body or b"{}"))
+        if segments[0] == "_query":
+            with self._lock:
+                return self._esql(json.loads(body or b"{}"))
+        if segments[0] == "_aliases":
+            with self._lock:
+                return self._update_aliases(json.loads(body or b"{}").get("actions", []))
+        if segments[0] == "_alias" and len(segments) == 2:
+            with self._lock:
+                targets = self.aliases.get(segments[1])
+                if not targets:
+                    return 404, {"error": f"alias [{segments[1]}] missing", "status": 404}
+                return 200, {index: {"aliases": {segments[1]: {"is_write_index": is_write} if is_write else {}}}
+                             for index, is_write in targets.items()}
+        if segments[0] == "_reindex":
+            with self._lock:
+                return self._reindex(json.loads(body or b"{}"))
+        if segments[0] == "_ilm" and len(segments) == 3 and segments[1] == "policy":
+            if method == "PUT":
+                self.policies[segments[2]] = json.loads(body or b"{}")["policy"]
+                return 200, {"acknowledged": True}
+            if segments[2] not in self.policies:
+                return 404, {"error": {"type": "resource_not_found_exception", "reason": segments[2]}, "status": 404}
+            return 200, {segments[2]: {"version": 1, "policy": self.policies[segments[2]]}}
+        if segments[0] == "_index_template" and len(segments) == 2 and method == "PUT":
+            self.templates[segments[1]] = json.loads(body or b"{}")
+            return 200, {"acknowledged": True}
+
+        index = segments[0]
+        action = segments[1] if len(segments) > 1 else None
+
+        with self._lock:
+            if action == "_search":
+                return self._search(index, json.loads(body or b"{}"))
+            if action == "_count":
+                query = json.loads(body or b"{}").get("query", {"match_all": {}})
+                docs = self._docs(index)
+                return 200, {"count": sum(1 for d in docs.values() if _matches(d, query, self.runtime_fields)[0])}
+            if action == "_pit":
+                pit_id = str(uuid.uuid4())
+                self.pits[pit_id] = {name: {doc_id: dict(doc) for doc_id, doc in docs.items()}
+                                     for name, docs in self._resolve(index).items()}
+                return 200, {"id": pit_id}
+            if action == "_doc" and len(segments) == 3 and method in ("GET", "HEAD"):
+                doc = self._docs(index).get(segments[2])
+                if doc is None:
+                    return 404, {"_index": index, "_id": segments[2], "found": False}
+                return 200, {"_index": index, "_id": segments[2], "found": True, "_source": doc}
+            if action == "_doc" and len(segments) == 3 and method == "DELETE":
+                if self.indices.get(self._write_target(index), {}).pop(segments[2], None) is None:
+                    return 404, {"_index": index, "_id": segments[2], "result": "not_found"}
+                return 200, {"_index": index, "_id": segments[2], "result": "deleted"}
+            if action in ("_doc", "_create") and method in ("PUT", "POST"):
+                doc_id = segments[2] if len(segments) == 3 else str(uuid.uuid4())
+                self.indices.setdefault(self._write_target(index), {})[doc_id] = json.loads(body)
+                return 201, {"_index": self._write_target(index), "_id": doc_id, "result": "created"}
+            if action == "_update":
+                store = self.indices.get(self._write_target(index), {})
+                if segments[2] not in store:
+                    return 404, {"error": {"type": "document_missing_exception", "reason": f"[{segments[2]}]: document missing"}, "status": 404}
+                store[segments[2]].update(json.loads(body).get("doc", {}))
+                return 200, {"_index": index, "_id": segments[2], "result": "updated"}
+            if action == "_settings":
+                settings = self.settings.setdefault(index, {})
+                if method == "PUT":
+                    for key, value in _flatten(json.loads(body)).items():
+                        if value is None:
+                            settings.pop(key, None)
+                        else:
+                            settings[key] = str(value)
+                    return 200, {"acknowledged": True}
+                return 200, {index: {"settings": dict(settings)}}
+            if action == "_rollover" and method == "POST":
+                return self._rollover(index, json.loads(body or b"{}"))
+            if action in ("_refresh", "_forcemerge"):
+                return 200, {"_shards": {"total": 1, "successful": 1, "failed": 0}}
+            if action is None and method == "GET":
+                names = [name for pattern in index.split(",") for name in self.indices if fnmatch.fnmatchcase(name, pattern)]
+                if not names and "*" not in index:
+                    return 404, {"error": {"type": "index_not_found_exception", "reason": index}, "status": 404}
+                return 200, {name: {"aliases": {alias: {} for alias, targets in self.aliases.items() if name in targets},
+                                    "settings": {"index": dict(self.settings.get(name, {}))}} for name in sorted(names)}
+            if action is None and method == "HEAD":
+                return (200 if index in self.indices or index in self.aliases else 404), {}
+            if action is None and method == "PUT":
+                if index in self.indices or index in self.aliases:
+                    return 400, {"error": {"type": "resource_already_exists_exception", "reason": index}, "status": 400}
+                self._create_index(index, json.loads(body or b"{}"))
+                return 200, {"acknowledged": True, "index": index}
+            if action is None and method == "DELETE":
+                for name in list(self._resolve(index)):
+                    self._drop_index(name)
+                return 200, {"acknowledged": True}
+
+        return 400, {"error": {"type": "unsupported", "reason": f"fake does not support {method} {path}"}, "status": 400}
+
+    def _esql(self, body: Dict) -> Tuple[int, Any]:
+        params = {}
+        for param in body.get("params", []):
+            params.update(param)
+        try:
+            return 200, _run_esql(body["query"], params, self._docs)
+        except (KeyError, ValueError) as e:
+            return 400, {"error": {"type": "verification_exception", "reason": str(e)}, "status": 400}
+
+    def _resolve(self, index: Optional[str]) -> Dict[str, Dict[str, Dict]]:
+        if index is None:
+            return self.indices
+        names = []
+        for name in index.split(","):
+            names.extend(self.aliases[name] if name in self.aliases else [name])
+        return {name: self.indices.get(name, {}) for name in names}
+
+    def _write_target(self, name: str) -> str:
+        targets = self.aliases.get(name)
+        if not targets:
+            return name
+        return next((index for index, is_write in targets.items() if is_write), next(iter(targets)))
+
+    def _create_index(self, index: str, created: Dict):
+        settings: Dict[str, Any] = {}
+        mappings: Dict = {}
+        matching = [template for template in self.templates.values()
+                    if any(fnmatch.fnmatchcase(index, pattern) for pattern in template.get("index_patterns", []))]
+        for template in sorted(matching, key=lambda t: t.get("priority", 0)):
+            settings.update(_flatten(template.get("template", {}).get("settings", {})))
+            mappings = template.get("template", {}).get("mappings", mappings)
+        settings.update(_flatten(created.get("settings", {})))
+        self.indices[index] = {}
+        self.settings[index] = {key: value if isinstance(value, list) else str(value) for key, value in settings.items()}
+        self.mappings[index] = created.get("mappings", mappings)
+        for alias, spec in created.get("aliases", {}).items():
+            self.aliases.setdefault(alias, {})[index] = bool(spec.get("is_write_index"))
+
+    def _rollover(self, alias: str, body: Dict) -> Tuple[int, Any]:
+        old_index = self._write_target(alias)
+        if alias not in self.aliases:
+            return 400, {"error": {"type": "illegal_argument_exception", "reason": f"{alias} is not an alias"}, "status": 400}
+        conditions = body.get("conditions", {})
+        met = {f"[max_docs: {conditions['max_docs']}]": len(self.indices[old_index]) >= conditions["max_docs"]} \
+            if "max_docs" in conditions else {}
+        if conditions and not any(met.values()):
+            return 200, {"rolled_over": False, "old_index": old_index, "new_index": old_index, "conditions": met}
+        prefix, number = re.match(r"(.*-)(\d+)$", old_index).groups()
+        new_index = f"{prefix}{int(number) + 1:06d}"
+        self._create_index(new_index, {})
+        self.aliases[alias][old_index] = False
+        self.aliases[alias][new_index] = True
+        return 200, {"rolled_over": True, "old_index": old_index, "new_index": new_index, "conditions": met}
+
+    def _drop_index(self, name: str):
+        self.indices.pop(name, None)
+        self.settings.pop(name, None)
+        self.mappings.pop(name, None)
+        for alias in list(self.aliases):
+            self.aliases[alias].pop(name, None)
+            if not self.aliases[alias]:
+                del self.aliases[alias]
+
+    def _update_aliases(self, actions: List[Dict]) -> Tuple[int, Any]:
+        for action in actions:
+            (kind, spec), = action.items()
+            index = spec["index"]
+            if index not in self.indices:
+                return 404, {"error": {"type": "index_not_found_exception", "reason": index}, "status": 404}
+            if kind == "remove" and index not in self.aliases.get(spec["alias"], {}):
+                return 404, {"error": {"type": "aliases_not_found_exception", "reason": spec["alias"]}, "status": 404}
+        for action in actions:
+            (kind, spec), = action.items()
+            if kind == "add":
+                self.aliases.setdefault(spec["alias"], {})[spec["index"]] = bool(spec.get("is_write_index"))
+            elif kind == "remove":
+                self.aliases[spec["alias"]].pop(spec["index"], None)
+                if not self.aliases[spec["alias"]]:
+                    del self.aliases[spec["alias"]]
+            elif kind == "remove_index":
+                self._drop_index(spec["index"])
+        return 200, {"acknowledged": True}
+
+    def _reindex(self, body: Dict) -> Tuple[int, Any]:
+        source = body["source"]
+        query = source.get("query", {"match_all": {}})
+        dest = self.indices.setdefault(self._write_target(body["dest"]["index"]), {})
+        created = updated = 0
+        for doc_id, doc in self._docs(source["index"]).items():
+            if _matches(dict(doc, _id=doc_id), query, self.runtime_fields)[0]:
+                if doc_id in dest:
+                    updated += 1
+                else:
+                    created += 1
+                dest[doc_id] = dict(doc)
+        return 200, {"total": created + updated, "created": created, "updated": updated, "failures": []}
+
+    def _docs(self, index: str) -> Dict[str, Dict]:
+        merged = {}
+        for docs in self._resolve(index).values():
+            merged.update(docs)
+        return merged
+
+    def _search(self, index: Optional[str], body: Dict) -> Tuple[int, Any]:
+        self.searches.append(body)
+        if "pit" in body:
+            snapshot = self.pits.get(body["pit"]["id"])
+            if snapshot is None:
+                return 404, {"error": {"type": "search_context_missing_exception", "reason": "pit expired"}, "status": 404}
+            docs = {}
+            for source in snapshot.values():
+                docs.update(source)
+        else:
+            docs = self._docs(index)
+        return 200, self._run_search(index or "", docs, body)
+
+    def _run_search(self, index: str, docs: Dict[str, Dict], body: Dict) -> Dict:
+        query = body.get("query", {"match_all": {}})
+        hits = []
+        for shard_doc, (doc_id, doc) in enumerate(docs.items()):
+            matched, score = _matches(dict(doc, _id=doc_id), query, self.runtime_fields)
+            if matched:
+                hits.append({"_index": index, "_id": doc_id, "_score": score, "_source": doc, "_shard_doc": shard_doc})
+
+        if "knn" in body:
+            hits = _knn(hits, body["knn"], self.runtime_fields)
+
+        source_filter = body.get("_source")
+        if isinstance(source_filter, dict) and source_filter.get("excludes"):
+            for hit in hits:
+                hit["_source"] = {k: v for k, v in hit["_source"].items() if k not in source_filter["excludes"]}
+
+        sort = body.get("sort")
+        if sort:
+            keys = []
+            for clause in sort:
+                if isinstance(clause, str):
+                    field, order = clause, "asc"
+                else:
+                    field, spec = next(iter(clause.items()))
+                    order = spec if isinstance(spec, str) else spec.get("order", "asc")
+                keys.append((field, order))
+
+            def sort_values(hit):
+                values = []
+                for field, _ in keys:
+                    if field == "_score":
+                        values.append(hit["_score"])
+                    elif field == "_shard_doc":
+                        values.append(hit["_shard_doc"])
+                    elif field in self.runtime_fields:
+                        values.append(self.runtime_fields[field](hit["_source"]))
+                    else:
+                        values.append(_field(hit["_source"], field))
+                return values
+
+            for hit in hits:
+                hit["sort"] = sort_values(hit)
+            for position in reversed(range(len(keys))):
+                hits.sort(key=lambda h: _sortable(h["sort"][position]), reverse=keys[position][1] == "desc")
+            if "search_after" in body:
+                after = body["search_after"]
+                hits = [h for h in hits if _after(h["sort"], after, keys)]
+        else:
+            hits.sort(key=lambda h: -h["_score"])
+
+        total = len(hits)
+        size = body.get("size", 10)
+        page = hits[body.get("from", 0): body.get("from", 0) + size]
+        for hit in page:
+            hit.pop("_shard_doc", None)
+
+        response = {
+            "took": 1,
+            "timed_out": False,
+            "hits": {"total": {"value": total, "relation": "eq"}, "max_score": None, "hits": page}
+        }
+        if "pit" in body:
+            response["pit_id"] = body["pit"]["id"]
+        if "aggs" in body or "aggregations" in body:
+            matching = [h["_source"] for h in hits]
+            response["aggregations"] = _aggregate(matching, body.get("aggs") or body.get("aggregations"))
+        return response
+
+    def _msearch(self, body: bytes, default_index: Optional[str]) -> Dict:
+        lines = [json.loads(line) for line in body.decode().splitlines() if line.strip()]
+        responses = []
+        for header, search_body in zip(lines[0::2], lines[1::2]):
+            index = header.get("index", default_index)
+            if isinstance(index, list):
+                index = ",".join(index)
+            failed = next(
+                (status for m, pattern, status in self.failures if m == "POST" and re.search(pattern, f"/{index}/_search")),
+                None
+            )
+            if failed:
+                responses.append({"error": {"type": "fake_failure", "reason": "injected"}, "status": failed})
+                continue
+            with self._lock:
+                status, response = self._search(index, search_body)
+            response["status"] = status
+            responses.append(response)
+        return {"took": 1, "responses": responses}
+
+    def _bulk(self, body: bytes, default_index: Optional[str]) -> Dict:
+        lines = [json.loads(line) for line in body.decode().splitlines() if line.strip()]
+        items = []
+        errors = False
+        position = 0
+        with self._lock:
+            while position < len(lines):
+                op_type, meta = next(iter(lines[position].items()))
+                position += 1
+                index = self._write_target(meta.get("_index", default_index))
+                doc_id = meta.get("_id")
+                store = self.indices.setdefault(index, {})
+                failed = next(
+                    (status for m, pattern, status in self.failures if m == "BULK" and re.search(pattern, f"/{index}/{doc_id}")),
+                    None
+                )
+                if op_type == "delete":
+                    store.pop(doc_id, None)
+                    items.append({op_type: {"_index": index, "_id": doc_id, "status": 200, "result": "deleted"}})
+                    continue
+                source = lines[position]
+                position += 1
+                if failed:
+                    errors = True
+                    items.append({op_type: {"_index": index, "_id": doc_id, "status": failed,
+                                            "error": {"type": "fake_failure", "reason": "injected"}}})
+                elif op_type == "update":
+                    if doc_id not in store:
+                        errors = True
+                        items.append({op_type: {"_index": index, "_id": doc_id, "status": 404,
+                                                "error": {"type": "document_missing_exception", "reason": "document missing"}}})
+                    else:
+                        store[doc_id].update(source.get("doc", {}))
+                        items.append({op_type: {"_index": index, "_id": doc_id, "status": 200, "result": "updated"}})
+                else:
+                    doc_id = doc_id or str(uuid.uuid4())
+                    store[doc_id] = source
+                    items.append({op_type: {"_index": index, "_id": doc_id, "status": 201, "result": "created"}})
+        return {"took": 1, "errors": errors, "items": items}
+
+class FakeNode(BaseNode):
+
+    cluster: FakeCluster = None
+
+    def perform_request(self, method, target, body=None, headers=None, request_timeout=None) -> NodeApiResponse:
+        if body and headers and headers.get("content-encoding") == "gzip":
+            body = gzip.decompress(body)
+        status, payload = self.cluster.handle(method, target, body)
+        return _response(self.config, method, status, payload)
+
+class FakeAsyncNode(BaseAsyncNode):
+
+    cluster: FakeCluster = None
+
+    async def perform_request(self, method, target, body=None, headers=None, request_timeout=None) -> NodeApiResponse:
+        if body and headers and headers.get("content-encoding") == "gzip":
+            body = gzip.decompress(body)
+        cluster = self.cluster
+        with cluster._lock:
+            cluster.in_flight += 1
+            cluster.peak_in_flight = max(cluster.peak_in_flight, cluster.in_flight)
+        try:
+            if cluster.latency:
+                await asyncio.sleep(cluster.latency)
+            status, payload = cluster.handle(method, target, body, delay=False)
+        finally:
+            with cluster._lock:
+                cluster.in_flight -= 1
+        return _response(self.config, method, status, payload)
+
+    async def close(self):
+        pass
+
+def _response(config, method: str, status: int, payload: Any) -> NodeApiResponse:
+    meta = ApiResponseMeta(
+        status=status,
+        http_version="1.1",
+        headers=HttpHeaders({"content-type": "application/json", "x-elastic-product": "Elasticsearch"}),
+        duration=0.0,
+        node=config
+    )
+    data = b"" if method == "HEAD" else json.dumps(payload).encode()
+    return NodeApiResponse(meta, data)
+
+def _tokens(value: Any) -> List[str]:
+    if isinstance(value, list):
+        return [token for item in value for token in _tokens(item)]
+    return re.findall(r"\w+", str(value or "").lower())
+
+def _flatten(settings: Dict, prefix: str = "") -> Dict[str, Any]:
+    flat = {}
+    for key, value in settings.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(_flatten(value, f"{name}."))
+        else:
+            flat[name] = value
+    return flat
+
+def _field(doc: Dict, field: str) -> Any:
+    if field.endswith(".keyword"):
+        field = field[:-len(".keyword")]
+    value = doc
+    for part in field.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+def _sortable(value: Any):
+    return (value is None, value if value is not None else 0)
+
+def _after(values: List, after: List, keys: List[Tuple[str, str]]) -> bool:
+    for value, marker, (_, order) in zip(values, after, keys):
+        if value == marker:
+            continue
+        if order == "desc":
+            return _sortable(value) < _sortable(marker)
+        return _sortable(value) > _sortable(marker)
+    return False
+
+def _matches(doc: Dict, query: Dict, runtime_fields: Dict) -> Tuple[bool, float]:
+    (kind, spec), = query.items()
+
+    if kind == "match_all":
+        return True, 1.0
+
+    if kind == "term":
+        field, value = next(iter(spec.items()))
+        if isinstance(value, dict):
+            value = value.get("value")
+        actual = doc.get("_id") if field == "_id" else _field(doc, field)
+        if isinstance(actual, list):
+            return value in actual, 1.0
+        return actual == value, 1.0
+
+    if kind == "terms":
+        field, values = next(iter(spec.items()))
+        actual = _field(doc, field)
+        if isinstance(actual, list):
+            return any(v in values for v in actual), 1.0
+        return actual in values, 1.0
+
+    if kind == "ids":
+        return doc.get("_id") in spec.get("values", []), 1.0
+
+    if kind == "exists":
+        return _field(doc, spec["field"]) is not None, 1.0
+
+    if kind == "range":
+        field, bounds = next(iter(spec.items()))
+        actual = _field(doc, field)
+        if actual is None:
+            return False, 0.0
+        checks = {
+            "gt": lambda a, b: a > b,
+            "gte": lambda a, b: a >= b,
+            "lt": lambda a, b: a < b,
+            "lte": lambda a, b: a <= b
+        }
+        ok = all(checks[op](actual, bound) for op, bound in bounds.items() if op in checks)
+        return ok, 1.0
+
+    if kind in ("match", "multi_match"):
+        if kind == "match":
+            field, value = next(iter(spec.items()))
+            text = value["query"] if isinstance(value, dict) else value
+            fields = [field]
+        else:
+            text = spec["query"]
+            fields = spec.get("fields", [])
+        query_tokens = set(_tokens(text))
+        score = 0.0
+        for field in fields:
+            name, _, boost = field.partition("^")
+            overlap = query_tokens & set(_tokens(_field(doc, name)))
+            score += len(overlap) * float(boost or 1)
+        return score > 0, score
+
+    if kind == "bool":
+        score = 0.0
+        for clause in _as_list(spec.get("must")):
+            ok, s = _matches(doc, clause, runtime_fields)
+            if not ok:
+                return False, 0.0
+            score += s
+        for clause in _as_list(spec.get("filter")):
+            if not _matches(doc, clause, runtime_fields)[0]:
+                return False, 0.0
+        for clause in _as_list(spec.get("must_not")):
+            if _matches(doc, clause, runtime_fields)[0]:
+                return False, 0.0
+        should = _as_list(spec.get("should"))
+        if should:
+            results = [_matches(doc, clause, runtime_fields) for clause in should]
+            matched = [s for ok, s in results if ok]
+            required = spec.get("minimum_should_match", 0 if (spec.get("must") or spec.get("filter")) else 1)
+            if len(matched) < int(required):
+                return False, 0.0
+            score += sum(matched)
+        return True, score or 1.0
+
+    raise ValueError(f"fake does not support query type {kind}")
+
+def _knn(hits: List[Dict], spec: Dict, runtime_fields: Dict) -> List[Dict]:
+    query_vector = spec["query_vector"]
+    query_norm = math.sqrt(sum(v * v for v in query_vector)) or 1.0
+    scored = []
+    for hit in hits:
+        vector = hit["_source"].get(spec["field"])
+        if not vector:
+            continue
+        if "filter" in spec and not _matches(dict(hit["_source"], _id=hit["_id"]), spec["filter"], runtime_fields)[0]:
+            continue
+        norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+        cosine = sum(a * b for a, b in zip(query_vector, vector)) / (query_norm * norm)
+        scored.append(dict(hit, _score=(1 + cosine) / 2))
+    scored.sort(key=lambda h: -h["_score"])
+    return scored[:spec.get("k", 10)]
+
+def _as_list(value) -> List:
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+def _aggregate(docs: List[Dict], aggs: Dict) -> Dict:
+    result = {}
+    for name, spec in aggs.items():
+        sub_aggs = spec.get("aggs") or spec.get("aggregations")
+        if "terms" in spec:
+            field = spec["terms"]["field"]
+            groups: Dict[Any, List[Dict]] = {}
+            for doc in docs:
+                value = _field(doc, field)
+                for key in (value if isinstance(value, list) else [value]):
+                    if key is not None:
+                        groups.setdefault(key, []).append(doc)
+            ordered = sorted(groups.items(), key=lambda kv: (-len(kv[1]), str(kv[0])))
+            buckets = []
+            for key, members in ordered[:spec["terms"].get("size", 10)]:
+                bucket = {"key": key, "doc_count": len(members)}
+                if sub_aggs:
+                    bucket.update(_aggregate(members, sub_aggs))
+                buckets.append(bucket)
+            result[name] = {"doc_count_error_upper_bound": 0, "sum_other_doc_count": 0, "buckets": buckets}
+        elif "composite" in spec:
+            sources = [(source_name, source["terms"]["field"])
+                       for source_spec in spec["composite"]["sources"]
+                       for source_name, source in source_spec.items()]
+            groups = {}
+            for doc in docs:
+                key = tuple(_field(doc, field) for _, field in sources)
+                if None not in key:
+                    groups.setdefault(key, []).append(doc)
+            after = spec["composite"].get("after")
+            ordered = sorted(groups.items())
+            if after is not None:
+                after_key = tuple(after[source_name] for source_name, _ in sources)
+                ordered = [(key, members) for key, members in ordered if key > after_key]
+            buckets = []
+            for key, members in ordered[:spec["composite"].get("size", 10)]:
+                bucket = {"key": dict(zip([source_name for source_name, _ in sources], key)), "doc_count": len(members)}
+                if sub_aggs:
+                    bucket.update(_aggregate(members, sub_aggs))
+                buckets.append(bucket)
+            result[name] = {"buckets": buckets}
+            if buckets:
+                result[name]["after_key"] = buckets[-1]["key"]
+        elif "avg" in spec:
+            values = [_field(doc, spec["avg"]["field"]) for doc in docs]
+            values = [value for value in values if value is not None]
+            result[name] = {"value": sum(values) / len(values) if values else None}
+        elif "value_count" in spec:
+            field = spec["value_count"]["field"]
+            result[name] = {"value": sum(1 for doc in docs if _field(doc, field) is not None)}
+        elif "filter" in spec:
+            members = [doc for doc in docs if _matches(doc, spec["filter"], {})[0]]
+            result[name] = {"doc_count": len(members)}
+            if sub_aggs:
+                result[name].update(_aggregate(members, sub_aggs))
+        else:
+            raise ValueError(f"fake does not support aggregation {spec}")
+    return result
+
+_ESQL_TOKEN = re.compile(r"\s*(==|!=|\?\w+|[(),=*]|\"[^\"]*\"|[\w.]+)")
+
+def _run_esql(query: str, params: Dict[str, Any], docs_for: Callable[[str], Dict[str, Dict]]) -> Dict:
+    commands = [command.strip() for command in query.split("|")]
+    source = commands[0].split(None, 1)
+    if source[0].upper() != "FROM":
+        raise ValueError(f"unsupported source command {source[0]}")
+    rows = [dict(doc) for doc in docs_for(source[1].strip()).values()]
+    columns = None
+
+    for command in commands[1:]:
+        name, _, rest = command.partition(" ")
+        tokens = _ESQL_TOKEN.findall(rest)
+        name = name.upper()
+        if name == "WHERE":
+            expression = _EsqlParser(tokens, params).parse()
+            rows = [row for row in rows if expression(row) is True]
+        elif name == "EVAL":
+            parser = _EsqlParser(tokens, params)
+            for target, expression in parser.assignments():
+                for row in rows:
+                    row[target] = expression(row)
+        elif name == "STATS":
+            rows, columns = _esql_stats(tokens, params, rows)
+        elif name == "LIMIT":
+            rows = rows[:int(tokens[0])]
+        else:
+            raise ValueError(f"unsupported command {name}")
+
+    columns = columns or sorted({key for row in rows for key in row})
+    return {
+        "columns": [{"name": column, "type": "keyword"} for column in columns],
+        "values": [[row.get(column) for column in columns] for row in rows]
+    }
+
+def _esql_stats(tokens: List[str], params: Dict[str, Any], rows: List[Dict]) -> Tuple[List[Dict], List[str]]:
+    if "BY" in tokens:
+        position = tokens.index("BY")
+        aggregations, groups = tokens[:position], [t for t in tokens[position + 1:] if t != ","]
+    else:
+        aggregations, groups = tokens, []
+    if aggregations[1:5] != ["=", "COUNT", "(", "*"]:
+        raise ValueError("only COUNT(*) aggregations are supported")
+    target = aggregations[0]
+
+    buckets: Dict[Tuple, int] = {}
+    for row in rows:
+        key = tuple(_esql_value(row, group) for group in groups)
+        buckets[key] = buckets.get(key, 0) + 1
+    return ([dict(zip(groups, key), **{target: count}) for key, count in buckets.items()], [target] + groups)
+
+def _esql_value(row: Dict, field: str) -> Any:
+    if field in row:
+        return row[field]
+    value = _field(row, field)
+    return value[0] if isinstance(value, list) and len(value) == 1 else value
+
+class _EsqlParser:
+
+    def __init__(self, tokens: List[str], params: Dict[str, Any]):
+        self.tokens = tokens
+        self.params = params
+        self.position = 0
+
+    def peek(self) -> Optional[str]:
+        return self.tokens[self.position] if self.position < len(self.tokens) else None
+
+    def take(self, expected: Optional[str] = None) -> str:
+        token = self.peek()
+        if token is None or (expected is not None and token.upper() != expected):
+            raise ValueError(f"expected {expected}, found {token}")
+        self.position += 1
+        return token
+
+    def parse(self) -> Callable[[Dict], Any]:
+        expression = self.disjunction()
+        if self.peek() is not None:
+            raise ValueError(f"unexpected token {self.peek()}")
+        return expression
+
+    def assignments(self) -> List[Tuple[str, Callable[[Dict], Any]]]:
+        result = []
+        while self.peek() is not None:
+            target = self.take()
+            self.take("=")
+            result.append((target, self.disjunction()))
+            if self.peek() == ",":
+                self.take(",")
+        return result
+
+    def disjunction(self) -> Callable[[Dict], Any]:
+        parts = [self.conjunction()]
+        while (self.peek() or "").upper() == "OR":
+            self.take("OR")
+            parts.append(self.conjunction())
+        return parts[0] if len(parts) == 1 else (lambda row: any(part(row) is True for part in parts))
+
+    def conjunction(self) -> Callable[[Dict], Any]:
+        parts = [self.comparison()]
+        while (self.peek() or "").upper() == "AND":
+            self.take("AND")
+            parts.append(self.comparison())
+        return parts[0] if len(parts) == 1 else (lambda row: all(part(row) is True for part in parts))
+
+    def comparison(self) -> Callable[[Dict], Any]:
+        left = self.operand()
+        operator = (self.peek() or "").upper()
+        if operator in ("==", "!="):
+            self.take()
+            right = self.operand()
+            if operator == "==":
+                return lambda row: None if left(row) is None else left(row) == right(row)
+            return lambda row: None if left(row) is None else left(row) != right(row)
+        if operator == "IN":
+            self.take("IN")
+            self.take("(")
+            values = [self.operand()]
+            while self.peek() == ",":
+                self.take(",")
+                values.append(self.operand())
+            self.take(")")
+            return lambda row: None if left(row) is None else left(row) in [value(row) for value in values]
+        return left
+
+    def operand(self) -> Callable[[Dict], Any]:
+        token = self.take()
+        upper = token.upper()
+        if token == "(":
+            expression = self.disjunction()
+            self.take(")")
+            return expression
+        if upper == "CASE":
+            self.take("(")
+            arguments = [self.disjunction()]
+            while self.peek() == ",":
+                self.take(",")
+                arguments.append(self.disjunction())
+            self.take(")")
+            return lambda row: _esql_case(arguments, row)
+        if token.startswith("?"):
+            value = self.params[token[1:]]
+            return lambda row: value
+        if token.startswith('"'):
+            return lambda row: token[1:-1]
+        if upper in ("TRUE", "FALSE"):
+            return lambda row: upper == "TRUE"
+        if upper == "NULL":
+            return lambda row: None
+        if re.fullmatch(r"-?\d+", token):
+            return lambda row: int(token)
+        return lambda row: _esql_value(row, token)
+
+def _esql_case(arguments: List[Callable[[Dict], Any]], row: Dict) -> Any:
+    for position in range(0, len(arguments) - 1, 2):
+        if arguments[position](row) is True:
+            return arguments[position + 1](row)
+    return arguments[-1](row) if len(arguments) % 2 else None
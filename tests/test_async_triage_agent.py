@@ -0,0 +1,69 @@
+import asyncio
+
+import pytest
+
+from agent.async_triage_agent import AsyncTriageAgent
+from agent.triage_agent import TriageAgent
+
+VOLATILE_KEYS = {"timestamp", "updated_at", "processing_time_ms", "timings"}
+
+def stable(value):
+    if isinstance(value, dict):
+        return {k: stable(v) for k, v in value.items() if k not in VOLATILE_KEYS}
+    if isinstance(value, list):
+        return [stable(v) for v in value]
+    return value
+
+async def run_async(cluster, tickets, **kwargs):
+    es = cluster.async_client()
+    try:
+        return await AsyncTriageAgent(es, **kwargs).triage_batch(tickets)
+    finally:
+        await es.close()
+
+def test_async_agent_matches_sync_agent(cluster_factory, open_tickets):
+    tickets = open_tickets[:12]
+    sync_cluster, async_cluster = cluster_factory(), cluster_factory()
+
+    expected = TriageAgent(sync_cluster.client()).triage_batch(tickets, max_workers=1)
+    actual = asyncio.run(run_async(async_cluster, tickets, max_concurrency=1))
+
+    assert stable(actual) == stable(expected)
+
+def test_async_agent_writes_the_same_ticket_updates(cluster_factory, open_tickets):
+    tickets = open_tickets[:12]
+    sync_cluster, async_cluster = cluster_factory(), cluster_factory()
+
+    TriageAgent(sync_cluster.client()).triage_batch(tickets, max_workers=1)
+    asyncio.run(run_async(async_cluster, tickets, max_concurrency=1))
+
+    assert stable(async_cluster.indices["support_tickets"]) == stable(sync_cluster.indices["support_tickets"])
+    assert len(async_cluster.indices["agent_actions"]) == len(sync_cluster.indices["agent_actions"]) == len(tickets)
+
+def test_async_agent_bounds_tickets_in_flight(fake_cluster, open_tickets):
+    fake_cluster.latency = 0.01
+    tickets = open_tickets[:20]
+
+    results = asyncio.run(run_async(fake_cluster, tickets, max_concurrency=5))
+
+    assert [r["ticket_id"] for r in results] == [t["ticket_id"] for t in tickets]
+    assert all("error" not in r for r in results)
+    assert 5 < fake_cluster.peak_in_flight <= 5 * 4
+
+def test_async_agent_falls_back_when_searches_fail(fake_cluster, open_tickets):
+    fake_cluster.fail("POST", "^/knowledge_base/_search")
+    fake_cluster.fail("GET", "^/customers/")
+
+    result, = asyncio.run(run_async(fake_cluster, open_tickets[:1]))
+
+    assert result["context"]["kb_articles_found"] == 0
+    assert result["context"]["customer_history"]["plan"] == "free"
+    assert result["workflow_result"]["actions_taken"][0].startswith("Updated ticket fields")
+
+def test_async_agent_does_not_inherit_the_sync_api():
+    assert not issubclass(AsyncTriageAgent, TriageAgent)
+    assert not hasattr(AsyncTriageAgent, "triage_stream")
+    assert not hasattr(AsyncTriageAgent, "_search_for_context_batch")
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
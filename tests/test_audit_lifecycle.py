@@ -0,0 +1,116 @@
+from datetime import datetime, timedelta, timezone
+
+from es_config.aliases import alias_targets, ensure_alias
+from es_config.audit_lifecycle import AUDIT_POLICY, ensure_rollover_alias, rollover, write_index
+from es_config.setup_indices import AGENT_ACTION_MAPPING
+from metrics_dashboard import MetricsDashboard
+from tests.fake_elasticsearch import FakeCluster
+
+def _action(days_ago, confidence, needs_review=False, action_type="triage"):
+    return {
+        "action_type": action_type,
+        "confidence_score": confidence,
+        "details": {"needs_review": needs_review},
+        "timestamp": (datetime.now(timezone.utc) - timedelta(days=days_ago)).isoformat()
+    }
+
+def test_bootstraps_a_rollover_alias_with_policy_and_template(monkeypatch):
+    monkeypatch.setenv("AUDIT_ROLLOVER_MAX_AGE", "12h")
+    monkeypatch.setenv("AUDIT_DELETE_AFTER", "90d")
+    cluster = FakeCluster()
+    es = cluster.client()
+
+    index = ensure_rollover_alias(es, "agent_actions", AGENT_ACTION_MAPPING, {"index.codec": "best_compression"})
+    es.index(index="agent_actions", document=_action(0, 0.9))
+
+    policy = cluster.policies[AUDIT_POLICY]["phases"]
+    assert policy["hot"]["actions"]["rollover"]["max_age"] == "12h"
+    assert "shrink" in policy["warm"]["actions"] and "delete" in policy
+    assert index == "agent_actions-000001" and len(cluster.indices[index]) == 1
+    assert cluster.settings[index]["index.lifecycle.rollover_alias"] == "agent_actions"
+    assert ensure_rollover_alias(es, "agent_actions", AGENT_ACTION_MAPPING) == index
+
+def test_rollover_moves_writes_and_keeps_history_searchable():
+    cluster = FakeCluster()
+    es = cluster.client()
+    ensure_rollover_alias(es, "agent_actions", AGENT_ACTION_MAPPING)
+    for _ in range(3):
+        es.index(index="agent_actions", document=_action(0, 0.8))
+
+    assert not rollover(es, max_docs=10)["rolled_over"]
+    result = rollover(es, max_docs=3)
+    es.index(index="agent_actions", document=_action(0, 0.8))
+
+    assert result["new_index"] == "agent_actions-000002"
+    assert write_index(es, "agent_actions") == "agent_actions-000002"
+    assert cluster.settings["agent_actions-000002"]["index.lifecycle.name"] == AUDIT_POLICY
+    assert len(cluster.indices["agent_actions-000002"]) == 1
+    assert es.count(index="agent_actions")["count"] == 4
+
+def test_migrates_legacy_audit_indices_without_losing_history():
+    cluster = FakeCluster()
+    cluster.add_documents("agent_actions", [dict(_action(1, 0.7), action_id=f"A{i}") for i in range(5)], "action_id")
+    es = cluster.client()
+
+    ensure_rollover_alias(es, "agent_actions", AGENT_ACTION_MAPPING)
+
+    assert alias_targets(es, "agent_actions") == ["agent_actions-000001"]
+    assert es.count(index="agent_actions")["count"] == 5
+
+    versioned = FakeCluster()
+    es = versioned.client()
+    old = ensure_alias(es, "agent_actions", AGENT_ACTION_MAPPING)
+    es.index(index="agent_actions", document=_action(1, 0.7))
+
+    index = ensure_rollover_alias(es, "agent_actions", AGENT_ACTION_MAPPING)
+
+    assert alias_targets(es, "agent_actions") == [index, old]
+    assert write_index(es, "agent_actions") == index
+    assert es.count(index="agent_actions")["count"] == 1
+
+def test_legacy_migration_keeps_actions_written_during_the_reindex(monkeypatch):
+    cluster = FakeCluster()
+    cluster.add_documents("agent_actions", [dict(_action(1, 0.7), action_id=f"A{i}") for i in range(5)], "action_id")
+    es = cluster.client()
+    reindex = es.reindex
+
+    def reindex_while_agents_write(**kwargs):
+        response = reindex(**kwargs)
+        if "query" not in kwargs["source"]:
+            es.index(index="agent_actions", id="LATE", document=_action(0, 0.9))
+        return response
+
+    monkeypatch.setattr(es, "reindex", reindex_while_agents_write)
+    index = ensure_rollover_alias(es, "agent_actions", AGENT_ACTION_MAPPING)
+
+    assert alias_targets(es, "agent_actions") == [index]
+    assert es.count(index="agent_actions")["count"] == 6
+    assert "LATE" in cluster.indices[index]
+
+def test_missing_lifecycle_support_still_creates_the_alias():
+    cluster = FakeCluster()
+    cluster.fail("PUT", r"^/_ilm/", status=400)
+    es = cluster.client()
+
+    index = ensure_rollover_alias(es, "agent_actions", AGENT_ACTION_MAPPING)
+
+    assert write_index(es, "agent_actions") == index
+    assert "index.lifecycle.name" not in cluster.settings[index]
+
+def test_dashboard_aggregates_only_the_requested_window():
+    cluster = FakeCluster()
+    es = cluster.client()
+    ensure_rollover_alias(es, "agent_actions", AGENT_ACTION_MAPPING)
+    for action in [_action(40, 0.2, True), _action(20, 0.4, True)]:
+        es.index(index="agent_actions", document=action)
+    rollover(es)
+    for action in [_action(2, 0.6, True), _action(1, 1.0), _action(0, 0.8, action_type="escalation")]:
+        es.index(index="agent_actions", document=action)
+
+    recent = MetricsDashboard(es, window_days=7)._get_agent_performance()
+    everything = MetricsDashboard(es, window_days=0)._get_agent_performance()
+
+    assert recent["total_processed"] == 3 and recent["flagged_for_review"] == 1
+    assert abs(recent["average_confidence"] - 0.8) < 1e-9
+    assert recent["by_action_type"] == {"triage": 2, "escalation": 1}
+    assert everything["total_processed"] == 5 and everything["flagged_for_review"] == 3
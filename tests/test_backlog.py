@@ -0,0 +1,68 @@
+import json
+
+import pytest
+
+from agent.backlog import OpenTicketStream, PRIORITY_RANK
+from agent.triage_agent import TriageAgent
+
+@pytest.fixture
+def ranked_cluster(fake_cluster):
+    fake_cluster.runtime_fields["priority_rank"] = lambda doc: PRIORITY_RANK.get(doc.get("priority", "low"), 3)
+    return fake_cluster
+
+def backlog_order(tickets):
+    return [t["ticket_id"] for t in sorted(
+        tickets, key=lambda t: (PRIORITY_RANK.get(t.get("priority", "low"), 3), t["created_at"], t["ticket_id"]))]
+
+def test_stream_walks_open_backlog_in_priority_order(es, ranked_cluster, open_tickets):
+    stream = OpenTicketStream(es, page_size=7)
+
+    pages = list(stream.pages())
+
+    assert [t["ticket_id"] for page in pages for t in page] == backlog_order(open_tickets)
+    assert max(len(page) for page in pages) == 7
+    assert ranked_cluster.request_count("POST", "/_pit$") == 1
+    assert ranked_cluster.pits == {}
+
+def test_stream_resumes_from_checkpoint(es, ranked_cluster, open_tickets, tmp_path):
+    checkpoint = tmp_path / "checkpoint.json"
+    first = OpenTicketStream(es, page_size=5, checkpoint_path=str(checkpoint))
+
+    seen = []
+    pages = first.pages()
+    for _ in range(2):
+        seen.extend(t["ticket_id"] for t in next(pages))
+        first.commit()
+    seen.extend(t["ticket_id"] for t in next(pages))
+    pages.close()
+
+    assert json.loads(checkpoint.read_text())["processed"] == 10
+    resumed = OpenTicketStream(es, page_size=5, checkpoint_path=str(checkpoint))
+    rest = [t["ticket_id"] for t in resumed.tickets()]
+
+    assert seen[:10] + rest == backlog_order(open_tickets)
+    assert resumed.processed == len(open_tickets)
+    assert not checkpoint.exists()
+
+def test_stream_reopens_expired_point_in_time(es, ranked_cluster, open_tickets):
+    stream = OpenTicketStream(es, page_size=4)
+    pages = stream.pages()
+
+    first = next(pages)
+    ranked_cluster.pits.clear()
+    rest = [t for page in pages for t in page]
+
+    assert [t["ticket_id"] for t in first + rest] == backlog_order(open_tickets)
+
+def test_triage_stream_processes_every_open_ticket(es, ranked_cluster, open_tickets, tmp_path):
+    checkpoint = tmp_path / "checkpoint.json"
+    agent = TriageAgent(es)
+
+    results = list(agent.triage_stream(OpenTicketStream(es, page_size=6, checkpoint_path=str(checkpoint)), max_workers=4))
+
+    assert [r["ticket_id"] for r in results] == backlog_order(open_tickets)
+    assert all(ranked_cluster.indices["support_tickets"][t["ticket_id"]]["status"] == "in_progress" for t in open_tickets)
+    assert not checkpoint.exists()
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,87 @@
+import random
+
+import pytest
+
+from agent.batch_scorer import priority_level, score_batch
+from agent.triage_agent import TriageAgent
+from tests.fake_elasticsearch import FakeCluster
+
+CATEGORIES = ["technical", "billing", "account", "feature", "other"]
+
+def synthetic_contexts(tickets, seed=3):
+    rng = random.Random(seed)
+    contexts = []
+    for position, ticket in enumerate(tickets):
+        history = {"plan": rng.choice(["enterprise", "business", "pro", "free"]),
+                   "satisfaction_score": rng.choice([2.0, 2.9, 3.0, 4.5])}
+        if position % 7 == 0:
+            history = {}
+        context = {
+            "similar_tickets": [{"category": rng.choice(CATEGORIES)} for _ in range(rng.choice([0, 1, 2, 4, 5]))],
+            "kb_articles": [{}] * rng.randint(0, 3),
+            "customer_history": history
+        }
+        if position % 5 == 0:
+            categories = {c: rng.randint(1, 6) for c in rng.sample(CATEGORIES, rng.randint(1, 3))}
+            context["subject_prior"] = {"categories": categories, "count": sum(categories.values())}
+        elif position % 3 == 0:
+            context["esql_votes"] = {c: rng.randint(1, 4) for c in rng.sample(CATEGORIES, rng.randint(1, 2))}
+        contexts.append(context)
+    return contexts
+
+def test_batch_scores_match_scalar_path(support_data):
+    agent = TriageAgent(FakeCluster().client())
+    tickets = support_data["tickets"] * 3
+    analyses = [agent._analyze_content(t) for t in tickets]
+    contexts = synthetic_contexts(tickets)
+    workload = {"engineering": 4}
+
+    esql_analyses, decisions = score_batch(tickets, analyses, contexts, workload, agent._classify_by_keywords)
+
+    for ticket, analysis, context, esql_analysis, decision in zip(tickets, analyses, contexts, esql_analyses, decisions):
+        expected = agent._score_ticket(ticket, analysis, context, workload)
+        assert esql_analysis == expected
+        assert decision == agent._make_decision(ticket, analysis, context, expected)
+    assert {a["category_source"] for a in esql_analyses} == {"subject_prior", "esql", "similar_tickets", "keywords"}
+    assert {d["priority"] for d in decisions} == {"low", "medium", "high", "critical"}
+
+def test_ties_keep_first_seen_category():
+    agent = TriageAgent(FakeCluster().client())
+    ticket = {"subject": "", "description": ""}
+    analysis = agent._analyze_content(ticket)
+    context = {"similar_tickets": [{"category": c} for c in ["billing", "account", "account", "billing"]],
+               "kb_articles": [], "customer_history": {}}
+
+    esql_analyses, _ = score_batch([ticket], [analysis], [context], {}, agent._classify_by_keywords)
+
+    assert esql_analyses[0]["predicted_category"] == "billing"
+    assert esql_analyses[0]["category_confidence"] == 0.5
+
+@pytest.mark.parametrize("score, level", [(0, "low"), (24, "low"), (25, "medium"), (50, "high"), (75, "critical")])
+def test_priority_level_thresholds(score, level):
+    assert priority_level(score) == level
+
+def test_vectorized_batch_triage_matches_per_ticket_scoring(cluster_factory, open_tickets):
+    results = []
+    for vectorized in (False, True):
+        with TriageAgent(cluster_factory().client(), use_msearch=True, vectorized_scoring=vectorized) as agent:
+            results.append(agent.triage_batch([dict(t) for t in open_tickets[:20]]))
+
+    scalar, vectorized = results
+    assert [r["triage_decision"] for r in vectorized] == [r["triage_decision"] for r in scalar]
+    strip = lambda r: {k: v for k, v in r["analysis"].items() if k != "team_workload"}
+    assert [strip(r) for r in vectorized] == [strip(r) for r in scalar]
+    assert all("scoring" in r["timings"] for r in vectorized)
+
+def test_vectorized_scoring_batches_without_msearch(cluster_factory, open_tickets, monkeypatch):
+    results = []
+    for vectorized in (False, True):
+        with TriageAgent(cluster_factory().client(), vectorized_scoring=vectorized) as agent:
+            batches = []
+            score_batch = agent._score_batch
+            monkeypatch.setattr(agent, "_score_batch", lambda t, c: batches.append(len(t)) or score_batch(t, c))
+            results.append(agent.triage_batch([dict(t) for t in open_tickets[:20]]))
+            assert batches == ([20] if vectorized else [])
+
+    scalar, vectorized = results
+    assert [r["triage_decision"] for r in vectorized] == [r["triage_decision"] for r in scalar]
@@ -0,0 +1,60 @@
+import json
+
+from es_config.bulk_loader import data_file, iter_json_documents, loader_options, stream_bulk_index
+from tests.fake_elasticsearch import FakeCluster
+
+DOCS = [
+    {"ticket_id": f"TICK-{i}", "subject": f"Brackets ] and , commas {i}", "description": "line\nbreak \"quoted\" }"}
+    for i in range(40)
+]
+
+def test_streams_json_arrays_and_ndjson_in_small_reads(tmp_path):
+    array_path = tmp_path / "tickets.json"
+    array_path.write_text(json.dumps(DOCS, indent=2))
+    ndjson_path = tmp_path / "tickets.ndjson"
+    ndjson_path.write_text("\n".join(json.dumps(doc) for doc in DOCS) + "\n\n")
+
+    assert list(iter_json_documents(str(array_path), read_size=37)) == DOCS
+    assert list(iter_json_documents(str(ndjson_path), read_size=37)) == DOCS
+    assert data_file(str(tmp_path), "tickets") == str(ndjson_path)
+    assert data_file(str(tmp_path), "customers").endswith("customers.json")
+
+def test_parallel_load_disables_refresh_and_replicas_then_restores_them():
+    cluster = FakeCluster()
+    cluster.indices["support_tickets"] = {}
+    cluster.settings["support_tickets"] = {"index.refresh_interval": "5s", "index.number_of_replicas": "1"}
+    seen_settings = []
+
+    def docs():
+        for doc in DOCS:
+            seen_settings.append(dict(cluster.settings["support_tickets"]))
+            yield doc
+
+    stats = stream_bulk_index(cluster.client(), "support_tickets", docs(), "ticket_id",
+                              thread_count=3, chunk_size=7, max_chunk_bytes=2048)
+
+    assert stats["indexed"] == len(DOCS) and stats["failed"] == 0
+    assert stats["docs_per_sec"] > 0
+    assert set(cluster.indices["support_tickets"]) == {d["ticket_id"] for d in DOCS}
+    assert all(s == {"index.refresh_interval": "-1", "index.number_of_replicas": "0"} for s in seen_settings)
+    assert cluster.settings["support_tickets"] == {"index.refresh_interval": "5s", "index.number_of_replicas": "1"}
+    assert cluster.request_count(path_pattern=r"_bulk$") > 1
+
+def test_failed_documents_are_counted_and_settings_reset_to_defaults():
+    cluster = FakeCluster()
+    cluster.indices["support_tickets"] = {}
+    cluster.fail("BULK", r"TICK-1\d$")
+
+    stats = stream_bulk_index(cluster.client(), "support_tickets", iter(DOCS), "ticket_id", chunk_size=10)
+
+    assert stats["failed"] == 10
+    assert stats["indexed"] == len(DOCS) - 10
+    assert cluster.settings["support_tickets"] == {}
+
+def test_loader_options_from_environment(monkeypatch):
+    monkeypatch.setenv("ES_BULK_THREADS", "8")
+    monkeypatch.setenv("ES_BULK_CHUNK_BYTES", "1048576")
+
+    options = loader_options(queue_size=2)
+
+    assert options == {"thread_count": 8, "chunk_size": 500, "max_chunk_bytes": 1048576, "queue_size": 2}
@@ -0,0 +1,124 @@
+import time
+
+import pytest
+
+from agent.bulk_writer import WorkflowWriteBuffer, bulk_item_error
+from agent.triage_agent import TriageAgent
+
+def test_buffer_flushes_when_full(es, fake_cluster):
+    buffer = WorkflowWriteBuffer(es, max_actions=3, flush_interval=0)
+    outcomes = []
+
+    for i in range(3):
+        buffer.add({"_index": "agent_actions", "_id": f"a{i}", "_source": {"n": i}},
+                   callback=lambda ok, item: outcomes.append(ok))
+
+    assert outcomes == [True, True, True]
+    assert fake_cluster.request_count(path_pattern="_bulk") == 1
+    assert buffer.pending() == 0
+    buffer.close()
+
+def test_buffer_flushes_on_time_bound(es, fake_cluster):
+    buffer = WorkflowWriteBuffer(es, max_actions=100, flush_interval=0.02)
+    buffer.add({"_index": "agent_actions", "_id": "a1", "_source": {"n": 1}})
+
+    deadline = time.monotonic() + 1
+    while buffer.pending() and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert "a1" in fake_cluster.indices["agent_actions"]
+    buffer.close()
+
+def test_buffer_flushes_on_close(es, fake_cluster):
+    buffer = WorkflowWriteBuffer(es, max_actions=100, flush_interval=0)
+    buffer.add({"_index": "agent_actions", "_id": "a1", "_source": {"n": 1}})
+    buffer.close()
+
+    assert "a1" in fake_cluster.indices["agent_actions"]
+    with pytest.raises(RuntimeError):
+        buffer.add({"_index": "agent_actions", "_id": "a2", "_source": {}})
+
+def test_buffer_reports_per_item_failures(es):
+    buffer = WorkflowWriteBuffer(es, max_actions=100, flush_interval=0)
+    outcomes = {}
+
+    buffer.add({"_op_type": "update", "_index": "support_tickets", "_id": "TICK-00001", "doc": {"status": "in_progress"}},
+               callback=lambda ok, item: outcomes.setdefault("existing", (ok, item)))
+    buffer.add({"_op_type": "update", "_index": "support_tickets", "_id": "TICK-MISSING", "doc": {"status": "in_progress"}},
+               callback=lambda ok, item: outcomes.setdefault("missing", (ok, item)))
+
+    assert buffer.flush() == (1, 1)
+    assert outcomes["existing"][0] is True
+    assert outcomes["missing"][0] is False
+    assert "document_missing_exception" in bulk_item_error(outcomes["missing"][1])
+    buffer.close()
+
+def test_buffer_requires_document_ids(es):
+    buffer = WorkflowWriteBuffer(es, flush_interval=0)
+    with pytest.raises(ValueError):
+        buffer.add({"_index": "agent_actions", "_source": {}})
+    buffer.close()
+
+def test_triage_batch_writes_through_one_bulk_request(es, fake_cluster, open_tickets):
+    with WorkflowWriteBuffer(es, max_actions=100, flush_interval=0) as buffer:
+        agent = TriageAgent(es, write_buffer=buffer)
+        tickets = open_tickets[:5]
+        results = agent.triage_batch(tickets, max_workers=5)
+
+    assert fake_cluster.request_count(path_pattern="_update") == 0
+    assert fake_cluster.request_count(path_pattern="^/agent_actions/_doc") == 0
+    assert fake_cluster.request_count(path_pattern="_bulk") == 1
+    assert all(r['workflow_result']['writes'] == {'ticket_update': 'written', 'audit_log': 'written'} for r in results)
+    assert all(r['workflow_result']['status'] == 'success' and 'write_errors' not in r['workflow_result'] for r in results)
+    assert all(fake_cluster.indices["support_tickets"][t['ticket_id']]['status'] == 'in_progress' for t in tickets)
+    assert len(fake_cluster.indices["agent_actions"]) == 5
+
+def test_triage_batch_reports_failed_bulk_items(es, fake_cluster, open_tickets):
+    tickets = open_tickets[:2]
+    fake_cluster.fail("BULK", f"^/support_tickets/{tickets[0]['ticket_id']}$", status=409)
+
+    with WorkflowWriteBuffer(es, flush_interval=0) as buffer:
+        results = TriageAgent(es, write_buffer=buffer).triage_batch(tickets)
+
+    failed = results[0]['workflow_result']
+    assert failed['writes']['ticket_update'] == 'failed'
+    assert failed['status'] == 'failed' and "fake_failure" in failed['write_errors']['ticket_update']
+    assert any(a.startswith("Failed to update ticket") for a in failed['actions_taken'])
+    assert results[1]['workflow_result']['writes']['ticket_update'] == 'written'
+    assert results[1]['workflow_result']['status'] == 'success'
+
+def test_failed_audit_write_marks_the_workflow_partial(es, fake_cluster, open_tickets):
+    fake_cluster.fail("BULK", "^/agent_actions/", status=429)
+
+    with WorkflowWriteBuffer(es, flush_interval=0, max_retries=0) as buffer:
+        result, = TriageAgent(es, write_buffer=buffer).triage_batch(open_tickets[:1])
+
+    workflow = result['workflow_result']
+    assert workflow['writes'] == {'ticket_update': 'written', 'audit_log': 'failed'}
+    assert workflow['status'] == 'partial' and set(workflow['write_errors']) == {'audit_log'}
+
+def test_direct_update_failure_is_reported(es, fake_cluster, open_tickets):
+    fake_cluster.fail("POST", "^/support_tickets/_update/")
+
+    result = TriageAgent(es).triage_ticket(dict(open_tickets[0]))
+
+    assert result['workflow_result']['status'] == 'failed'
+    assert set(result['workflow_result']['write_errors']) == {'ticket_update'}
+
+def test_repeated_ids_in_one_flush_get_their_own_outcome(es, fake_cluster):
+    buffer = WorkflowWriteBuffer(es, max_actions=100, flush_interval=0)
+    outcomes = []
+
+    for status in ("in_progress", "resolved"):
+        buffer.add({"_op_type": "update", "_index": "support_tickets", "_id": "TICK-00001", "doc": {"status": status}},
+                   callback=lambda ok, item, status=status: outcomes.append((status, ok)))
+    buffer.add({"_op_type": "update", "_index": "support_tickets", "_id": "TICK-MISSING", "doc": {}},
+               callback=lambda ok, item: outcomes.append(("missing", ok)))
+
+    assert buffer.flush() == (2, 1)
+    assert sorted(outcomes) == [("in_progress", True), ("missing", False), ("resolved", True)]
+    assert fake_cluster.indices["support_tickets"]["TICK-00001"]["status"] == "resolved"
+    buffer.close()
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
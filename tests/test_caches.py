@@ -0,0 +1,178 @@
+import time
+
+import pytest
+
+from agent.caches import CustomerContextCache, TeamWorkloadSnapshot
+from agent.triage_agent import TriageAgent
+
+class CountingLoader:
+
+    def __init__(self, workload):
+        self.workload = workload
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return dict(self.workload)
+
+def test_workload_snapshot_serves_cached_value_within_ttl():
+    loader = CountingLoader({"engineering": 3})
+    snapshot = TeamWorkloadSnapshot(loader, ttl_seconds=60, refresh_ahead_seconds=0)
+
+    assert snapshot.get() == {"engineering": 3}
+    loader.workload = {"engineering": 9}
+    assert snapshot.get() == {"engineering": 3}
+    assert loader.calls == 1
+
+def test_workload_snapshot_reloads_after_ttl():
+    loader = CountingLoader({"billing": 1})
+    snapshot = TeamWorkloadSnapshot(loader, ttl_seconds=0.05, refresh_ahead_seconds=0)
+
+    snapshot.get()
+    loader.workload = {"billing": 2}
+    time.sleep(0.06)
+
+    assert snapshot.get() == {"billing": 2}
+    assert loader.calls == 2
+
+def test_workload_snapshot_refreshes_ahead_in_background():
+    loader = CountingLoader({"product": 1})
+    snapshot = TeamWorkloadSnapshot(loader, ttl_seconds=0.2, refresh_ahead_seconds=0.15)
+    snapshot.get()
+
+    time.sleep(0.06)
+    loader.workload = {"product": 5}
+    assert snapshot.get() == {"product": 1}
+
+    deadline = time.monotonic() + 1
+    while snapshot.load_count < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert snapshot.get() == {"product": 5}
+
+def test_workload_snapshot_ttl_zero_always_reloads():
+    loader = CountingLoader({"success": 4})
+    snapshot = TeamWorkloadSnapshot(loader, ttl_seconds=0)
+
+    snapshot.get()
+    snapshot.get()
+
+    assert loader.calls == 2
+
+def test_workload_snapshot_records_transitions_out_of_open():
+    snapshot = TeamWorkloadSnapshot(CountingLoader({"engineering": 2, "billing": 1}), ttl_seconds=60)
+    snapshot.get()
+
+    snapshot.record_transition("engineering", "open", "billing", "in_progress")
+    snapshot.record_transition("billing", "open", "billing", "in_progress")
+    snapshot.record_transition(None, "in_progress", "success", "open")
+
+    assert snapshot.get() == {"engineering": 1, "success": 1}
+
+def test_workload_snapshot_keeps_stale_value_when_loader_fails():
+    loader = CountingLoader({"engineering": 2})
+    snapshot = TeamWorkloadSnapshot(loader, ttl_seconds=0)
+    snapshot.get()
+
+    def failing():
+        raise ConnectionError("cluster unavailable")
+
+    snapshot._loader = failing
+    assert snapshot.get() == {"engineering": 2}
+
+def test_agent_shares_one_workload_aggregation_across_batch(es, fake_cluster, open_tickets):
+    agent = TriageAgent(es, workload_ttl=60)
+
+    results = agent.triage_batch(open_tickets[:10], max_workers=4)
+
+    assert all(r['analysis']['team_workload'] for r in results)
+    assert agent.workload.load_count == 1
+
+def test_agent_updates_workload_when_assigning(es, open_tickets):
+    agent = TriageAgent(es, workload_ttl=60)
+    before = agent._get_team_workload()
+    ticket = open_tickets[0]
+
+    agent.triage_ticket(ticket)
+
+    after = agent._get_team_workload()
+    assert after.get(ticket['assigned_team'], 0) == before[ticket['assigned_team']] - 1
+
+def test_customer_cache_counts_hits_and_misses():
+    cache = CustomerContextCache(max_entries=4, ttl_seconds=60)
+
+    assert cache.get("CUST-0001") is None
+    cache.put("CUST-0001", {"plan": "pro"}, [{"ticket_id": "TICK-00001"}])
+
+    assert cache.get("CUST-0001") == {"profile": {"plan": "pro"}, "past_tickets": [{"ticket_id": "TICK-00001"}]}
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["size"]) == (1, 1, 1)
+
+def test_customer_cache_evicts_least_recently_used():
+    cache = CustomerContextCache(max_entries=2, ttl_seconds=60)
+    cache.put("A", {"plan": "free"}, [])
+    cache.put("B", {"plan": "free"}, [])
+    cache.get("A")
+    cache.put("C", {"plan": "free"}, [])
+
+    assert cache.get("B") is None
+    assert cache.get("A") is not None
+    assert cache.stats()["evictions"] == 1
+
+def test_customer_cache_expires_entries():
+    cache = CustomerContextCache(ttl_seconds=0.02)
+    cache.put("A", {"plan": "enterprise"}, [])
+    time.sleep(0.03)
+
+    assert cache.get("A") is None
+
+def test_customer_cache_ticket_invalidation_keeps_profile_until_ttl():
+    cache = CustomerContextCache(ttl_seconds=60)
+    cache.put("A", {"plan": "business"}, [{"ticket_id": "T1"}])
+
+    cache.invalidate("A", tickets_only=True)
+    assert cache.get("A") == {"profile": {"plan": "business"}, "past_tickets": None}
+
+    cache.update_tickets("A", [{"ticket_id": "T2"}])
+    assert cache.get("A")["past_tickets"] == [{"ticket_id": "T2"}]
+
+    cache.invalidate("A")
+    assert cache.get("A") is None
+
+def test_agent_reuses_cached_customer_profile(es, fake_cluster, open_tickets):
+    agent = TriageAgent(es)
+    ticket = open_tickets[0]
+    repeat = dict(open_tickets[1], customer_id=ticket['customer_id'])
+
+    agent.triage_ticket(ticket)
+    fake_cluster.requests.clear()
+    result = agent.triage_ticket(repeat)
+
+    assert fake_cluster.request_count("GET", "^/customers/") == 0
+    assert fake_cluster.request_count("POST", "^/support_tickets/_search") == 2
+    assert result['context']['customer_history']['customer_id'] == ticket['customer_id']
+    assert agent.customer_cache.stats()["partial_hits"] == 1
+
+def test_agent_invalidates_customer_tickets_after_workflow_write(es, open_tickets):
+    agent = TriageAgent(es)
+    ticket = open_tickets[0]
+
+    agent.triage_ticket(ticket)
+    cached = agent.customer_cache.get(ticket['customer_id'])
+
+    assert cached["profile"]["customer_id"] == ticket['customer_id']
+    assert cached["past_tickets"] is None
+
+def test_msearch_skips_cached_customer_lookups(es, fake_cluster, open_tickets):
+    agent = TriageAgent(es, use_msearch=True)
+    ticket = open_tickets[0]
+    agent._search_for_context(ticket, agent._analyze_content(ticket))
+
+    fake_cluster.requests.clear()
+    context = agent._search_for_context(ticket, agent._analyze_content(ticket))
+
+    assert fake_cluster.requests == [("POST", "/_msearch")]
+    assert agent.customer_cache.stats()["hits"] == 1
+    assert context['customer_history']['total_tickets'] > 0
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
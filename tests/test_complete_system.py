@@ -1,11 +1,11 @@
 import os
 import sys
 from datetime import datetime
-from elasticsearch import Elasticsearch
 from dotenv import load_dotenv
 
 sys.path.insert(0, 'src')
 from agent.triage_agent import TriageAgent
+from es_config.client import get_client
 
 load_dotenv()
 
@@ -32,27 +32,14 @@ class SystemTester:
         print("="*60)
         
         try:
-            if os.getenv('ELASTICSEARCH_URL'):
-                if os.getenv('ELASTIC_API_KEY'):
-                    self.es = Elasticsearch(
-                        os.getenv('ELASTICSEARCH_URL'),
-                        api_key=os.getenv('ELASTIC_API_KEY'),
-                        verify_certs=True
-                    )
-                else:
-                    password = os.getenv('ELASTIC_PASSWORD')
-                    if not password:
-                        self.log_test("Elasticsearch Connection", False, "Missing ELASTIC_PASSWORD")
-                        return False
-                    self.es = Elasticsearch(
-                        os.getenv('ELASTICSEARCH_URL'),
-                        basic_auth=(os.getenv('ELASTIC_USERNAME', 'elastic'), password),
-                        verify_certs=True
-                    )
-            else:
+            if not os.getenv('ELASTICSEARCH_URL'):
                 self.log_test("Elasticsearch Connection", False, "Missing ELASTICSEARCH_URL")
                 return False
-            
+            if not os.getenv('ELASTIC_API_KEY') and not os.getenv('ELASTIC_PASSWORD'):
+                self.log_test("Elasticsearch Connection", False, "Missing ELASTIC_PASSWORD")
+                return False
+            self.es = get_client()
+
             if self.es.ping():
                 cluster_info = self.es.info()
                 self.log_test("Elasticsearch Connection", True, 
@@ -284,16 +271,13 @@ class SystemTester:
             
             results = []
             for ticket in tickets:
-                start = datetime.now()
                 result = self.agent.triage_ticket(ticket)
-                end = datetime.now()
-                processing_time = (end - start).total_seconds() * 1000
                 
                 results.append({
-: ticket['ticket_id'],
-: processing_time,
-: result['triage_decision']['category'],
-: result['triage_decision']['confidence']
+                    "ticket_id": ticket['ticket_id'],
+                    "processing_time": result['processing_time_ms'],
+                    "category": result['triage_decision']['category'],
+                    "confidence": result['triage_decision']['confidence']
                 })
             
             avg_time = sum(r['processing_time'] for r in results) / len(results)
@@ -325,10 +309,7 @@ class SystemTester:
             
             times = []
             for ticket in tickets:
-                start = datetime.now()
-                self.agent.triage_ticket(ticket)
-                end = datetime.now()
-                times.append((end - start).total_seconds() * 1000)
+                times.append(self.agent.triage_ticket(ticket)['timings']['total'])
             
             avg_time = sum(times) / len(times)
             max_time = max(times)
@@ -357,23 +338,23 @@ class SystemTester:
         try:
                                          
             incomplete_ticket = {
-: "TEST-INCOMPLETE",
-: "open"
+                "ticket_id": "TEST-INCOMPLETE",
+                "status": "open"
             }
             result = self.agent.triage_ticket(incomplete_ticket)
             self.log_test("Error Handling - Incomplete Data", True,
-)
+                        f"Handled ticket with missing fields -> {result['triage_decision']['category']}")
             
             invalid_ticket = {
-: "TEST-INVALID",
-: "Test",
-: "Test",
-: "NONEXISTENT",
-: "open"
+                "ticket_id": "TEST-INVALID",
+                "subject": "Test",
+                "description": "Test",
+                "customer_id": "NONEXISTENT",
+                "status": "open"
             }
             result = self.agent.triage_ticket(invalid_ticket)
             self.log_test("Error Handling - Invalid Customer", True,
-)
+                        f"Handled unknown customer -> {result['triage_decision']['category']}")
             
             return True
         except Exception as e:
@@ -0,0 +1,105 @@
+import numpy as np
+import pytest
+
+from agent.embeddings import (KB_TEXT_FIELDS, KB_VECTOR_FIELD, TICKET_TEXT_FIELDS, TICKET_VECTOR_FIELD,
+                              HashingEmbedder, embed_documents, load_embedder)
+from agent.triage_agent import TriageAgent
+from es_config.setup_indices import TICKET_MAPPING, with_vector_field
+from tests.fake_elasticsearch import FakeCluster
+
+class CountingEmbedder(HashingEmbedder):
+
+    def __init__(self, dims: int = 64):
+        super().__init__(dims=dims)
+        self.calls = 0
+        self.texts = 0
+
+    def encode(self, texts):
+        self.calls += 1
+        self.texts += len(texts)
+        return super().encode(texts)
+
+@pytest.fixture
+def embedder():
+    return CountingEmbedder()
+
+@pytest.fixture
+def vector_cluster(support_data, embedder):
+    cluster = FakeCluster()
+    cluster.add_documents("customers", support_data["customers"], "customer_id")
+    cluster.add_documents("support_tickets", list(embed_documents(
+        support_data["tickets"], embedder, TICKET_TEXT_FIELDS, TICKET_VECTOR_FIELD, batch_size=32)), "ticket_id")
+    cluster.add_documents("knowledge_base", list(embed_documents(
+        support_data["kb_articles"], embedder, KB_TEXT_FIELDS, KB_VECTOR_FIELD)), "article_id")
+    cluster.indices.setdefault("agent_actions", {})
+    embedder.calls = 0
+    embedder.texts = 0
+    return cluster
+
+def test_hashing_embedder_produces_normalized_deterministic_vectors():
+    embedder = HashingEmbedder(dims=128)
+    vectors = embedder.encode(["Cannot login to account", "cannot LOGIN to account!", "Refund for duplicate charge", ""])
+
+    assert vectors.shape == (4, 128)
+    assert vectors.dtype == np.float32
+    np.testing.assert_allclose(np.linalg.norm(vectors[:3], axis=1), 1.0, rtol=1e-5)
+    assert not vectors[3].any()
+    np.testing.assert_array_equal(vectors[0], vectors[1])
+    assert vectors[0] @ vectors[1] > vectors[0] @ vectors[2]
+
+def test_embed_documents_encodes_in_batches(support_data, embedder):
+    docs = list(embed_documents(support_data["tickets"], embedder, TICKET_TEXT_FIELDS, TICKET_VECTOR_FIELD,
+                                batch_size=50))
+
+    assert len(docs) == len(support_data["tickets"])
+    assert embedder.calls == 3
+    assert len(docs[0][TICKET_VECTOR_FIELD]) == embedder.dims
+    assert TICKET_VECTOR_FIELD not in support_data["tickets"][0]
+
+def test_load_embedder_from_environment(monkeypatch):
+    monkeypatch.setenv("TRIAGE_EMBEDDER", "none")
+    assert load_embedder() is None
+    monkeypatch.setenv("TRIAGE_EMBEDDER", "hashing")
+    assert isinstance(load_embedder(), HashingEmbedder)
+    with pytest.raises(ValueError):
+        load_embedder("word2vec")
+
+def test_vector_field_is_mapped_only_for_a_configured_embedder(embedder):
+    assert with_vector_field(TICKET_MAPPING, TICKET_VECTOR_FIELD) is TICKET_MAPPING
+    assert TICKET_VECTOR_FIELD not in TICKET_MAPPING["properties"]
+
+    mapping = with_vector_field(TICKET_MAPPING, TICKET_VECTOR_FIELD, embedder)
+
+    assert mapping["properties"][TICKET_VECTOR_FIELD]["dims"] == embedder.dims == 64
+    assert TICKET_VECTOR_FIELD not in TICKET_MAPPING["properties"]
+
+def test_knn_mode_finds_resolved_tickets_without_returning_vectors(vector_cluster, support_data, embedder):
+    es = vector_cluster.client()
+    resolved = next(t for t in support_data["tickets"] if t["status"] == "resolved")
+    ticket = {"ticket_id": "NEW-1", "subject": resolved["subject"], "description": resolved["description"],
+              "status": "open"}
+
+    agent = TriageAgent(es, embedder=embedder)
+    query = agent._similar_tickets_query(ticket)
+    assert query["knn"]["field"] == TICKET_VECTOR_FIELD
+    assert query["knn"]["filter"] == {"term": {"status": "resolved"}}
+
+    similar = agent._search_similar_tickets(ticket)
+    resolved_ids = {t["ticket_id"] for t in support_data["tickets"] if t["status"] == "resolved"}
+    assert similar and all(s["ticket_id"] in resolved_ids for s in similar)
+    assert similar[0]["subject"] == resolved["subject"]
+
+    response = es.search(index="support_tickets", body=query)
+    assert all(TICKET_VECTOR_FIELD not in hit["_source"] for hit in response["hits"]["hits"])
+
+    result = agent.triage_ticket(dict(ticket))
+    assert result["triage_decision"]["category"] == resolved["category"]
+    assert "embedding" in result["timings"]
+
+def test_msearch_batch_encodes_all_tickets_in_one_call(vector_cluster, open_tickets, embedder):
+    with TriageAgent(vector_cluster.client(), use_msearch=True, msearch_batch_size=50, embedder=embedder) as agent:
+        results = agent.triage_batch(open_tickets[:20])
+
+    assert all("error" not in r for r in results)
+    assert embedder.calls == 1
+    assert embedder.texts == 20
@@ -0,0 +1,70 @@
+import pytest
+
+from es_config import client as es_client
+
+@pytest.fixture(autouse=True)
+def clean_env(monkeypatch):
+    for name in ("ELASTICSEARCH_URL", "ELASTIC_API_KEY", "ELASTIC_USERNAME", "ELASTIC_PASSWORD",
+                 "ELASTIC_CLOUD_ID", "ES_CONNECTIONS_PER_NODE", "ES_HTTP_COMPRESS", "ES_REQUEST_TIMEOUT",
+                 "ES_MAX_RETRIES", "ES_RETRY_ON_TIMEOUT"):
+        monkeypatch.delenv(name, raising=False)
+    es_client.close_client()
+    yield
+    es_client.close_client()
+
+def test_client_options_defaults_and_env_overrides(monkeypatch):
+    options = es_client.client_options()
+    assert options["connections_per_node"] == 32
+    assert options["http_compress"] is True
+    assert options["retry_on_timeout"] is True
+
+    monkeypatch.setenv("ES_CONNECTIONS_PER_NODE", "64")
+    monkeypatch.setenv("ES_HTTP_COMPRESS", "false")
+    monkeypatch.setenv("ES_REQUEST_TIMEOUT", "5")
+    options = es_client.client_options(max_retries=1)
+    assert options["connections_per_node"] == 64
+    assert options["http_compress"] is False
+    assert options["request_timeout"] == 5.0
+    assert options["max_retries"] == 1
+
+def test_connection_settings_follow_configured_auth(monkeypatch):
+    with pytest.raises(ValueError):
+        es_client.connection_settings()
+
+    monkeypatch.setenv("ELASTICSEARCH_URL", "http://localhost:9200")
+    with pytest.raises(ValueError):
+        es_client.connection_settings()
+
+    monkeypatch.setenv("ELASTIC_PASSWORD", "secret")
+    assert es_client.connection_settings()["basic_auth"] == ("elastic", "secret")
+
+    monkeypatch.setenv("ELASTIC_API_KEY", "key")
+    settings = es_client.connection_settings()
+    assert settings["api_key"] == "key"
+    assert "basic_auth" not in settings
+
+def test_get_client_returns_one_tuned_process_wide_client(monkeypatch):
+    monkeypatch.setenv("ELASTICSEARCH_URL", "http://localhost:9200")
+    monkeypatch.setenv("ELASTIC_API_KEY", "key")
+    monkeypatch.setenv("ES_MAX_RETRIES", "5")
+
+    es = es_client.get_client()
+    assert es_client.get_client() is es
+    assert es._max_retries == 5
+    assert es._retry_on_timeout is True
+    node = es.transport.node_pool.get()
+    assert node.config.connections_per_node == 32
+    assert node.config.http_compress is True
+
+    es_client.close_client()
+    assert es_client.get_client() is not es
+
+def test_get_client_rejects_conflicting_overrides(monkeypatch):
+    monkeypatch.setenv("ELASTICSEARCH_URL", "http://localhost:9200")
+    monkeypatch.setenv("ELASTIC_API_KEY", "key")
+
+    es = es_client.get_client(connections_per_node=64)
+    assert es_client.get_client() is es
+    assert es_client.get_client(connections_per_node=64) is es
+    with pytest.raises(ValueError):
+        es_client.get_client(connections_per_node=8)
@@ -0,0 +1,84 @@
+from agent.esql_analytics import EsqlAnalytics
+from agent.triage_agent import TriageAgent
+
+def test_query_is_parameterized_with_in_lists():
+    analytics = EsqlAnalytics(None)
+
+    query, params = analytics.build_query(['Refund "now" | DROP'], ["CUST-0001", "CUST-0002"])
+
+    assert "DROP" not in query
+    assert "subject.keyword IN (?s0)" in query
+    assert "customer_id IN (?c0, ?c1)" in query
+    assert {"s0": 'Refund "now" | DROP'} in params and {"c1": "CUST-0002"} in params
+
+def test_batch_stats_match_python_aggregations(es, support_data, open_tickets):
+    tickets = open_tickets[:8]
+    stats = EsqlAnalytics(es).batch_stats(tickets)
+
+    all_tickets = support_data["tickets"]
+    assert all("team_workload" not in ticket_stats for ticket_stats in stats)
+    for ticket, ticket_stats in zip(tickets, stats):
+        resolved = [t["category"] for t in all_tickets if t["status"] == "resolved" and t["subject"] == ticket["subject"]]
+        assert ticket_stats["category_votes"] == {c: resolved.count(c) for c in set(resolved)}
+        assert list(ticket_stats["category_votes"].values()) == sorted(ticket_stats["category_votes"].values(),
+                                                                       reverse=True)
+        owned = [t for t in all_tickets if t["customer_id"] == ticket["customer_id"]]
+        assert ticket_stats["customer"] == {"total_tickets": len(owned),
+                                            "open_tickets": sum(1 for t in owned if t["status"] == "open")}
+
+def test_batch_mode_runs_one_esql_query_and_skips_voted_similar_searches(es, fake_cluster, open_tickets):
+    tickets = open_tickets[:10]
+    analytics = EsqlAnalytics(es)
+
+    with TriageAgent(es, use_msearch=True, esql_analytics=analytics) as agent:
+        results = agent.triage_batch(tickets)
+
+    assert analytics.queries == 1
+    assert agent.workload.load_count == 1
+    assert fake_cluster.request_count("POST", r"support_tickets/_search") == 1
+    voted = [r for r in results if r["analysis"]["category_source"] == "esql"]
+    assert voted and all(r["context"]["similar_tickets_found"] == 0 for r in voted)
+    assert all(0 < r["analysis"]["category_confidence"] <= 1 for r in voted)
+    assert all("open_tickets" in r["context"]["customer_history"] for r in results)
+
+def test_single_ticket_path_skips_esql_and_uses_the_workload_snapshot(es, open_tickets):
+    analytics = EsqlAnalytics(es)
+    agent = TriageAgent(es, esql_analytics=analytics)
+    workload = agent._fetch_team_workload()
+
+    results = [agent.triage_ticket(dict(ticket)) for ticket in open_tickets[:3]]
+
+    assert analytics.queries == 0
+    assert all("esql" not in r["timings"] for r in results)
+    assert results[0]["analysis"]["team_workload"] == workload
+    assert agent.workload.load_count == 1
+
+def test_single_ticket_msearch_path_skips_esql(es, open_tickets):
+    analytics = EsqlAnalytics(es)
+
+    with TriageAgent(es, use_msearch=True, esql_analytics=analytics) as agent:
+        result = agent.triage_ticket(dict(open_tickets[0]))
+
+    assert analytics.queries == 0
+    assert "esql" not in result["timings"] and result["analysis"]["category_source"] != "esql"
+
+def test_truncated_results_fall_back_to_python(es, open_tickets, caplog):
+    analytics = EsqlAnalytics(es, max_rows=2)
+
+    assert analytics.batch_stats(open_tickets[:8]) is None
+    assert analytics.available and "LIMIT" in caplog.text
+
+def test_falls_back_to_python_when_esql_is_unavailable(cluster_factory, open_tickets):
+    baseline = cluster_factory()
+    with TriageAgent(baseline.client(), use_msearch=True) as agent:
+        expected = agent.triage_batch([dict(t) for t in open_tickets[:10]])
+
+    cluster = cluster_factory()
+    cluster.fail("POST", r"^/_query", status=404)
+    analytics = EsqlAnalytics(cluster.client())
+    with TriageAgent(cluster.client(), use_msearch=True, esql_analytics=analytics) as agent:
+        results = agent.triage_batch([dict(t) for t in open_tickets[:10]])
+
+    assert not analytics.available
+    assert cluster.request_count("POST", r"^/_query") == 1
+    assert [r["triage_decision"] for r in results] == [r["triage_decision"] for r in expected]
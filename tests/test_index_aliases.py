@@ -0,0 +1,121 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from es_config.aliases import alias_targets, ensure_alias, rebuild_alias
+from es_config.setup_indices import AGENT_ACTION_MAPPING, TICKET_MAPPING
+from tests.fake_elasticsearch import FakeCluster
+
+def now():
+    return datetime.now(timezone.utc).isoformat()
+
+def _loader(es, docs, during_load=None):
+    def load(index):
+        for doc in docs:
+            es.index(index=index, id=doc["ticket_id"], document=doc)
+        if during_load:
+            during_load(index)
+        return len(docs)
+    return load
+
+def test_first_rebuild_replaces_a_legacy_concrete_index(support_data):
+    cluster = FakeCluster()
+    cluster.add_documents("support_tickets", support_data["tickets"][:5], "ticket_id")
+    es = cluster.client()
+
+    result = rebuild_alias(es, "support_tickets", TICKET_MAPPING, _loader(es, support_data["tickets"]))
+
+    assert alias_targets(es, "support_tickets") == [result["index"]]
+    assert result["index"].startswith("support_tickets-v") and result["loaded"] == len(support_data["tickets"])
+    assert "support_tickets" not in cluster.indices
+    assert es.count(index="support_tickets")["count"] == len(support_data["tickets"])
+
+def test_searches_see_the_old_index_until_the_swap(support_data):
+    cluster = FakeCluster()
+    es = cluster.client()
+    old = support_data["tickets"][:30]
+    rebuild_alias(es, "support_tickets", TICKET_MAPPING, _loader(es, old))
+    counts_during_load = []
+
+    def observe(index):
+        counts_during_load.append(es.count(index="support_tickets")["count"])
+
+    result = rebuild_alias(es, "support_tickets", TICKET_MAPPING,
+                           _loader(es, support_data["tickets"], observe))
+
+    assert counts_during_load == [len(old)]
+    assert es.count(index="support_tickets")["count"] == len(support_data["tickets"])
+    assert result["retired"] == [] and len(cluster.indices) == 2
+
+def test_updates_written_during_the_load_are_carried_over(support_data):
+    cluster = FakeCluster()
+    es = cluster.client()
+    tickets = support_data["tickets"][:20]
+    rebuild_alias(es, "support_tickets", TICKET_MAPPING, _loader(es, tickets))
+
+    def agent_writes(index):
+        es.update(index="support_tickets", id=tickets[0]["ticket_id"],
+                  doc={"status": "in_progress", "updated_at": now()})
+
+    result = rebuild_alias(es, "support_tickets", TICKET_MAPPING, _loader(es, tickets, agent_writes))
+
+    assert result["caught_up"] == 1
+    assert es.get(index="support_tickets", id=tickets[0]["ticket_id"])["_source"]["status"] == "in_progress"
+
+def test_changes_after_the_forcemerge_and_deletes_reach_the_new_index(support_data, monkeypatch):
+    cluster = FakeCluster()
+    es = cluster.client()
+    tickets = support_data["tickets"][:20]
+    rebuild_alias(es, "support_tickets", TICKET_MAPPING, _loader(es, tickets))
+
+    def agent_deletes(index):
+        es.delete(index=alias_targets(es, "support_tickets")[0], id=tickets[1]["ticket_id"])
+
+    from es_config import aliases
+    finalize = aliases.finalize_index
+
+    def write_during_forcemerge(es_client, index, max_num_segments=1):
+        finalize(es_client, index, max_num_segments)
+        es.update(index="support_tickets", id=tickets[0]["ticket_id"], doc={"status": "in_progress", "updated_at": now()})
+
+    monkeypatch.setattr(aliases, "finalize_index", write_during_forcemerge)
+    result = rebuild_alias(es, "support_tickets", TICKET_MAPPING, _loader(es, tickets, agent_deletes))
+
+    assert result["caught_up"] == 1 and result["deleted"] == 1
+    assert es.get(index="support_tickets", id=tickets[0]["ticket_id"])["_source"]["status"] == "in_progress"
+    assert es.count(index="support_tickets")["count"] == len(tickets) - 1
+    assert cluster.pits == {}
+
+def test_keep_versions_retains_recent_indices_for_rollback(support_data):
+    cluster = FakeCluster()
+    es = cluster.client()
+    load = _loader(es, support_data["tickets"][:3])
+    built = [rebuild_alias(es, "support_tickets", TICKET_MAPPING, load, keep_versions=1)["index"] for _ in range(3)]
+
+    assert alias_targets(es, "support_tickets") == [built[-1]]
+    assert built[0] not in cluster.indices and built[1] in cluster.indices
+
+def test_failed_load_leaves_the_alias_untouched(support_data):
+    cluster = FakeCluster()
+    es = cluster.client()
+    first = rebuild_alias(es, "support_tickets", TICKET_MAPPING, _loader(es, support_data["tickets"][:3]))
+
+    def broken(index):
+        es.index(index=index, id="TICK-X", document={"ticket_id": "TICK-X"})
+        raise RuntimeError("embedding service down")
+
+    with pytest.raises(RuntimeError):
+        rebuild_alias(es, "support_tickets", TICKET_MAPPING, broken)
+
+    assert alias_targets(es, "support_tickets") == [first["index"]]
+    assert sorted(cluster.indices) == [first["index"]]
+
+def test_audit_alias_is_created_once_and_receives_writes():
+    cluster = FakeCluster()
+    es = cluster.client()
+
+    index = ensure_alias(es, "agent_actions", AGENT_ACTION_MAPPING)
+    es.index(index="agent_actions", document={"action_type": "triage"})
+
+    assert ensure_alias(es, "agent_actions", AGENT_ACTION_MAPPING) == index
+    assert len(cluster.indices[index]) == 1
@@ -0,0 +1,51 @@
+import json
+
+import pytest
+
+from es_config.index_profiles import index_profile
+from es_config.setup_indices import AGENT_ACTION_MAPPING, CUSTOMER_MAPPING, TICKET_MAPPING, rebuild_index
+from tests.fake_elasticsearch import FakeCluster
+
+QUERIED_TICKET_FIELDS = ("ticket_id", "customer_id", "status", "category", "priority", "assigned_team",
+                         "created_at", "updated_at")
+
+def test_production_ticket_profile_sorts_and_trims_doc_values():
+    mapping, settings = index_profile("support_tickets", TICKET_MAPPING, "production")
+    properties = mapping["properties"]
+
+    assert settings["index.sort.field"] == ["status", "created_at"]
+    assert settings["index.number_of_shards"] == 1
+    assert properties["assigned_team"]["eager_global_ordinals"] and properties["category"]["eager_global_ordinals"]
+    assert all(properties[field].get("doc_values", True) for field in QUERIED_TICKET_FIELDS)
+    assert properties["subject"]["fields"]["keyword"] == {"type": "keyword"}
+    assert "fields" not in properties["description"]
+    assert properties["customer_email"]["doc_values"] is False
+    assert "fields" in TICKET_MAPPING["properties"]["description"]
+
+def test_default_profile_keeps_mappings_and_cluster_defaults(monkeypatch):
+    monkeypatch.setenv("ES_INDEX_PROFILE", "default")
+
+    assert index_profile("customers", CUSTOMER_MAPPING) == (CUSTOMER_MAPPING, {})
+    with pytest.raises(ValueError):
+        index_profile("customers", CUSTOMER_MAPPING, "fastest")
+
+def test_audit_details_are_mapped_explicitly():
+    mapping, settings = index_profile("agent_actions", AGENT_ACTION_MAPPING, "production")
+
+    details = mapping["properties"]["details"]
+    assert details["dynamic"] is False
+    assert details["properties"]["needs_review"] == {"type": "boolean"}
+    assert settings["index.codec"] == "best_compression"
+
+def test_rebuild_creates_the_index_with_profile_settings(tmp_path, support_data, monkeypatch):
+    monkeypatch.setenv("ES_INDEX_REPLICAS", "2")
+    path = tmp_path / "tickets.json"
+    path.write_text(json.dumps(support_data["tickets"][:10]))
+    cluster = FakeCluster()
+
+    result = rebuild_index(cluster.client(), "support_tickets", TICKET_MAPPING, str(path), "ticket_id")
+
+    settings = cluster.settings[result["index"]]
+    assert settings["index.sort.field"] == ["status", "created_at"]
+    assert settings["index.number_of_replicas"] == "2"
+    assert cluster.mappings[result["index"]]["properties"]["sentiment"]["doc_values"] is False
@@ -0,0 +1,82 @@
+import time
+
+import pytest
+
+from agent.instrumentation import LatencyHistogram, MetricsSink, StageTimer, timed
+from agent.triage_agent import TriageAgent
+
+class RecordingSink(MetricsSink):
+
+    def __init__(self):
+        self.observed = []
+
+    def observe(self, timings):
+        self.observed.append(timings)
+
+def test_stage_timer_accumulates_repeated_stages():
+    timer = StageTimer()
+    with timer.activate():
+        for _ in range(2):
+            with timed("lookup"):
+                time.sleep(0.01)
+
+    assert timer.snapshot()["lookup"] >= 20
+    assert StageTimer.current() is None
+
+def test_timed_is_a_no_op_without_active_timer():
+    with timed("lookup"):
+        pass
+    assert StageTimer.current() is None
+
+def test_latency_histogram_percentiles():
+    histogram = LatencyHistogram()
+    for ms in range(1, 101):
+        histogram.observe({"total": float(ms)})
+
+    stats = histogram.summary()["total"]
+    assert (stats["count"], stats["p50"], stats["p95"], stats["p99"], stats["max"]) == (100, 50.0, 95.0, 99.0, 100.0)
+
+def test_latency_histogram_keeps_a_bounded_window():
+    histogram = LatencyHistogram(window=10)
+    for ms in range(100):
+        histogram.observe({"total": float(ms)})
+
+    stats = histogram.summary()["total"]
+    assert stats["count"] == 100
+    assert stats["p50"] == 94.0
+
+@pytest.mark.parametrize("options", [{}, {"parallel_context": True}])
+def test_triage_result_has_stage_timings(es, open_tickets, options):
+    sink = RecordingSink()
+    with TriageAgent(es, metrics_sink=sink, **options) as agent:
+        result = agent.triage_ticket(open_tickets[0])
+
+    timings = result["timings"]
+    for stage in ("analysis", "context", "similar_tickets", "kb_search", "customer_lookup",
+                  "workload", "scoring", "decision", "workflow", "ticket_update", "audit_log", "total"):
+        assert stage in timings
+    assert timings["total"] >= timings["context"]
+    assert result["processing_time_ms"] == int(timings["total"])
+    assert sink.observed == [timings]
+
+def test_msearch_batch_attributes_shared_context_time(es, open_tickets):
+    agent = TriageAgent(es, use_msearch=True)
+
+    results = agent.triage_batch(open_tickets[:4], max_workers=2)
+
+    assert all("context" in r["timings"] and "similar_tickets" not in r["timings"] for r in results)
+    assert agent.metrics.summary()["total"]["count"] == 4
+
+@pytest.mark.parametrize("options", [{"use_msearch": True}, {"use_msearch": True, "vectorized_scoring": True},
+                                     {"vectorized_scoring": True}])
+def test_precomputed_stages_count_towards_total(es, open_tickets, options):
+    with TriageAgent(es, **options) as agent:
+        results = agent.triage_batch(open_tickets[:4], max_workers=2)
+
+    for result in results:
+        timings = result["timings"]
+        assert timings["total"] >= timings["context"] + timings.get("scoring", 0.0) - 0.01
+        assert result["processing_time_ms"] == int(timings["total"])
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,54 @@
+import random
+
+import pytest
+
+from agent.keyword_matcher import KeywordMatcher
+from agent.triage_agent import CATEGORY_KEYWORDS, NEGATIVE_WORDS, TriageAgent, URGENCY_KEYWORDS
+
+def substring_hits(terms, text):
+    return [term for term in terms if term in text.lower()]
+
+def test_matcher_matches_substring_semantics():
+    matcher = KeywordMatcher({"urgency": URGENCY_KEYWORDS}, scan_threshold=0)
+
+    assert matcher.match("Our Production API is DOWN!!")["urgency"] == ["production", "down"]
+    assert matcher.match("the dashboard was downloaded")["urgency"] == ["down"]
+    assert matcher.match("it's not\nworking")["urgency"] == []
+    assert matcher.match("It is cannot working, got an error_code")["urgency"] == ["not working", "cannot", "error"]
+
+def test_matcher_finds_overlapping_prefix_terms():
+    matcher = KeywordMatcher({"billing": ["charge", "charged", "double charged", "credit card"]}, scan_threshold=0)
+
+    assert matcher.match("we were double charged twice")["billing"] == ["charge", "charged", "double charged"]
+    assert matcher.match("double  charged on my credit card")["billing"] == ["charge", "charged", "credit card"]
+
+@pytest.mark.parametrize("length", [40, 400, 4000])
+def test_matcher_agrees_with_substring_loops_on_random_text(length):
+    vocabularies = {"negative": NEGATIVE_WORDS, "urgency": URGENCY_KEYWORDS, **CATEGORY_KEYWORDS}
+    matcher = KeywordMatcher(vocabularies, scan_threshold=0, token_cache_size=64)
+    terms = [term for group in vocabularies.values() for term in group]
+    filler = ["the", "a", "not", "can", "you", "double", "we", "had", "Data", "LOSS", "\n", "  ", ".", "un"]
+    rng = random.Random(length)
+
+    for _ in range(50):
+        words = rng.choices(terms + filler, k=length // 5)
+        text = "".join(word + rng.choice([" ", "", "  ", "\t", "!"]) for word in words)
+        matches = matcher.match(text)
+        for name, group in vocabularies.items():
+            assert matches[name] == substring_hits(group, text)
+
+def test_agent_analysis_uses_shared_vocabularies(es, support_data):
+    agent = TriageAgent(es)
+
+    for ticket in support_data["tickets"]:
+        text = f"{ticket['subject']} {ticket['description']}"
+        analysis = agent._analyze_content(ticket)
+        assert analysis['urgency_keywords'] == substring_hits(URGENCY_KEYWORDS, text)
+        assert analysis['negative_count'] == len(substring_hits(NEGATIVE_WORDS, text))
+
+        scores = {category: len(substring_hits(keywords, text)) for category, keywords in CATEGORY_KEYWORDS.items()}
+        expected = max(scores.items(), key=lambda x: x[1])[0] if any(scores.values()) else 'technical'
+        assert agent._classify_by_keywords(ticket) == expected
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,114 @@
+import numpy as np
+import pytest
+
+from agent.embeddings import HashingEmbedder
+from agent.local_index import LocalSimilarityIndex, build_local_index, snapshot_resolved_tickets
+from agent.triage_agent import TriageAgent
+
+@pytest.fixture
+def resolved(support_data):
+    return [t for t in support_data["tickets"] if t["status"] == "resolved"]
+
+@pytest.fixture
+def local_index(resolved):
+    return build_local_index(resolved, HashingEmbedder(dims=128), batch_size=7)
+
+def new_ticket(source, ticket_id="NEW-1"):
+    return {"ticket_id": ticket_id, "subject": source["subject"], "description": source["description"], "status": "open"}
+
+def test_search_ranks_matching_resolved_tickets_first(local_index, resolved):
+    hits = local_index.search(new_ticket(resolved[0]), k=5)
+
+    assert len(local_index) == len(resolved)
+    assert len(hits) == 5
+    assert hits[0]["subject"] == resolved[0]["subject"]
+    assert hits[0]["category"] == resolved[0]["category"]
+    assert [h["score"] for h in hits] == sorted((h["score"] for h in hits), reverse=True)
+    assert set(hits[0]) == {"ticket_id", "subject", "category", "priority", "resolution_time", "score"}
+
+def test_batch_search_matches_single_lookups(local_index, resolved):
+    tickets = [new_ticket(t, f"NEW-{i}") for i, t in enumerate(resolved[:6])]
+
+    batch = local_index.search_batch(tickets, k=3)
+
+    for hits, ticket in zip(batch, tickets):
+        single = local_index.search(ticket, k=3)
+        assert [h["score"] for h in hits] == pytest.approx([h["score"] for h in single], abs=1e-5)
+        assert hits[0]["category"] == single[0]["category"]
+
+def test_save_and_memory_map_round_trip(local_index, resolved, tmp_path):
+    local_index.save(str(tmp_path))
+    loaded = LocalSimilarityIndex.load(str(tmp_path))
+
+    assert isinstance(loaded.vectors, np.memmap)
+    assert loaded.dims == 128
+    ticket = new_ticket(resolved[3])
+    assert [h["ticket_id"] for h in loaded.search(ticket)] == [h["ticket_id"] for h in local_index.search(ticket)]
+
+def test_int8_quantized_index_keeps_ranking(resolved):
+    embedder = HashingEmbedder(dims=128)
+    exact = build_local_index(resolved, embedder)
+    quantized = build_local_index(resolved, embedder, quantized=True)
+
+    assert quantized.vectors.dtype == np.int8
+    assert quantized.vectors.nbytes * 4 == exact.vectors.nbytes
+    for source in resolved[:10]:
+        ticket = new_ticket(source)
+        top = exact.search(ticket, k=1)[0]
+        assert quantized.search(ticket, k=1)[0]["category"] == top["category"]
+        assert quantized.search(ticket, k=1)[0]["score"] == pytest.approx(top["score"], abs=0.02)
+
+def test_snapshot_reads_resolved_tickets_from_cluster(es, fake_cluster, resolved):
+    local_index = snapshot_resolved_tickets(es, HashingEmbedder(dims=64), page_size=5)
+
+    assert sorted(local_index.metadata["ticket_id"]) == sorted(t["ticket_id"] for t in resolved)
+    pages = [body for body in fake_cluster.searches if "pit" in body]
+    assert pages and all(body["sort"] == [{"_shard_doc": "asc"}] for body in pages)
+    assert all("runtime_mappings" not in body for body in pages)
+    assert fake_cluster.pits == {}
+
+def test_apply_changes_compacts_the_overlay_past_the_ratio(resolved):
+    embedder = HashingEmbedder(dims=64)
+    local_index = build_local_index(resolved[:12], embedder)
+    local_index.compact_ratio = 0.25
+    reference = build_local_index(resolved[:12], embedder)
+    reference.compact_ratio = float("inf")
+
+    for ticket in resolved[12:14]:
+        local_index.apply_changes([ticket])
+        reference.apply_changes([ticket])
+    assert local_index.compactions == 0 and len(local_index._delta_vectors) == 2
+
+    changes = [dict(resolved[0], status="open"), resolved[14]]
+    local_index.apply_changes(changes)
+    reference.apply_changes(changes)
+
+    assert local_index.compactions == 1
+    assert len(local_index._delta_vectors) == 0 and local_index.vectors.shape[0] == len(local_index) == 14
+    ticket = new_ticket(resolved[13])
+    hits, expected = local_index.search(ticket, k=5), reference.search(ticket, k=5)
+    assert [h["ticket_id"] for h in hits] == [h["ticket_id"] for h in expected]
+    assert [h["score"] for h in hits] == pytest.approx([h["score"] for h in expected], abs=1e-5)
+
+def test_agent_falls_back_to_local_index_when_search_fails(es, fake_cluster, local_index, resolved):
+    fake_cluster.fail("POST", r"support_tickets/_search")
+    ticket = new_ticket(resolved[0])
+
+    without_index = TriageAgent(es).triage_ticket(dict(ticket))
+    with_index = TriageAgent(es, local_index=local_index).triage_ticket(dict(ticket))
+
+    assert without_index["context"]["similar_tickets_found"] == 0
+    assert without_index["analysis"]["category_source"] == "keywords"
+    assert with_index["context"]["similar_tickets_found"] == 5
+    assert with_index["analysis"]["category_source"] == "similar_tickets"
+    assert with_index["triage_decision"]["category"] == resolved[0]["category"]
+
+def test_prefer_local_index_skips_similar_ticket_queries(es, fake_cluster, local_index, open_tickets):
+    tickets = [{k: v for k, v in t.items() if k != "customer_id"} for t in open_tickets[:10]]
+
+    with TriageAgent(es, use_msearch=True, local_index=local_index, prefer_local_index=True) as agent:
+        results = agent.triage_batch(tickets)
+
+    assert all(r["context"]["similar_tickets_found"] == 5 for r in results)
+    assert fake_cluster.request_count("POST", r"support_tickets/_search") <= 1
+    assert local_index.lookups == len(tickets)
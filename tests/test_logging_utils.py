@@ -0,0 +1,60 @@
+import io
+import json
+import logging
+
+import pytest
+
+from agent.logging_utils import AGENT_LOGGER, configure_logging
+from agent.triage_agent import TriageAgent
+
+@pytest.fixture(autouse=True)
+def reset_agent_logger():
+    yield
+    logger = logging.getLogger(AGENT_LOGGER)
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+    logger.setLevel(logging.NOTSET)
+    logger.propagate = True
+
+def test_batch_runs_emit_no_step_output_by_default(es, open_tickets, capsys, monkeypatch):
+    monkeypatch.delenv("LOG_LEVEL", raising=False)
+    stream = io.StringIO()
+    configure_logging(stream=stream)
+
+    TriageAgent(es).triage_batch(open_tickets[:3])
+
+    assert stream.getvalue() == ""
+    assert capsys.readouterr().out == ""
+
+def test_info_level_reports_each_step(es, open_tickets):
+    stream = io.StringIO()
+    configure_logging(level="INFO", stream=stream)
+
+    TriageAgent(es).triage_ticket(open_tickets[0])
+
+    output = stream.getvalue()
+    for step in range(1, 6):
+        assert f"[STEP {step}]" in output
+    assert open_tickets[0]["ticket_id"] in output
+
+def test_json_lines_mode_emits_structured_records(es, open_tickets):
+    stream = io.StringIO()
+    configure_logging(level="INFO", log_format="json", stream=stream)
+
+    TriageAgent(es).triage_ticket(open_tickets[0])
+
+    records = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert [r["stage"] for r in records] == ["start", "analysis", "context", "scoring", "decision", "workflow", "complete"]
+    assert all(r["ticket_id"] == open_tickets[0]["ticket_id"] and r["level"] == "INFO" for r in records)
+
+def test_warnings_are_logged_with_level_prefix(es, fake_cluster, open_tickets):
+    stream = io.StringIO()
+    configure_logging(stream=stream)
+    fake_cluster.fail("POST", "^/knowledge_base/_search")
+
+    TriageAgent(es).triage_ticket(open_tickets[0])
+
+    assert stream.getvalue().startswith("[WARNING] Error searching KB:")
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,26 @@
+from metrics_dashboard import MetricsDashboard
+
+def test_ticket_statistics_come_from_one_aggregation_request(es, fake_cluster, support_data):
+    dashboard = MetricsDashboard(es)
+
+    stats = dashboard._get_ticket_statistics()
+    categories = dashboard._get_category_accuracy()
+
+    tickets = support_data["tickets"]
+    assert stats["total_tickets"] == len(tickets)
+    assert stats["by_status"] == {s: sum(1 for t in tickets if t["status"] == s) for s in {t["status"] for t in tickets}}
+    assert categories == stats["by_category"] and categories is not stats["by_category"]
+    assert fake_cluster.request_count("POST", r"support_tickets/_search") == 1
+    assert fake_cluster.request_count(path_pattern=r"support_tickets/_count") == 0
+
+def test_each_report_refreshes_the_shared_aggregations(es, fake_cluster):
+    dashboard = MetricsDashboard(es)
+
+    first = dashboard.generate_report()
+    es.index(index="support_tickets", id="TICK-NEW", document={"ticket_id": "TICK-NEW", "status": "open",
+                                                              "priority": "low", "category": "billing"})
+    second = dashboard.generate_report()
+
+    assert second["ticket_stats"]["total_tickets"] == first["ticket_stats"]["total_tickets"] + 1
+    assert second["category_accuracy"]["billing"] == first["category_accuracy"]["billing"] + 1
+    assert fake_cluster.request_count("POST", r"support_tickets/_search") == 2
@@ -1,27 +1,16 @@
-import os
 import sys
-from elasticsearch import Elasticsearch
 from dotenv import load_dotenv
 
 sys.path.insert(0, 'src')
+from agent.logging_utils import configure_logging
 from agent.triage_agent import TriageAgent
+from es_config.client import get_client
 
 load_dotenv()
 
 def connect_es():
-    if os.getenv('ELASTIC_API_KEY'):
-        es = Elasticsearch(
-            os.getenv('ELASTICSEARCH_URL'),
-            api_key=os.getenv('ELASTIC_API_KEY'),
-            verify_certs=True
-        )
-    else:
-        es = Elasticsearch(
-            os.getenv('ELASTICSEARCH_URL'),
-            basic_auth=(os.getenv('ELASTIC_USERNAME', 'elastic'), os.getenv('ELASTIC_PASSWORD')),
-            verify_certs=True
-        )
-    
+    es = get_client()
+
     if es.ping():
         print(f"Connected to Elasticsearch Cloud")
         return es
@@ -32,55 +21,55 @@ def connect_es():
 TEST_TICKETS = [
                                                
     {
-: "DEMO-CRITICAL",
-: "CUST-001",
-: "CRITICAL EMERGENCY: Production database completely down - All customers affected!",
-: "URGENT CRITICAL EMERGENCY! Our production database crashed 45 minutes ago and is completely down. ALL customers are impacted and cannot access the system. This is a production outage causing massive revenue loss. System is broken and not working at all. API is failing with errors. This is the third critical incident this week. Need immediate emergency help ASAP! Customers are calling and complaining.",
-: "open",
-: "2026-02-05T18:00:00Z"
+        "ticket_id": "DEMO-CRITICAL",
+        "customer_id": "CUST-001",
+        "subject": "CRITICAL EMERGENCY: Production database completely down - All customers affected!",
+        "description": "URGENT CRITICAL EMERGENCY! Our production database crashed 45 minutes ago and is completely down. ALL customers are impacted and cannot access the system. This is a production outage causing massive revenue loss. System is broken and not working at all. API is failing with errors. This is the third critical incident this week. Need immediate emergency help ASAP! Customers are calling and complaining.",
+        "status": "open",
+        "created_at": "2026-02-05T18:00:00Z"
     },
                                              
     {
-: "DEMO-HIGH",
-: "CUST-005",
-: "URGENT: Payment processing system is broken - customers cannot checkout",
-: "Our payment API is not working and customers are unable to complete purchases. This is causing immediate revenue impact. The error started 2 hours ago during peak sales time. Multiple customers have reported the issue. System is critically broken and needs urgent attention. This is blocking all transactions.",
-: "open",
-: "2026-02-05T17:30:00Z"
+        "ticket_id": "DEMO-HIGH",
+        "customer_id": "CUST-005",
+        "subject": "URGENT: Payment processing system is broken - customers cannot checkout",
+        "description": "Our payment API is not working and customers are unable to complete purchases. This is causing immediate revenue impact. The error started 2 hours ago during peak sales time. Multiple customers have reported the issue. System is critically broken and needs urgent attention. This is blocking all transactions.",
+        "status": "open",
+        "created_at": "2026-02-05T17:30:00Z"
     },
                                                
     {
-: "DEMO-MEDIUM",
-: "CUST-010",
-: "API integration not working properly",
-: "Our API integration with your system has been intermittently failing since this morning. It's not completely down but errors are occurring frequently. This is affecting our workflow and we need it fixed soon.",
-: "open",
-: "2026-02-05T16:00:00Z"
+        "ticket_id": "DEMO-MEDIUM",
+        "customer_id": "CUST-010",
+        "subject": "API integration not working properly",
+        "description": "Our API integration with your system has been intermittently failing since this morning. It's not completely down but errors are occurring frequently. This is affecting our workflow and we need it fixed soon.",
+        "status": "open",
+        "created_at": "2026-02-05T16:00:00Z"
     },
                                            
     {
-: "DEMO-LOW-1",
-: "CUST-050",
-: "Question about invoice",
-: "Hi, I received my invoice for last month but I don't understand one of the charges. Can you explain what 'platform fee' means?",
-: "open",
-: "2026-02-05T15:45:00Z"
+        "ticket_id": "DEMO-LOW-1",
+        "customer_id": "CUST-050",
+        "subject": "Question about invoice",
+        "description": "Hi, I received my invoice for last month but I don't understand one of the charges. Can you explain what 'platform fee' means?",
+        "status": "open",
+        "created_at": "2026-02-05T15:45:00Z"
     },
     {
-: "DEMO-LOW-2",
-: "CUST-025",
-: "Feature request: Dark mode",
-: "It would be great if you could add a dark mode to the dashboard. Many users including myself prefer dark themes for reduced eye strain.",
-: "open",
-: "2026-02-05T14:30:00Z"
+        "ticket_id": "DEMO-LOW-2",
+        "customer_id": "CUST-025",
+        "subject": "Feature request: Dark mode",
+        "description": "It would be great if you could add a dark mode to the dashboard. Many users including myself prefer dark themes for reduced eye strain.",
+        "status": "open",
+        "created_at": "2026-02-05T14:30:00Z"
     },
     {
-: "DEMO-LOW-3",
-: "CUST-075",
-: "How to export reports?",
-: "I'm trying to export my monthly reports but can't find the export button. Could you point me in the right direction?",
-: "open",
-: "2026-02-05T13:00:00Z"
+        "ticket_id": "DEMO-LOW-3",
+        "customer_id": "CUST-075",
+        "subject": "How to export reports?",
+        "description": "I'm trying to export my monthly reports but can't find the export button. Could you point me in the right direction?",
+        "status": "open",
+        "created_at": "2026-02-05T13:00:00Z"
     }
 ]
 
@@ -121,6 +110,7 @@ def main():
     if not es:
         return
     
+    configure_logging(level="INFO", stream=sys.stdout)
     agent = TriageAgent(es)
     print(f"Agent initialized: {agent.agent_name}\n")
     
@@ -0,0 +1,96 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("httpx")
+
+from fastapi.testclient import TestClient
+
+from agent.bulk_writer import WorkflowWriteBuffer
+from agent.micro_batcher import MicroBatcher
+from agent.service import create_app
+from agent.triage_agent import TriageAgent
+
+@pytest.fixture
+def agent(es):
+    with WorkflowWriteBuffer(es, flush_interval=0) as buffer:
+        yield TriageAgent(es, use_msearch=True, write_buffer=buffer)
+
+def test_micro_batcher_coalesces_concurrent_tickets(agent, fake_cluster, open_tickets):
+    batcher = MicroBatcher(agent, max_wait_ms=100)
+    tickets = open_tickets[:10]
+
+    futures = [batcher.submit(ticket) for ticket in tickets]
+    results = [future.result(timeout=5) for future in futures]
+    batcher.close()
+
+    assert [r["ticket_id"] for r in results] == [t["ticket_id"] for t in tickets]
+    assert batcher.stats()["batches"] == 1
+    assert fake_cluster.request_count(path_pattern="_msearch") == 1
+    assert fake_cluster.request_count(path_pattern="_bulk") == 1
+
+def test_micro_batcher_respects_max_batch_size(agent, open_tickets):
+    batcher = MicroBatcher(agent, max_batch_size=4, max_wait_ms=100)
+
+    futures = [batcher.submit(ticket) for ticket in open_tickets[:10]]
+    for future in futures:
+        future.result(timeout=5)
+    batcher.close()
+
+    assert batcher.stats()["batches"] == 3
+
+def test_triage_endpoint_returns_decision(agent, open_tickets):
+    with TestClient(create_app(agent=agent)) as client:
+        response = client.post("/triage", json=open_tickets[0])
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["ticket_id"] == open_tickets[0]["ticket_id"]
+    assert body["triage_decision"]["assigned_team"]
+    assert body["workflow_result"]["writes"] == {"ticket_update": "written", "audit_log": "written"}
+
+def test_concurrent_requests_share_batches(agent, fake_cluster, open_tickets):
+    tickets = open_tickets[:12]
+    with TestClient(create_app(agent=agent, max_wait_ms=50)) as client:
+        with ThreadPoolExecutor(max_workers=12) as pool:
+            responses = list(pool.map(lambda t: client.post("/triage", json=t), tickets))
+        metrics = client.get("/metrics").json()
+
+    assert all(r.status_code == 200 for r in responses)
+    assert metrics["batcher"]["batches"] < len(tickets)
+    assert fake_cluster.request_count(path_pattern="_msearch") == metrics["batcher"]["batches"]
+    assert metrics["requests"]["triage"]["count"] == len(tickets)
+    assert metrics["stages"]["total"]["count"] == len(tickets)
+
+def test_batch_endpoint_and_validation(agent, open_tickets):
+    with TestClient(create_app(agent=agent)) as client:
+        response = client.post("/triage/batch", json={"tickets": open_tickets[:3]})
+        invalid = client.post("/triage", json={"description": "missing subject"})
+        health = client.get("/health").json()
+
+    assert [r["ticket_id"] for r in response.json()["results"]] == [t["ticket_id"] for t in open_tickets[:3]]
+    assert invalid.status_code == 422
+    assert health == {"status": "ok", "queue_depth": 0}
+
+def test_service_builds_its_agent_from_triage_settings(monkeypatch, es):
+    import agent.service as service
+
+    monkeypatch.setattr(service, "connect_elasticsearch", lambda: es)
+    monkeypatch.setenv("TRIAGE_PARALLEL_CONTEXT", "false")
+    monkeypatch.setenv("TRIAGE_WORKLOAD_TTL", "5")
+    monkeypatch.setenv("TRIAGE_VECTORIZED_SCORING", "true")
+    monkeypatch.setenv("TRIAGE_SYNC_INTERVAL", "0")
+
+    app = create_app()
+    with TestClient(app) as client:
+        assert client.get("/health").json()["status"] == "ok"
+        built = app.state.agent
+
+    assert built._context_pool is None
+    assert built.workload.ttl_seconds == 5.0
+    assert built.vectorized_scoring and built.use_msearch
+    assert built.write_buffer is not None
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,124 @@
+from datetime import datetime, timedelta
+
+from agent.embeddings import HashingEmbedder
+from agent.local_index import LocalSimilarityIndex, snapshot_resolved_tickets
+from agent.snapshot_sync import ChangeFeed, SnapshotSync, attach_agent_caches
+from agent.triage_agent import TriageAgent
+
+def later(minutes=1):
+    return (datetime.now() + timedelta(days=1, minutes=minutes)).isoformat()
+
+def test_change_feed_pages_in_update_order_and_resumes(es, support_data):
+    feed = ChangeFeed(es, "support_tickets", "ticket_id", page_size=25)
+
+    pages = list(feed.pages())
+    docs = [doc for page in pages for doc in page]
+    assert len(docs) == len(support_data["tickets"])
+    assert [d["updated_at"] for d in docs] == sorted(d["updated_at"] for d in docs)
+    assert docs[-1]["_watermark"] == feed.latest()
+
+    assert list(feed.pages(docs[-1]["_watermark"])) == []
+    resumed = [doc for page in feed.pages(docs[99]["_watermark"]) for doc in page]
+    assert [d["ticket_id"] for d in resumed] == [d["ticket_id"] for d in docs[100:]]
+
+def test_sync_persists_watermarks_and_only_replays_new_changes(es, tmp_path):
+    state_path = str(tmp_path / "sync.json")
+    seen = []
+    sync = SnapshotSync(es, state_path=state_path, page_size=50)
+    sync.register("support_tickets", seen.extend)
+    sync.seed("support_tickets")
+
+    assert sync.sync_once() == {"support_tickets": 0}
+    es.update(index="support_tickets", id="TICK-00001", doc={"status": "resolved", "updated_at": later()})
+    es.update(index="support_tickets", id="TICK-00002", doc={"status": "open", "updated_at": later(2)})
+    assert sync.sync_once() == {"support_tickets": 2}
+    assert [d["ticket_id"] for d in seen] == ["TICK-00001", "TICK-00002"]
+
+    restarted = SnapshotSync(es, state_path=state_path)
+    assert restarted.watermark("support_tickets") == sync.watermark("support_tickets")
+    restarted.register("support_tickets", seen.extend)
+    assert restarted.sync_once() == {"support_tickets": 0}
+
+def test_sync_rereads_the_overlap_for_late_visible_changes(es, tmp_path):
+    state_path = str(tmp_path / "sync.json")
+    seen = []
+    sync = SnapshotSync(es, state_path=state_path, page_size=50, overlap=5)
+    sync.register("support_tickets", seen.extend)
+    sync.seed("support_tickets")
+    assert sync.sync_once() == {"support_tickets": 0}
+
+    es.update(index="support_tickets", id="TICK-00001", doc={"status": "resolved", "updated_at": later(1)})
+    assert sync.sync_once() == {"support_tickets": 1}
+    applied = datetime.fromisoformat(sync.watermark("support_tickets")[0])
+    es.update(index="support_tickets", id="TICK-00002",
+              doc={"status": "resolved", "updated_at": (applied - timedelta(seconds=2)).isoformat()})
+
+    restarted = SnapshotSync(es, state_path=state_path, overlap=5)
+    restarted.register("support_tickets", seen.extend)
+    assert restarted.sync_once() == {"support_tickets": 1}
+    assert [d["ticket_id"] for d in seen] == ["TICK-00001", "TICK-00002"]
+    assert restarted.watermark("support_tickets") == sync.watermark("support_tickets")
+    assert restarted.sync_once() == {"support_tickets": 0}
+
+def test_agent_writes_utc_timestamps(es, open_tickets):
+    result = TriageAgent(es).triage_ticket(dict(open_tickets[0]))
+
+    assert datetime.fromisoformat(result["workflow_result"]["timestamp"]).utcoffset() == timedelta(0)
+
+def test_apply_changes_upserts_resolved_and_drops_reopened_tickets(es, support_data, tmp_path):
+    local_index = snapshot_resolved_tickets(es, HashingEmbedder(dims=64))
+    resolved = [t for t in support_data["tickets"] if t["status"] == "resolved"]
+    opened = next(t for t in support_data["tickets"] if t["status"] != "resolved")
+
+    reopened = dict(resolved[0], status="open")
+    newly_resolved = dict(opened, status="resolved", subject="Webhook retries exhausted overnight")
+    counts = local_index.apply_changes([reopened, newly_resolved])
+
+    assert counts == {"upserted": 1, "removed": 1}
+    assert len(local_index) == len(resolved)
+    hits = local_index.search({"subject": "Webhook retries exhausted overnight", "description": ""}, k=len(resolved))
+    assert hits[0]["ticket_id"] == opened["ticket_id"]
+    assert resolved[0]["ticket_id"] not in {h["ticket_id"] for h in hits}
+
+    local_index.save(str(tmp_path))
+    loaded = LocalSimilarityIndex.load(str(tmp_path))
+    assert len(loaded) == len(local_index)
+    assert sorted(loaded.metadata["ticket_id"]) == sorted(h["ticket_id"] for h in hits)
+
+def test_restart_replays_changes_missing_from_the_saved_local_index(es, support_data, tmp_path):
+    state_path = str(tmp_path / "sync.json")
+    snapshot_resolved_tickets(es, HashingEmbedder(dims=64)).save(str(tmp_path / "index"))
+    opened = next(t for t in support_data["tickets"] if t["status"] == "open")
+
+    first = TriageAgent(es, local_index=LocalSimilarityIndex.load(str(tmp_path / "index")))
+    sync = attach_agent_caches(SnapshotSync(es, state_path=state_path), first)
+    es.update(index="support_tickets", id=opened["ticket_id"], doc={"status": "resolved", "updated_at": later()})
+    assert sync.sync_once()["support_tickets"] == 1
+    assert opened["ticket_id"] in first.local_index.metadata["ticket_id"] + first.local_index._delta_metadata["ticket_id"]
+
+    restarted = TriageAgent(es, local_index=LocalSimilarityIndex.load(str(tmp_path / "index")))
+    resumed = attach_agent_caches(SnapshotSync(es, state_path=state_path), restarted)
+    assert resumed.watermark("support_tickets") == restarted.local_index.watermark
+    assert resumed.sync_once()["support_tickets"] == 1
+    assert opened["ticket_id"] in {h["ticket_id"] for h in restarted.local_index.search(opened, k=5)}
+
+def test_attached_sync_refreshes_local_index_and_customer_cache(es, support_data):
+    local_index = snapshot_resolved_tickets(es, HashingEmbedder(dims=64))
+    agent = TriageAgent(es, local_index=local_index)
+    customer = support_data["customers"][0]
+    agent.customer_cache.put(customer["customer_id"], dict(customer), [])
+    sync = attach_agent_caches(SnapshotSync(es), agent)
+    assert sync.watermark("support_tickets") == local_index.watermark
+
+    opened = next(t for t in support_data["tickets"] if t["status"] == "open")
+    es.update(index="support_tickets", id=opened["ticket_id"], doc={"status": "resolved", "updated_at": later()})
+    es.update(index="customers", id=customer["customer_id"], doc={"plan": "enterprise", "updated_at": later()})
+
+    before = len(local_index)
+    assert sync.sync_once() == {"support_tickets": 1, "customers": 1}
+    assert len(local_index) == before + 1
+    hits = local_index.search(opened, k=5)
+    assert opened["ticket_id"] in {h["ticket_id"] for h in hits if h["score"] == hits[0]["score"]}
+    cached = agent.customer_cache.get(customer["customer_id"])
+    assert cached["profile"]["plan"] == "enterprise"
+    agent.close()
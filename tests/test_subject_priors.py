@@ -0,0 +1,73 @@
+from agent.subject_priors import SubjectPriors, build_subject_priors, normalize_subject
+from agent.triage_agent import TriageAgent
+
+def test_normalize_subject_folds_case_punctuation_and_reply_prefixes():
+    assert normalize_subject("RE: Fwd: Cannot login to account!!") == "cannot login to account"
+    assert normalize_subject("  Invoice 1234 is   missing ") == "invoice # is missing"
+    assert normalize_subject(None) == ""
+
+def test_build_subject_priors_counts_resolved_tickets_per_subject(es, support_data):
+    priors = build_subject_priors(es, page_size=2)
+
+    resolved = [t for t in support_data["tickets"] if t["status"] == "resolved"]
+    assert sum(prior["count"] for prior in priors.values()) == len(resolved)
+
+    ticket = resolved[0]
+    prior = priors[normalize_subject(ticket["subject"])]
+    same_subject = [t for t in resolved if t["subject"] == ticket["subject"]]
+    assert prior["count"] == len(same_subject)
+    assert sum(prior["categories"].values()) == len(same_subject)
+    assert sum(prior["priorities"].values()) == len(same_subject)
+    assert prior["categories"][ticket["category"]] >= 1
+
+def test_priors_round_trip_and_respect_support_thresholds(tmp_path):
+    priors = SubjectPriors({
+        "cannot login to account": {"count": 8, "categories": {"technical": 8}, "priorities": {"high": 8}},
+        "refund request": {"count": 2, "categories": {"billing": 2}, "priorities": {"low": 2}},
+        "general question": {"count": 10, "categories": {"account": 5, "feature": 5}, "priorities": {"low": 10}}
+    })
+    path = str(tmp_path / "priors.json")
+    priors.save(path)
+
+    loaded = SubjectPriors.load(path, min_support=5, min_share=0.6)
+    assert len(loaded) == 3
+    assert loaded.lookup("Cannot login to account")["categories"] == {"technical": 8}
+    assert loaded.lookup("Refund request") is None
+    assert loaded.lookup("General question") is None
+    assert loaded.lookup("Something new") is None
+    assert loaded.stats()["hits"] == 1
+    assert loaded.stats()["misses"] == 3
+
+def test_agent_answers_known_subjects_from_priors_without_similar_search(es, fake_cluster, support_data):
+    priors = SubjectPriors(build_subject_priors(es), min_support=1)
+    resolved = next(t for t in support_data["tickets"] if t["status"] == "resolved")
+    ticket = {"ticket_id": resolved["ticket_id"], "subject": resolved["subject"],
+              "description": resolved["description"], "status": "open"}
+
+    before = fake_cluster.request_count("POST", r"support_tickets/_search")
+    baseline = TriageAgent(es).triage_ticket(dict(ticket))
+    baseline_searches = fake_cluster.request_count("POST", r"support_tickets/_search") - before
+
+    result = TriageAgent(es, subject_priors=priors).triage_ticket(dict(ticket))
+    prior_searches = fake_cluster.request_count("POST", r"support_tickets/_search") - before - baseline_searches
+
+    assert baseline["analysis"]["category_source"] == "similar_tickets"
+    assert result["analysis"]["category_source"] == "subject_prior"
+    assert result["triage_decision"]["category"] == resolved["category"]
+    assert result["triage_decision"]["reasoning"]["subject_prior_tickets"] >= 1
+    assert prior_searches == baseline_searches - 1
+
+def test_msearch_batch_falls_back_to_live_search_for_novel_subjects(es, support_data):
+    priors = SubjectPriors(build_subject_priors(es), min_support=1)
+    resolved = next(t for t in support_data["tickets"] if t["status"] == "resolved")
+    tickets = [
+        {"ticket_id": resolved["ticket_id"], "subject": resolved["subject"], "description": "", "status": "open"},
+        {"ticket_id": "NEW-1", "subject": "Payment declined for invoice", "description": "", "status": "open"}
+    ]
+
+    with TriageAgent(es, use_msearch=True, subject_priors=priors) as agent:
+        known, novel = agent.triage_batch(tickets)
+
+    assert known["analysis"]["category_source"] == "subject_prior"
+    assert novel["analysis"]["category_source"] in ("similar_tickets", "keywords")
+    assert novel["triage_decision"]["reasoning"]["subject_prior_tickets"] == 0
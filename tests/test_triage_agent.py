@@ -0,0 +1,124 @@
+import time
+
+import pytest
+
+from agent.triage_agent import TriageAgent
+
+def _decisions(results):
+    return [(r['ticket_id'], r['triage_decision']) for r in results]
+
+def test_triage_batch_returns_results_in_input_order(es, open_tickets):
+    agent = TriageAgent(es)
+    tickets = open_tickets[:12]
+
+    results = agent.triage_batch(tickets, max_workers=4)
+
+    assert [r['ticket_id'] for r in results] == [t['ticket_id'] for t in tickets]
+    assert all(r['processing_time_ms'] >= 0 for r in results)
+
+def test_triage_batch_matches_sequential_decisions(cluster_factory, open_tickets):
+    tickets = open_tickets[:10]
+    sequential_agent = TriageAgent(cluster_factory().client())
+    sequential = [sequential_agent.triage_ticket(dict(t)) for t in tickets]
+    batched = TriageAgent(cluster_factory().client()).triage_batch([dict(t) for t in tickets], max_workers=5)
+
+    assert _decisions(batched) == _decisions(sequential)
+
+def test_triage_batch_keeps_errors_per_ticket(es, fake_cluster, open_tickets):
+    fake_cluster.indices["customers"]["CUST-BROKEN"] = {"customer_id": "CUST-BROKEN", "plan": "platinum"}
+    tickets = open_tickets[:3]
+    tickets[1] = dict(tickets[1], customer_id="CUST-BROKEN")
+
+    results = TriageAgent(es).triage_batch(tickets, max_workers=3)
+
+    assert 'error' in results[1]
+    assert results[1]['ticket_id'] == tickets[1]['ticket_id']
+    assert 'triage_decision' in results[0] and 'triage_decision' in results[2]
+
+def test_triage_batch_overlaps_round_trips(es, fake_cluster, open_tickets):
+    fake_cluster.latency = 0.02
+    tickets = open_tickets[:8]
+
+    start = time.perf_counter()
+    TriageAgent(es).triage_batch(tickets, max_workers=8)
+    elapsed = time.perf_counter() - start
+
+    sequential_estimate = fake_cluster.request_count() * fake_cluster.latency
+    assert elapsed < sequential_estimate / 2
+
+def test_triage_batch_empty():
+    assert TriageAgent(None).triage_batch([]) == []
+
+def test_parallel_context_matches_sequential_context(es, open_tickets):
+    ticket = open_tickets[0]
+    sequential = TriageAgent(es)
+    with TriageAgent(es, parallel_context=True) as parallel:
+        analysis = parallel._analyze_content(ticket)
+        assert parallel._search_for_context(ticket, analysis) == sequential._search_for_context(ticket, analysis)
+
+def test_parallel_context_overlaps_lookups(es, fake_cluster, open_tickets):
+    fake_cluster.latency = 0.05
+    ticket = open_tickets[0]
+    with TriageAgent(es, parallel_context=True) as agent:
+        start = time.perf_counter()
+        context = agent._search_for_context(ticket, agent._analyze_content(ticket))
+        elapsed = time.perf_counter() - start
+
+    assert fake_cluster.request_count() == 4
+    assert elapsed < 3 * fake_cluster.latency
+    assert context['customer_history']['customer_id'] == ticket['customer_id']
+
+def test_parallel_context_keeps_per_lookup_fallbacks(es, fake_cluster, open_tickets):
+    fake_cluster.fail("POST", "^/knowledge_base/_search")
+    fake_cluster.fail("GET", "^/customers/_doc/")
+    ticket = open_tickets[0]
+    with TriageAgent(es, parallel_context=True) as agent:
+        context = agent._search_for_context(ticket, agent._analyze_content(ticket))
+
+    assert context['kb_articles'] == []
+    assert context['similar_tickets']
+    assert context['customer_history'] == {
+        "customer_id": ticket['customer_id'],
+        "plan": "free",
+        "satisfaction_score": 3.0,
+        "total_tickets": 0,
+        "past_tickets": []
+    }
+
+def test_msearch_context_matches_individual_searches(es, fake_cluster, open_tickets):
+    tickets = open_tickets[:6]
+    plain = TriageAgent(es)
+    expected = [plain._search_for_context(t, plain._analyze_content(t)) for t in tickets]
+
+    fake_cluster.requests.clear()
+    contexts = TriageAgent(es, use_msearch=True)._search_for_context_batch(tickets)
+
+    assert contexts == expected
+    assert fake_cluster.requests == [("POST", "/_msearch")]
+
+def test_msearch_falls_back_per_lookup(es, fake_cluster, open_tickets):
+    fake_cluster.fail("POST", "^/knowledge_base/_search")
+    ticket = dict(open_tickets[0], customer_id="CUST-MISSING")
+    agent = TriageAgent(es, use_msearch=True)
+
+    context = agent._search_for_context(ticket, agent._analyze_content(ticket))
+
+    assert context['kb_articles'] == []
+    assert context['similar_tickets']
+    assert context['customer_history'] == agent._default_customer_history("CUST-MISSING")
+
+def test_triage_batch_with_msearch_issues_one_search_per_chunk(cluster_factory, open_tickets):
+    tickets = open_tickets[:9]
+    expected = TriageAgent(cluster_factory().client()).triage_batch([dict(t) for t in tickets])
+
+    cluster = cluster_factory()
+    agent = TriageAgent(cluster.client(), use_msearch=True, msearch_batch_size=4)
+    results = agent.triage_batch([dict(t) for t in tickets], max_workers=4)
+
+    assert _decisions(results) == _decisions(expected)
+    assert cluster.request_count("POST", "_msearch") == 3
+    assert cluster.request_count("POST", "^/knowledge_base/_search") == 0
+    assert cluster.request_count("GET", "^/customers/") == 0
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
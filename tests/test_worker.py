@@ -0,0 +1,99 @@
+import os
+import signal
+import threading
+import time
+
+import pytest
+
+from agent.triage_agent import TriageAgent
+from agent.worker import LocalTicketQueue, OpenTicketPoller, TriageWorker
+from es_config.index_profiles import index_profile
+from es_config.setup_indices import TICKET_MAPPING
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+def test_worker_drains_local_queue(es, fake_cluster, open_tickets):
+    source = LocalTicketQueue()
+    for ticket in open_tickets[:20]:
+        source.put(ticket)
+    results = []
+
+    worker = TriageWorker(TriageAgent(es), source, concurrency=4, poll_interval=0.01, on_result=results.append)
+    worker.start()
+    assert wait_for(lambda: worker.processed == 20)
+    worker.stop()
+
+    assert sorted(r["ticket_id"] for r in results) == sorted(t["ticket_id"] for t in open_tickets[:20])
+    assert all(fake_cluster.indices["support_tickets"][t["ticket_id"]]["status"] == "in_progress" for t in open_tickets[:20])
+
+def test_worker_applies_backpressure_and_drains_on_stop(es, fake_cluster, open_tickets):
+    fake_cluster.latency = 0.01
+    source = LocalTicketQueue()
+    for ticket in open_tickets[:30]:
+        source.put(ticket)
+
+    worker = TriageWorker(TriageAgent(es), source, concurrency=2, max_pending=2, poll_interval=0.01)
+    worker.start()
+    time.sleep(0.1)
+    assert len(source) > 20
+    worker.stop()
+
+    assert worker.pending() == 0
+    assert worker.processed + len(source) == 30
+
+def test_poller_claims_each_open_ticket_once(es, open_tickets):
+    poller = OpenTicketPoller(es)
+
+    first = poller.poll(10)
+    second = poller.poll(1000)
+
+    ids = [t["ticket_id"] for t in first + second]
+    assert len(first) == 10
+    assert sorted(ids) == sorted(t["ticket_id"] for t in open_tickets)
+
+def test_poller_prunes_acked_claims_and_caps_the_exclusion_list(es, fake_cluster, open_tickets):
+    poller = OpenTicketPoller(es, ack_grace=0.0, max_claims=3)
+
+    first = poller.poll(5)
+    second = poller.poll(1)
+    excluded = fake_cluster.searches[-1]["query"]["bool"]["must_not"][0]["ids"]["values"]
+    for ticket in first:
+        poller.ack(ticket["ticket_id"])
+
+    assert len(excluded) == 3
+    assert second[0]["ticket_id"] not in {t["ticket_id"] for t in first}
+    assert poller.claims() == 6
+    poller.poll(0)
+    assert poller.claims() == 1
+
+def test_poll_sort_follows_the_production_index_sort(es, fake_cluster):
+    _, settings = index_profile("support_tickets", TICKET_MAPPING, "production")
+
+    OpenTicketPoller(es).poll(5)
+
+    body = fake_cluster.searches[-1]
+    assert [next(iter(clause)) for clause in body["sort"]] == settings["index.sort.field"]
+    assert [next(iter(clause.values())) for clause in body["sort"]] == settings["index.sort.order"]
+    assert body["track_total_hits"] is False
+
+def test_worker_stops_gracefully_on_sigterm(es, open_tickets):
+    results = []
+    worker = TriageWorker(TriageAgent(es), OpenTicketPoller(es), concurrency=4, poll_interval=0.01,
+                          on_result=results.append)
+
+    def terminate_when_done():
+        wait_for(lambda: len(results) == len(open_tickets))
+        os.kill(os.getpid(), signal.SIGTERM)
+
+    threading.Thread(target=terminate_when_done, daemon=True).start()
+    worker.run_forever()
+
+    assert worker.processed == len(open_tickets)
+    assert signal.getsignal(signal.SIGTERM) == signal.SIG_DFL
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])